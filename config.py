@@ -31,9 +31,28 @@ N_CONTENTS = 3*10**5
 # Currently, only OBJECT is supported
 CACHING_GRANULARITY = 'OBJECT'
 
+# Workload generating content requests.
+# Workload implementations are located in ./icarus/scenarios/workload.py
+# Available options: 'STATIONARY' (Poisson requests for Zipf-distributed
+# contents, with parameters ALPHA, N_CONTENTS and NETWORK_REQUEST_RATE) and
+# 'TRACE' (replay of a trace compiled by icarus.tools.compile_trace, whose
+# path is given in WORKLOAD_PARAMS, e.g. {'path': 'access.trace'}; N_CONTENTS
+# must not be lower than the number of contents of the trace)
+WORKLOAD = 'STATIONARY'
+
+# Additional parameters passed to the workload, other than the topology,
+# N_CONTENTS, N_WARMUP_REQUESTS, N_MEASURED_REQUESTS and SEED
+WORKLOAD_PARAMS = {}
+
 # Number of requests per second (over the whole network)
 NETWORK_REQUEST_RATE = 12.0
 
+# Method used to draw content requests from the Zipf distribution.
+# Available options: 'cdf' (binary search over the CDF, O(log N) per request)
+# and 'alias' (Walker's alias method, O(1) per request). The alias method is
+# faster for very large values of N_CONTENTS
+SAMPLING_METHOD = 'cdf'
+
 # Number of content requests generated to prepopulate the caches
 # These requests are not logged
 N_WARMUP_REQUESTS = 2*10**5
@@ -42,6 +61,22 @@ N_WARMUP_REQUESTS = 2*10**5
 # to generate results. 
 N_MEASURED_REQUESTS = 5*10**5
 
+# If True, the end of the warm-up phase is detected adaptively: warm-up ends
+# as soon as cache hit ratio and cache occupancy stop increasing, so that
+# N_WARMUP_REQUESTS is only the maximum number of warm-up requests executed.
+# Remaining warm-up requests are measured, in addition to the
+# N_MEASURED_REQUESTS requests. The number of warm-up requests executed is
+# reported in the results under WARMUP. Detection is implemented by
+# WarmupDetector, located in ./icarus/execution/engine.py
+ADAPTIVE_WARMUP = False
+
+# Parameters of the detection of the end of the warm-up phase, i.e. 'window'
+# (number of requests of a window), 'tolerance' (maximum increase of hit ratio
+# and cache occupancy in steady state) and 'n_windows' (number of windows over
+# which the increase is measured). This option is ignored if
+# ADAPTIVE_WARMUP = False
+ADAPTIVE_WARMUP_PARAMS = {}
+
 # If True, executes simulations in parallel using multiple processes
 # to take advantage of multicore CPUs
 PARALLEL_EXECUTION = True
@@ -50,6 +85,30 @@ PARALLEL_EXECUTION = True
 # This option is ignored if PARALLEL_EXECUTION = False
 N_PROCESSES = cpu_count()
 
+# Directory where all-pair shortest paths of topologies are cached, so that
+# they are computed only once for all experiments run on the same topology.
+# If None, shortest paths are computed for every experiment
+SHORTEST_PATH_CACHE_DIR = None
+
+# Number of topologies and shortest path tables that each process keeps in
+# memory to reuse them across experiments. Topologies are reused only if SEED
+# is set, since contents are placed randomly. If 0, nothing is reused
+SCENARIO_CACHE_SIZE = 4
+
+# Directory where the state of the network at the end of the warm-up phase is
+# saved, so that experiments with the same topology, cache policy, strategy,
+# alpha, network cache and seed restore it instead of executing the warm-up
+# requests again. Snapshots are used only if SEED is set. Delete this
+# directory after changing the implementation of caches or strategies.
+# If None, warm-up requests are always executed
+WARMUP_SNAPSHOT_DIR = None
+
+# Directory where workloads are stored, so that experiments with the same
+# topology, alpha and seed replay exactly the same requests (common random
+# numbers) instead of generating them again. Workloads are stored only if
+# SEED is set. If None, each experiment generates its own workload
+WORKLOAD_DIR = None
+
 # Topologies used for the simulation.
 # Topology implementations are located in ./icarus/scenarios/topology.py
 # TOPOLOGIES = ['GEANT', 'WIDE', 'GARR', 'TISCALI']
@@ -87,6 +146,33 @@ CACHE_POLICY = 'LRU'
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 5
 
+# If True, the number of replications of each experiment is chosen
+# adaptively (sequential stopping). Each experiment is first replicated
+# N_REPLICATIONS times, then more replications are scheduled until the
+# confidence intervals of the means of all STOPPING_METRICS, at confidence
+# level STOPPING_CONFIDENCE, have a half-width not greater than
+# STOPPING_PRECISION times the mean, or until the experiment is replicated
+# MAX_REPLICATIONS times. If SEED is set, each replication uses a different
+# seed derived from it and from the index of the replication
+SEQUENTIAL_STOPPING = False
+
+# Maximum number of times each experiment is replicated.
+# This option is ignored if SEQUENTIAL_STOPPING = False
+MAX_REPLICATIONS = 20
+
+# Metrics whose confidence intervals determine the number of replications,
+# as paths in the results tree, e.g. ('CACHE_HIT_RATIO', 'MEAN').
+# This option is ignored if SEQUENTIAL_STOPPING = False
+STOPPING_METRICS = [('CACHE_HIT_RATIO', 'MEAN'), ('LATENCY', 'MEAN')]
+
+# Confidence level of the confidence intervals of STOPPING_METRICS.
+# This option is ignored if SEQUENTIAL_STOPPING = False
+STOPPING_CONFIDENCE = 0.95
+
+# Maximum half-width of the confidence intervals of STOPPING_METRICS, as a
+# fraction of their mean. This option is ignored if SEQUENTIAL_STOPPING = False
+STOPPING_PRECISION = 0.02
+
 # List of metrics to be measured in the experiments
 # The implementation of data collectors are located in ./icaurs/execution/collectors.py
 DATA_COLLECTORS = ['CACHE_HIT_RATIO', 'LATENCY', 'LINK_LOAD', 'PATH_STRETCH']
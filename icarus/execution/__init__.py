@@ -1,5 +1,6 @@
 """This package contains the code for the execution of a single experiment.
 """
 from .network import *
+from .paths import *
 from .collectors import *
 from .engine import *
\ No newline at end of file
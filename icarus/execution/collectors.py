@@ -2,10 +2,13 @@
 """
 from __future__ import division
 import sys
+import numbers
 import collections
 
+import numpy as np
+
 from icarus.registry import register_data_collector
-from icarus.tools import cdf
+from icarus.tools import LogHistogram
 from icarus.util import Tree, inheritdoc
 
 
@@ -16,6 +19,7 @@ __all__ = [
     'LinkLoadCollector',
     'LatencyCollector',
     'PathStretchCollector',
+    'TimeWindowCollector',
     'TestCollector'
            ]
 
@@ -100,6 +104,40 @@ class DataCollector(object):
         """
         pass
     
+    def request_path(self, path):
+        """Reports that a request has traversed a path
+        
+        By default, each link of the path is reported to *request_hop*, so
+        that collectors only implementing *request_hop* are notified of all
+        hops. Collectors only needing aggregate metrics of the path, such as
+        its length or delay (see *NetworkView.path_delay*), should override
+        this method to process the whole path at once.
+        
+        Parameters
+        ----------
+        path : list
+            List of nodes of the path. It must not be modified
+        """
+        for hop in range(1, len(path)):
+            self.request_hop(path[hop - 1], path[hop])
+    
+    def content_path(self, path):
+        """Reports that a content has traversed a path
+        
+        By default, each link of the path is reported to *content_hop*, so
+        that collectors only implementing *content_hop* are notified of all
+        hops. Collectors only needing aggregate metrics of the path, such as
+        its length or delay (see *NetworkView.path_delay*), should override
+        this method to process the whole path at once.
+        
+        Parameters
+        ----------
+        path : list
+            List of nodes of the path. It must not be modified
+        """
+        for hop in range(1, len(path)):
+            self.content_hop(path[hop - 1], path[hop])
+    
     def end_session(self, success=True):
         """Reports that the session is closed, i.e. the content has been
         successfully delivered to the receiver or a failure blocked the 
@@ -122,10 +160,6 @@ class DataCollector(object):
         """
         pass
 
-# Note: The implementation of CollectorProxy could be improved to avoid having
-# to rewrite almost identical methods, for example by playing with __dict__
-# attribute. However, it was implemented this way to make it more readable and 
-# easier to understand.
 class CollectorProxy(DataCollector):
     """This class acts as a proxy for all concrete collectors towards the
     network controller.
@@ -133,10 +167,21 @@ class CollectorProxy(DataCollector):
     An instance of this class registers itself with the network controller and
     it receives notifications for all events. This class is responsible for
     dispatching events of interests to concrete collectors.
+    
+    Since events are reported several times per request, dispatch lists are
+    built once at construction time. Each event is dispatched only to the
+    collectors overriding the corresponding method of *DataCollector*, whose
+    bound methods are stored to avoid looking them up for every event.
+    
+    Paths and hops are dispatched to collectors implementing either of them:
+    paths are reported hop by hop to collectors only implementing hop events
+    and hops are reported as paths of one link to collectors only implementing
+    path events.
     """
     
     EVENTS = ('start_session', 'end_session', 'cache_hit', 'server_hit',
-              'request_hop', 'content_hop', 'results')
+              'request_hop', 'content_hop', 'request_path', 'content_path',
+              'results')
     
     def __init__(self, view, collectors):
         """Constructor
@@ -149,49 +194,132 @@ class CollectorProxy(DataCollector):
             List of instances of DataCollector that will be notified of events
         """
         self.view = view
-        self.collectors = dict((e,[c for c in collectors if e in type(c).__dict__])
+        self.collectors = dict((e, [c for c in collectors
+                                    if _overrides(c, e)])
                                for e in self.EVENTS)
+        for hop_event, path_event in (('request_hop', 'request_path'),
+                                      ('content_hop', 'content_path')):
+            hop_only = [c for c in self.collectors[hop_event]
+                        if c not in self.collectors[path_event]]
+            path_only = [c for c in self.collectors[path_event]
+                         if c not in self.collectors[hop_event]]
+            self.collectors[hop_event].extend(path_only)
+            self.collectors[path_event].extend(hop_only)
+        self._start_session = self._dispatch_list('start_session')
+        self._end_session = self._dispatch_list('end_session')
+        self._cache_hit = self._dispatch_list('cache_hit')
+        self._server_hit = self._dispatch_list('server_hit')
+        self._request_hop = self._dispatch_list('request_hop')
+        self._content_hop = self._dispatch_list('content_hop')
+        self._request_path = self._dispatch_list('request_path')
+        self._content_path = self._dispatch_list('content_path')
+    
+    def _dispatch_list(self, event):
+        """Return the bound methods handling an event
+        """
+        if event in ('request_hop', 'content_hop'):
+            path_event = event.replace('hop', 'path')
+            # Collectors only implementing path events receive a path of one
+            # link
+            return tuple(getattr(c, event) if _overrides(c, event)
+                         else _hop_to_path(getattr(c, path_event))
+                         for c in self.collectors[event])
+        # Collectors only implementing hop events receive each hop of the path
+        # from the implementation of path events of DataCollector
+        return tuple(getattr(c, event) for c in self.collectors[event])
     
     @inheritdoc(DataCollector)
     def start_session(self, timestamp, receiver, content):
-        for c in self.collectors['start_session']:
-            c.start_session(timestamp, receiver, content)
+        for f in self._start_session:
+            f(timestamp, receiver, content)
     
     @inheritdoc(DataCollector)
     def cache_hit(self, node):
-        for c in self.collectors['cache_hit']:
-            c.cache_hit(node)
+        for f in self._cache_hit:
+            f(node)
 
     @inheritdoc(DataCollector)
     def server_hit(self, node):
-        for c in self.collectors['server_hit']:
-            c.server_hit(node)
+        for f in self._server_hit:
+            f(node)
     
     @inheritdoc(DataCollector)
     def request_hop(self, u, v):
-        for c in self.collectors['request_hop']:
-            c.request_hop(u, v)
+        for f in self._request_hop:
+            f(u, v)
     
     @inheritdoc(DataCollector)
     def content_hop(self, u, v):
-        for c in self.collectors['content_hop']:
-            c.content_hop(u, v)
+        for f in self._content_hop:
+            f(u, v)
+    
+    @inheritdoc(DataCollector)
+    def request_path(self, path):
+        for f in self._request_path:
+            f(path)
+    
+    @inheritdoc(DataCollector)
+    def content_path(self, path):
+        for f in self._content_path:
+            f(path)
     
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
-        for c in self.collectors['end_session']:
-            c.end_session(success)
+        for f in self._end_session:
+            f(success)
     
     @inheritdoc(DataCollector)
     def results(self):
         return Tree(**{c.name: c.results() for c in self.collectors['results']})
 
 
+def _hop_to_path(path_handler):
+    """Return a function reporting a hop as a path of one link to a handler
+    of path events
+    """
+    def hop_handler(u, v):
+        path_handler((u, v))
+    return hop_handler
+
+
+def _overrides(collector, event):
+    """Return whether a collector handles an event, i.e. whether its class, or
+    any of its ancestors, overrides the no-op method of *DataCollector*
+    handling the event.
+    
+    Parameters
+    ----------
+    collector : DataCollector
+        The collector
+    event : str
+        The name of the method handling the event
+    
+    Returns
+    -------
+    overrides : bool
+        *True* if the collector overrides the method, *False* otherwise
+    """
+    method = getattr(type(collector), event, None)
+    return method is not None and \
+           getattr(method, '__func__', method) is not \
+           getattr(DataCollector, event).__func__
+
+
 @register_data_collector('LINK_LOAD')
 class LinkLoadCollector(DataCollector):
     """Data collector measuring the link load
+    
+    Directed links are mapped to dense indices and their loads are stored in
+    Numpy arrays. Rather than updating a counter per hop, the collector counts
+    how many times each distinct path is traversed, which only requires a
+    dictionary update per path. Path counts are periodically folded into the
+    link counters with a single vectorized operation.
     """
     
+    # Maximum number of distinct paths counted before folding path counts into
+    # link counters
+    MAX_PATHS = 2 ** 16
+    
     def __init__(self, view, sr=10):
         """Constructor
         
@@ -205,8 +333,15 @@ class LinkLoadCollector(DataCollector):
             the average size of a content is x times the size of a request.
         """
         self.view = view
-        self.req_count = collections.defaultdict(int)
-        self.cont_count = collections.defaultdict(int)
+        topology = view.topology()
+        self.links = topology.edges()
+        if not topology.is_directed():
+            self.links += [(v, u) for u, v in self.links]
+        self.link_index = dict((link, i) for i, link in enumerate(self.links))
+        self.req_count = np.zeros(len(self.links), dtype=np.int64)
+        self.cont_count = np.zeros(len(self.links), dtype=np.int64)
+        self._req_paths = collections.defaultdict(int)
+        self._cont_paths = collections.defaultdict(int)
         if sr <= 0:
             raise ValueError('sr must be positive')
         self.sr = sr
@@ -221,17 +356,50 @@ class LinkLoadCollector(DataCollector):
     
     @inheritdoc(DataCollector)
     def request_hop(self, u, v):
-        self.req_count[(u, v)] += 1
+        self._req_paths[(u, v)] += 1
     
     @inheritdoc(DataCollector)
     def content_hop(self, u, v):
-        self.cont_count[(u, v)] += 1
+        self._cont_paths[(u, v)] += 1
+    
+    @inheritdoc(DataCollector)
+    def request_path(self, path):
+        self._req_paths[tuple(path)] += 1
+        if len(self._req_paths) > self.MAX_PATHS:
+            self._fold(self._req_paths, self.req_count)
+    
+    @inheritdoc(DataCollector)
+    def content_path(self, path):
+        self._cont_paths[tuple(path)] += 1
+        if len(self._cont_paths) > self.MAX_PATHS:
+            self._fold(self._cont_paths, self.cont_count)
+    
+    def _fold(self, path_counts, link_counts):
+        """Add the number of times each path has been traversed to the
+        counters of its links and reset path counts
+        """
+        if not path_counts:
+            return
+        index = self.link_index
+        links = []
+        weights = []
+        for path, count in path_counts.iteritems():
+            links.extend(index[(path[hop - 1], path[hop])]
+                         for hop in range(1, len(path)))
+            weights.extend([count] * (len(path) - 1))
+        link_counts += np.bincount(links, weights=weights,
+                                   minlength=len(link_counts)).astype(np.int64)
+        path_counts.clear()
     
     @inheritdoc(DataCollector)
     def results(self):
+        self._fold(self._req_paths, self.req_count)
+        self._fold(self._cont_paths, self.cont_count)
         duration = self.t_end - self.t_start
-        link_loads = dict((link, (self.req_count[link] + self.sr*self.cont_count[link])/duration) 
-                          for link in self.req_count)
+        loads = (self.req_count + self.sr*self.cont_count)/duration
+        loaded = np.flatnonzero(self.req_count).tolist()
+        link_loads = dict(zip([self.links[i] for i in loaded],
+                              loads[loaded].tolist()))
         link_loads_int = dict((link, load)
                               for link, load in link_loads.iteritems()
                               if self.view.link_type(*link) == 'internal')
@@ -246,6 +414,34 @@ class LinkLoadCollector(DataCollector):
                      'PER_LINK_EXTERNAL': link_loads_ext})
 
 
+# Percentiles reported by collectors measuring the distribution of a metric
+PERCENTILES = (50, 95, 99)
+
+
+def _distribution_results(results, histogram, suffix=''):
+    """Add the distribution of a metric to the results of a collector.
+    
+    The distribution is reported as a CDF, under key *CDF*, as the histogram
+    itself, under key *HISTOGRAM*, so that histograms of several experiments
+    can be merged, and as percentiles, under keys *P50*, *P95* and so on.
+    
+    Parameters
+    ----------
+    results : Tree
+        The results of the collector
+    histogram : LogHistogram
+        The histogram of the metric
+    suffix : str, optional
+        Suffix appended to all keys
+    """
+    if len(histogram) == 0:
+        return
+    results['CDF' + suffix] = histogram.cdf()
+    results['HISTOGRAM' + suffix] = histogram
+    for p in PERCENTILES:
+        results['P%d%s' % (p, suffix)] = histogram.quantile(p/100)
+
+
 @register_data_collector('LATENCY')
 class LatencyCollector(DataCollector):
     """Data collector measuring latency, i.e. the delay taken to delivery a
@@ -260,7 +456,8 @@ class LatencyCollector(DataCollector):
         view : NetworkView
             The network view instance
         cdf : bool, optional
-            If *True*, also collects a cdf of the latency
+            If *True*, also collects the distribution of the latency, which
+            is reported as a CDF, a histogram and percentiles
         """
         self.cdf = cdf
         self.view = view
@@ -268,7 +465,7 @@ class LatencyCollector(DataCollector):
         self.sess_count = 0
         self.latency = 0.0
         if cdf:
-            self.latency_data = collections.deque()
+            self.latency_data = LogHistogram()
     
     @inheritdoc(DataCollector)
     def start_session(self, timestamp, receiver, content):
@@ -276,26 +473,26 @@ class LatencyCollector(DataCollector):
         self.sess_latency = 0.0
     
     @inheritdoc(DataCollector)
-    def request_hop(self, u, v):
-        self.sess_latency += self.view.link_delay(u, v)
+    def request_path(self, path):
+        self.sess_latency += self.view.path_delay(path)
     
     @inheritdoc(DataCollector)
-    def content_hop(self, u, v):
-        self.sess_latency += self.view.link_delay(u, v)
+    def content_path(self, path):
+        self.sess_latency += self.view.path_delay(path)
     
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
         if not success:
             return
         if self.cdf:
-            self.latency_data.append(self.sess_latency)
+            self.latency_data.add(self.sess_latency)
         self.latency += self.sess_latency
     
     @inheritdoc(DataCollector)
     def results(self):
         results = Tree({'MEAN': self.latency/self.sess_count})
         if self.cdf:
-            results['CDF'] = cdf(self.latency_data) 
+            _distribution_results(results, self.latency_data)
         return results
 
 
@@ -303,6 +500,10 @@ class LatencyCollector(DataCollector):
 class CacheHitRatioCollector(DataCollector):
     """Collector measuring the cache hit ratio, i.e. the portion of content
     requests served by a cache.
+    
+    If per-content hit ratios are recorded, content identifiers must be
+    non-negative integers. Results then include a *PER_CONTENT* array indexed
+    by content identifier, which holds NaN for contents never requested.
     """
     
     def __init__(self, view, off_path_hits=True, per_node=True, content_hits=False):
@@ -317,7 +518,9 @@ class CacheHitRatioCollector(DataCollector):
             shortest path. This metric may be relevant only for some strategies
         content_hits : bool, optional
             If *True* also records cache hits per content instead of just
-            globally
+            globally. Per-content hit ratios are reported as an array indexed
+            by content identifier, where contents never requested have a NaN
+            hit ratio
         """
         self.view = view
         self.off_path_hits = off_path_hits
@@ -333,8 +536,18 @@ class CacheHitRatioCollector(DataCollector):
             self.per_node_server_hits = collections.defaultdict(int)
         if content_hits:
             self.curr_cont = None
-            self.cont_cache_hits = collections.defaultdict(int)
-            self.cont_serv_hits = collections.defaultdict(int)
+            # Hits are counted in arrays indexed by content identifier
+            contents = view.content_ids()
+            if not contents:
+                raise ValueError('the content catalogue is empty, hence '
+                                 'per-content hits cannot be recorded')
+            if not all(isinstance(k, numbers.Integral) and k >= 0
+                       for k in contents):
+                raise ValueError('content identifiers must be non-negative '
+                                 'integers to record per-content hits')
+            n_contents = max(contents) + 1
+            self.cont_cache_hits = np.zeros(n_contents, dtype=np.int32)
+            self.cont_serv_hits = np.zeros(n_contents, dtype=np.int32)
 
     @inheritdoc(DataCollector)
     def start_session(self, timestamp, receiver, content):
@@ -372,9 +585,12 @@ class CacheHitRatioCollector(DataCollector):
             results['MEAN_OFF_PATH'] = self.off_path_hit_count/n_sess
             results['MEAN_ON_PATH'] = results['MEAN'] - results['MEAN_OFF_PATH']
         if self.cont_hits:
-            cont_set = set(self.cont_cache_hits.keys() + self.cont_serv_hits.keys())
-            cont_hits=dict((self.cont_cache_hits[i]/(self.cont_cache_hits[i] + self.cont_serv_hits[i])) 
-                            for i in cont_set)
+            cont_sess = self.cont_cache_hits + self.cont_serv_hits
+            cont_hits = np.empty(len(cont_sess), dtype=np.float32)
+            cont_hits.fill(np.nan)
+            requested = cont_sess > 0
+            cont_hits[requested] = self.cont_cache_hits[requested] \
+                                   / cont_sess[requested]
             results['PER_CONTENT'] = cont_hits
         if self.per_node:
             for v in self.per_node_cache_hits:
@@ -400,7 +616,8 @@ class PathStretchCollector(DataCollector):
         view : NetworkView
             The network view instance
         cdf : bool, optional
-            If *True*, also collects a cdf of the path stretch
+            If *True*, also collects the distribution of the path stretch,
+            which is reported as a CDF, a histogram and percentiles
         """
         self.view = view
         self.cdf = cdf
@@ -411,9 +628,9 @@ class PathStretchCollector(DataCollector):
         self.mean_cont_stretch = 0.0
         self.mean_stretch = 0.0
         if self.cdf:
-            self.req_stretch_data = collections.deque()
-            self.cont_stretch_data = collections.deque()
-            self.stretch_data = collections.deque()
+            self.req_stretch_data = LogHistogram()
+            self.cont_stretch_data = LogHistogram()
+            self.stretch_data = LogHistogram()
     
     @inheritdoc(DataCollector)
     def start_session(self, timestamp, receiver, content):
@@ -424,12 +641,12 @@ class PathStretchCollector(DataCollector):
         self.sess_count += 1
 
     @inheritdoc(DataCollector)
-    def request_hop(self, u, v):
-        self.req_path_len += 1
+    def request_path(self, path):
+        self.req_path_len += len(path) - 1
     
     @inheritdoc(DataCollector)
-    def content_hop(self, u, v):
-        self.cont_path_len += 1
+    def content_path(self, path):
+        self.cont_path_len += len(path) - 1
     
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
@@ -444,9 +661,9 @@ class PathStretchCollector(DataCollector):
         self.mean_cont_stretch += cont_stretch
         self.mean_stretch += stretch
         if self.cdf:
-            self.req_stretch_data.append(req_stretch)
-            self.cont_stretch_data.append(cont_stretch)
-            self.stretch_data.append(stretch)
+            self.req_stretch_data.add(req_stretch)
+            self.cont_stretch_data.add(cont_stretch)
+            self.stretch_data.add(stretch)
             
     @inheritdoc(DataCollector)
     def results(self):
@@ -454,12 +671,194 @@ class PathStretchCollector(DataCollector):
                         'MEAN_REQUEST': self.mean_req_stretch/self.sess_count,
                         'MEAN_CONTENT': self.mean_cont_stretch/self.sess_count})
         if self.cdf:
-            results['CDF'] = cdf(self.stretch_data)
-            results['CDF_REQUEST'] = cdf(self.req_stretch_data)
-            results['CDF_CONTENT'] = cdf(self.cont_stretch_data)
+            _distribution_results(results, self.stretch_data)
+            _distribution_results(results, self.req_stretch_data, '_REQUEST')
+            _distribution_results(results, self.cont_stretch_data, '_CONTENT')
         return results
     
 
+@register_data_collector('TIME_WINDOW')
+class TimeWindowCollector(DataCollector):
+    """Collector measuring the evolution of cache hit ratio, latency and link
+    load over time.
+    
+    Sessions are grouped into consecutive time windows of fixed duration,
+    according to the timestamp of their start, and metrics are reported for
+    each window, which makes it possible to see whether the network has
+    reached a steady state or whether metrics are still changing, e.g.
+    because the warm-up phase was too short.
+    
+    Metrics of each window are stored in ring buffers allocated in advance,
+    so that memory is bounded regardless of the number of requests: if the
+    simulation spans more windows than the capacity of the buffers, only the
+    most recent windows are reported.
+    
+    Metrics are reported as arrays with an element per window, sorted by
+    time. *TIME* is the start time of each window and *SESSIONS* the number
+    of sessions started in it. *CACHE_HIT_RATIO* and *LATENCY* are NaN for
+    windows without sessions. *LINK_LOAD_INTERNAL* and *LINK_LOAD_EXTERNAL*
+    are the mean loads of all internal and external links, including links
+    not traversed in the window.
+    """
+    
+    def __init__(self, view, window=10.0, n_windows=1024, sr=10):
+        """Constructor
+        
+        Parameters
+        ----------
+        view : NetworkView
+            The network view instance
+        window : float, optional
+            The duration of a time window, in the same unit of the timestamps
+            of the sessions (seconds for the stationary workload)
+        n_windows : int, optional
+            The maximum number of windows reported, i.e. the capacity of the
+            ring buffers
+        sr : int, optional
+            Size ratio. The average ratio between the size of the content data
+            and the request data, used to compute link loads as in
+            *LinkLoadCollector*
+        """
+        if window <= 0:
+            raise ValueError('window must be positive')
+        if n_windows <= 0:
+            raise ValueError('n_windows must be positive')
+        if sr <= 0:
+            raise ValueError('sr must be positive')
+        self.view = view
+        self.window = window
+        self.n_windows = n_windows
+        self.sr = sr
+        topology = view.topology()
+        links = topology.edges()
+        if not topology.is_directed():
+            links += [(v, u) for u, v in links]
+        link_types = [view.link_type(u, v) for u, v in links]
+        self.n_internal_links = link_types.count('internal')
+        self.n_external_links = link_types.count('external')
+        # Ring buffers. Slot i stores the metrics of the most recent window
+        # whose index is congruent to i modulo n_windows, whose index is
+        # window_index[i]
+        self.window_index = np.empty(n_windows, dtype=np.int64)
+        self.window_index.fill(-1)
+        self.sessions = np.zeros(n_windows, dtype=np.int64)
+        self.cache_hits = np.zeros(n_windows, dtype=np.int64)
+        self.serv_hits = np.zeros(n_windows, dtype=np.int64)
+        self.latency = np.zeros(n_windows)
+        self.internal_load = np.zeros(n_windows)
+        self.external_load = np.zeros(n_windows)
+        # Number of internal and external hops of each path traversed
+        self._path_hops = {}
+        self.t_start = None
+        self.curr_window = -1
+        self._reset_window()
+    
+    def _reset_window(self):
+        """Reset the counters of the current window
+        """
+        self.curr_sessions = 0
+        self.curr_cache_hits = 0
+        self.curr_serv_hits = 0
+        self.curr_latency = 0.0
+        self.curr_internal_load = 0
+        self.curr_external_load = 0
+    
+    def _flush_window(self):
+        """Store the counters of the current window in the ring buffers
+        """
+        if self.curr_window < 0:
+            return
+        i = self.curr_window % self.n_windows
+        self.window_index[i] = self.curr_window
+        self.sessions[i] = self.curr_sessions
+        self.cache_hits[i] = self.curr_cache_hits
+        self.serv_hits[i] = self.curr_serv_hits
+        self.latency[i] = self.curr_latency
+        self.internal_load[i] = self.curr_internal_load
+        self.external_load[i] = self.curr_external_load
+    
+    def _hops(self, path):
+        """Return the number of internal and external hops of a path
+        """
+        path = tuple(path)
+        if path not in self._path_hops:
+            link_types = [self.view.link_type(path[i - 1], path[i])
+                          for i in range(1, len(path))]
+            self._path_hops[path] = (link_types.count('internal'),
+                                     link_types.count('external'))
+        return self._path_hops[path]
+    
+    @inheritdoc(DataCollector)
+    def start_session(self, timestamp, receiver, content):
+        if self.t_start is None:
+            self.t_start = timestamp
+        window = int((timestamp - self.t_start)//self.window)
+        if window != self.curr_window:
+            self._flush_window()
+            self.curr_window = window
+            self._reset_window()
+        self.curr_sessions += 1
+        self.sess_latency = 0.0
+    
+    @inheritdoc(DataCollector)
+    def cache_hit(self, node):
+        self.curr_cache_hits += 1
+    
+    @inheritdoc(DataCollector)
+    def server_hit(self, node):
+        self.curr_serv_hits += 1
+    
+    @inheritdoc(DataCollector)
+    def request_path(self, path):
+        self.sess_latency += self.view.path_delay(path)
+        internal, external = self._hops(path)
+        self.curr_internal_load += internal
+        self.curr_external_load += external
+    
+    @inheritdoc(DataCollector)
+    def content_path(self, path):
+        self.sess_latency += self.view.path_delay(path)
+        internal, external = self._hops(path)
+        self.curr_internal_load += self.sr*internal
+        self.curr_external_load += self.sr*external
+    
+    @inheritdoc(DataCollector)
+    def end_session(self, success=True):
+        if success:
+            self.curr_latency += self.sess_latency
+    
+    @inheritdoc(DataCollector)
+    def results(self):
+        self._flush_window()
+        last = self.curr_window
+        windows = np.arange(max(last - self.n_windows + 1, 0), last + 1)
+        slots = windows % self.n_windows
+        # Windows without sessions are not stored and their metrics are zero
+        stored = self.window_index[slots] == windows
+        def window_values(ring):
+            values = np.zeros(len(windows), dtype=ring.dtype)
+            values[stored] = ring[slots[stored]]
+            return values
+        sessions = window_values(self.sessions)
+        cache_hits = window_values(self.cache_hits)
+        hits = cache_hits + window_values(self.serv_hits)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hit_ratio = cache_hits/hits
+            latency = window_values(self.latency)/sessions
+        internal_load = window_values(self.internal_load) \
+                        / (self.window*max(self.n_internal_links, 1))
+        external_load = window_values(self.external_load) \
+                        / (self.window*max(self.n_external_links, 1))
+        t_start = self.t_start if self.t_start is not None else 0
+        return Tree({'WINDOW': self.window,
+                     'TIME': t_start + self.window*windows,
+                     'SESSIONS': sessions,
+                     'CACHE_HIT_RATIO': hit_ratio,
+                     'LATENCY': latency,
+                     'LINK_LOAD_INTERNAL': internal_load,
+                     'LINK_LOAD_EXTERNAL': external_load})
+
+
 @register_data_collector('TEST')
 class TestCollector(DataCollector):
     """Collector used for test cases only.
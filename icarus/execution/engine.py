@@ -5,14 +5,31 @@ experiments needs to be run, instantiates all the required classes and executes
 the experiment by iterating through the event provided by an event generator
 and providing them to a strategy instance. 
 """
+from __future__ import division
+import os
+import random
+import tempfile
+import collections
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 from icarus.execution import NetworkModel, NetworkView, NetworkController, CollectorProxy
 from icarus.registry import data_collector_register, strategy_register
+from icarus.util import Tree
 
 
-__all__ = ['exec_experiment']
+__all__ = [
+    'exec_experiment',
+    'WarmupDetector',
+    'save_warmup_snapshot',
+    'load_warmup_snapshot'
+           ]
 
 
-def exec_experiment(topology, events, strategy, collectors):
+def exec_experiment(topology, events, strategy, collectors, shortest_path=None,
+                    warmup_snapshot=None, warmup_detection=None):
     """
     Execute the simulation of a specific scenario
     
@@ -34,13 +51,29 @@ def exec_experiment(topology, events, strategy, collectors):
         The collectors to be used. It is a list of 2-tuples. Each tuple has as
         first element the name of the collector and as second element a
         dictionary of collector parameters
+    shortest_path : dict of dict, optional
+        The all-pair shortest paths of the topology. If not specified, they are
+        computed
+    warmup_snapshot : str, optional
+        Path of the snapshot of the state of the network at the end of the
+        warm-up phase, i.e. before the first logged event. If the snapshot
+        exists, the state of the network is restored from it and warm-up
+        events are skipped without being executed. Otherwise, the snapshot is
+        created when the measured phase starts
+    warmup_detection : dict, optional
+        If not *None*, the end of the warm-up phase is detected adaptively by
+        a *WarmupDetector* instantiated with the parameters of this
+        dictionary. Once the network is in steady state, the measured phase
+        starts, i.e. remaining warm-up events are executed and logged as
+        measured events. The number of warm-up requests executed before
+        steady state was detected is reported in the results under *WARMUP*
          
     Returns
     -------
     results : dict
         A dictionary with the aggregated simulation results from all collectors.
     """
-    model = NetworkModel(topology)
+    model = NetworkModel(topology, shortest_path)
     view = NetworkView(model)
     controller = NetworkController(model)
     
@@ -52,6 +85,220 @@ def exec_experiment(topology, events, strategy, collectors):
     str_name, str_params = strategy
     strategy_inst = strategy_register[str_name](view, controller, **str_params)
     
+    events = iter(events)
+    restore = warmup_snapshot is not None and os.path.exists(warmup_snapshot)
+    detector = None
+    if warmup_detection is not None and not restore:
+        detector = WarmupDetector(model, **warmup_detection)
+        controller.attach_warmup_monitor(detector)
+    # The snapshot is read first, since the length of the warm-up phase is
+    # known only from it if detected adaptively, but the network state is
+    # restored only when the measured phase starts, because workloads seed
+    # the random number generator when their first event is generated
+    snapshot = _read_warmup_snapshot(warmup_snapshot) if restore else None
+    warmup = snapshot[-1] if restore else None
+    n_warmup_snapshot = warmup['REQUESTS'] if warmup is not None else None
+    warmup_ended = False
+    n_warmup = 0
+    for time, event in events:
+        if event['log'] or n_warmup == n_warmup_snapshot \
+                or (detector is not None and detector.converged):
+            if detector is not None:
+                controller.detach_warmup_monitor()
+                warmup = Tree({'REQUESTS': n_warmup,
+                               'CONVERGED': detector.converged})
+            if restore:
+                _restore_warmup_snapshot(model, snapshot)
+            elif warmup_snapshot is not None:
+                save_warmup_snapshot(model, warmup_snapshot, warmup)
+            warmup_ended = not event['log']
+            strategy_inst.process_event(time, **dict(event, log=True))
+            break
+        if not restore:
+            strategy_inst.process_event(time, **event)
+        n_warmup += 1
+    if warmup_ended:
+        # Warm-up events following the end of the warm-up phase are measured
+        for time, event in events:
+            if not event['log']:
+                event = dict(event, log=True)
+            strategy_inst.process_event(time, **event)
     for time, event in events:
         strategy_inst.process_event(time, **event)
-    return collector.results()
+    results = collector.results()
+    if warmup is not None:
+        results['WARMUP'] = warmup
+    return results
+
+
+class WarmupDetector(object):
+    """Detect the end of the warm-up phase of an experiment, i.e. when the
+    network reaches a steady state.
+    
+    Warm-up requests are grouped into windows of a fixed number of requests.
+    At the end of each window, the detector measures the cache hit ratio of
+    the window and the occupancy of caches, i.e. the fraction of cache slots
+    filled. The network is considered in steady state when neither the hit
+    ratio nor the occupancy increased by more than a tolerance over the last
+    *n_windows* windows. Since both metrics increase while caches are being
+    filled, this happens when caches are full and their content is stable.
+    
+    The detector is notified of the start and the end of warm-up sessions and
+    of cache hits by the network controller, to which it must be attached with
+    *attach_warmup_monitor*.
+    """
+    
+    def __init__(self, model, window=10000, tolerance=0.01, n_windows=2):
+        """Constructor
+        
+        Parameters
+        ----------
+        model : NetworkModel
+            The network model
+        window : int, optional
+            The number of requests of a window
+        tolerance : float, optional
+            The maximum increase of the hit ratio and of the occupancy of
+            caches, over *n_windows* windows, in steady state
+        n_windows : int, optional
+            The number of windows over which the increase of metrics is
+            measured
+        """
+        if window <= 0:
+            raise ValueError('window must be positive')
+        if n_windows <= 0:
+            raise ValueError('n_windows must be positive')
+        self.model = model
+        self.window = window
+        self.tolerance = tolerance
+        self.n_windows = n_windows
+        self.capacity = sum(cache.maxlen for cache in model.caches.values())
+        self.converged = False
+        # Hit ratio and occupancy of the last n_windows + 1 windows
+        self.hit_ratios = collections.deque(maxlen=n_windows + 1)
+        self.occupancies = collections.deque(maxlen=n_windows + 1)
+        self.sess_count = 0
+        self.cache_hits = 0
+    
+    def start_session(self, timestamp, receiver, content):
+        """Notify the start of a warm-up session
+        
+        Parameters
+        ----------
+        timestamp : int
+            Timestamp of the event
+        receiver : any hashable type
+            The receiver node requesting a content
+        content : any hashable type
+            The content identifier requested by the receiver
+        """
+        self.sess_count += 1
+    
+    def cache_hit(self, node):
+        """Notify a cache hit during a warm-up session
+        
+        Parameters
+        ----------
+        node : any hashable type
+            The node whose cache is hit
+        """
+        self.cache_hits += 1
+    
+    def end_session(self, success=True):
+        """Notify the end of a warm-up session
+        
+        Parameters
+        ----------
+        success : bool, optional
+            *True* if the session was completed successfully, *False*
+            otherwise
+        """
+        if self.sess_count == self.window:
+            self._end_window()
+    
+    def _end_window(self):
+        """Measure metrics of the window just completed and check whether
+        the network is in steady state
+        """
+        self.hit_ratios.append(self.cache_hits/self.sess_count)
+        occupancy = sum(len(cache) for cache in self.model.caches.values())
+        self.occupancies.append(occupancy/self.capacity
+                                if self.capacity > 0 else 1.0)
+        self.sess_count = 0
+        self.cache_hits = 0
+        if len(self.hit_ratios) > self.n_windows and not self.converged:
+            self.converged = \
+                self.hit_ratios[-1] - self.hit_ratios[0] <= self.tolerance \
+                and self.occupancies[-1] - self.occupancies[0] <= self.tolerance
+
+
+def save_warmup_snapshot(model, path, warmup=None):
+    """Save the state of the network at the end of the warm-up phase
+    
+    The state comprises the content of all caches and the state of the random
+    number generator used by strategies. The snapshot is written to a
+    temporary file first and then renamed, so that processes concurrently
+    saving the same snapshot never read a partially written file.
+    
+    Parameters
+    ----------
+    model : NetworkModel
+        The network model
+    path : str
+        The path of the snapshot file
+    warmup : Tree, optional
+        The description of the warm-up phase reported in the results, if the
+        end of the warm-up phase was detected adaptively
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((model.caches, model.colla_table, random.getstate(),
+                         warmup), f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_warmup_snapshot(model, path):
+    """Restore the state of the network at the end of the warm-up phase from a
+    snapshot saved by *save_warmup_snapshot*
+    
+    Parameters
+    ----------
+    model : NetworkModel
+        The network model
+    path : str
+        The path of the snapshot file
+    
+    Returns
+    -------
+    warmup : Tree
+        The description of the warm-up phase passed to *save_warmup_snapshot*
+    """
+    return _restore_warmup_snapshot(model, _read_warmup_snapshot(path))
+
+
+def _read_warmup_snapshot(path):
+    """Read a snapshot saved by *save_warmup_snapshot*, returning a
+    (caches, colla_table, random_state, warmup) tuple
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _restore_warmup_snapshot(model, snapshot):
+    """Restore the state of the network from a snapshot read by
+    *_read_warmup_snapshot* and return the description of the warm-up phase
+    """
+    caches, colla_table, random_state, warmup = snapshot
+    # Objects are updated in place because they may be referenced by the view
+    # and the controller
+    model.caches.clear()
+    model.caches.update(caches)
+    model.colla_table.clear()
+    model.colla_table.update(colla_table)
+    random.setstate(random_state)
+    return warmup
@@ -4,6 +4,7 @@ import networkx as nx
 import fnss
 
 from icarus.registry import cache_policy_register
+from icarus.execution.paths import ShortestPaths, predecessor_matrix
 
 
 __all__ = [
@@ -62,6 +63,17 @@ class NetworkView(object):
             The node persistently storing the given content
         """
         return self.model.content_source[k]
+    
+    def content_ids(self):
+        """Return the identifiers of all contents of the catalogue, i.e. all
+        contents persistently stored by a source.
+        
+        Returns
+        -------
+        contents : list
+            The content identifiers
+        """
+        return list(self.model.content_source)
         
     def shortest_path(self, s, t):
         """Return the shortest path from *s* to *t*
@@ -78,9 +90,41 @@ class NetworkView(object):
         shortest_path : list
             List of nodes of the shortest path (origin and destination
             included)
+        
+        Notes
+        -----
+        Paths are materialized from the compact path store of the model the
+        first time they are requested.
         """
         return self.model.shortest_path[s][t]
 
+    def shortest_path_caches(self, s, t):
+        """Return the caching nodes located on the shortest path from *s* to
+        *t*, in the order in which they are traversed.
+        
+        Indexes of paths between receivers and sources are precomputed by the
+        network model. Indexes of other paths are computed on first request
+        and then stored.
+        
+        Parameters
+        ----------
+        s : any hashable type
+            Origin node
+        t : any hashable type
+            Destination node
+        
+        Returns
+        -------
+        caches : tuple
+            Caching nodes on the path, origin excluded
+        hops : tuple
+            Position of each caching node in the path returned by
+            *shortest_path(s, t)*, i.e. its distance in hops from *s*
+        delays : tuple
+            Cumulative delay from *s* to each caching node
+        """
+        return self.model.path_caches(s, t)
+
     def link_type(self, u, v):
         """Return the type of link *(u, v)*.
         
@@ -117,6 +161,31 @@ class NetworkView(object):
         """
         return self.model.link_delay[(u, v)]
     
+    def path_delay(self, path):
+        """Return the delay of a path, i.e. the sum of the delays of its links.
+        
+        Delays are memoized, so the delay of each path is computed only the
+        first time it is requested.
+        
+        Parameters
+        ----------
+        path : list
+            List of nodes of the path
+        
+        Returns
+        -------
+        delay : float
+            The path delay
+        """
+        key = tuple(path)
+        delay = self.model.path_delay.get(key)
+        if delay is None:
+            link_delay = self.model.link_delay
+            delay = sum(link_delay[(path[hop - 1], path[hop])]
+                        for hop in range(1, len(path)))
+            self.model.path_delay[key] = delay
+        return delay
+    
     def topology(self):
         """Return the network topology
         
@@ -156,16 +225,20 @@ class NetworkModel(object):
         topology : fnss.Topology
             The topology object
         shortest_path : dict of dict, optional
-            The all-pair shortest paths of the network
+            The all-pair shortest paths of the network. If not specified, they
+            are computed and stored in a compact *ShortestPaths* object
         """
         # Filter inputs
         if not isinstance(topology, fnss.Topology):
             raise ValueError('The topology argument must be an instance of '
                              'fnss.Topology or any of its subclasses.')
         
-        # Shortest paths of the network
+        # Shortest paths of the network. They are stored as a matrix of
+        # predecessors indexed by integer node identifiers rather than as a
+        # dict of dicts of lists, which requires O(N^2) Python objects
         self.shortest_path = shortest_path if shortest_path is not None \
-                             else nx.all_pairs_shortest_path(topology)
+                             else ShortestPaths(sorted(topology.nodes_iter()),
+                                                predecessor_matrix(topology))
         
         # Network topology
         self.topology = topology
@@ -180,9 +253,22 @@ class NetworkModel(object):
         self.colla_table = {}
 
         # Dictionary of link types (internal/external)
-        self.link_type = nx.get_edge_attributes(topology.to_directed(), 'type')
+        self.link_type = nx.get_edge_attributes(topology, 'type')
+        
+        self.link_delay = fnss.get_delays(topology)
         
-        self.link_delay = fnss.get_delays(topology.to_directed())
+        # Delays of the paths traversed, keyed by tuple of nodes, memoized by
+        # NetworkView.path_delay
+        self.path_delay = {}
+        
+        # Both are keyed by directed link. They are not read from a directed
+        # copy of the topology, which would deep copy all node attributes,
+        # including the content lists of sources
+        if not topology.is_directed():
+            for (u, v), link_type in self.link_type.items():
+                self.link_type[(v, u)] = link_type
+            for (u, v), delay in self.link_delay.items():
+                self.link_delay[(v, u)] = delay
         
         policy_name = topology.graph['cache_policy']
         # Initialize attributes
@@ -201,6 +287,82 @@ class NetworkModel(object):
         # The actual cache object storing the content
         self.caches = dict((node, cache_policy_register[policy_name](cache_size[node]))
                             for node in cache_size)
+        
+        # Index of caching nodes on the shortest paths, keyed by (origin,
+        # destination). It is precomputed for all paths between receivers and
+        # sources in both directions, which are those traversed by on-path
+        # strategies
+        self.shortest_path_caches = {}
+        receivers = [v for v in topology.nodes_iter()
+                     if fnss.get_stack(topology, v)[0] == 'receiver']
+        sources = set(self.content_source.values())
+        for r in receivers:
+            for s in sources:
+                self.shortest_path_caches[(r, s)] = \
+                        self._index_path_caches(self.shortest_path[r][s])
+                self.shortest_path_caches[(s, r)] = \
+                        self._index_path_caches(self.shortest_path[s][r])
+    
+    def path_caches(self, s, t):
+        """Return the caching nodes located on the shortest path from *s* to
+        *t*, their positions in the path and their cumulative delays from *s*.
+        
+        Indexes of paths not precomputed are computed on first request and
+        then stored.
+        
+        Parameters
+        ----------
+        s : any hashable type
+            Origin node
+        t : any hashable type
+            Destination node
+        
+        Returns
+        -------
+        caches : tuple
+            Caching nodes on the path, origin excluded
+        hops : tuple
+            Position of each caching node in the path
+        delays : tuple
+            Cumulative delay from *s* to each caching node
+        """
+        if (s, t) not in self.shortest_path_caches:
+            self.shortest_path_caches[(s, t)] = \
+                    self._index_path_caches(self.shortest_path[s][t])
+        return self.shortest_path_caches[(s, t)]
+    
+    def _index_path_caches(self, path):
+        """Return the caching nodes located on a path, their positions in
+        the path and their cumulative delays from the first node of the path.
+        
+        Parameters
+        ----------
+        path : list
+            List of nodes of the path
+        
+        Returns
+        -------
+        caches : tuple
+            Caching nodes on the path, first node excluded
+        hops : tuple
+            Position of each caching node in the path
+        delays : tuple
+            Cumulative delay from the first node of the path to each caching
+            node
+        """
+        caches = []
+        hops = []
+        delays = []
+        delay = 0
+        for hop in range(1, len(path)):
+            v = path[hop]
+            # Links with no delay attribute do not contribute to the delay
+            delay += self.link_delay.get((path[hop - 1], v), 0)
+            if v in self.cache_size:
+                caches.append(v)
+                hops.append(hop)
+                delays.append(delay)
+        return tuple(caches), tuple(hops), tuple(delays)
 
 
 class NetworkController(object):
@@ -218,6 +380,7 @@ class NetworkController(object):
         self.session = None
         self.model = model
         self.collector = None
+        self.warmup_monitor = None
     
     
     def attach_collector(self, collector):
@@ -235,6 +398,24 @@ class NetworkController(object):
         """
         self.collector = None
     
+    def attach_warmup_monitor(self, monitor):
+        """Attaches a monitor to which the start and the end of sessions and
+        cache hits are reported during the warm-up phase, i.e. for sessions
+        which are not reported to the data collector.
+        
+        Parameters
+        ----------
+        monitor : WarmupDetector
+            The monitor, which must implement the *start_session*,
+            *cache_hit* and *end_session* methods of a data collector
+        """
+        self.warmup_monitor = monitor
+    
+    def detach_warmup_monitor(self):
+        """Detaches the warm-up monitor.
+        """
+        self.warmup_monitor = None
+    
     def start_session(self, timestamp, receiver, content, log):
         """Instruct the controller to start a new session (i.e. the retrieval
         of a content).
@@ -257,6 +438,8 @@ class NetworkController(object):
                             log=log)
         if self.collector is not None and self.session['log']:
             self.collector.start_session(timestamp, receiver, content)
+        elif self.warmup_monitor is not None and not log:
+            self.warmup_monitor.start_session(timestamp, receiver, content)
     
     def forward_request_path(self, s, t, path=None):
         """Forward a request from node *s* to node *t* over the provided path.
@@ -272,10 +455,9 @@ class NetworkController(object):
         """
         if path is None:
             path = self.model.shortest_path[s][t]
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.forward_request_hop(u, v)
+        if len(path) > 1 and self.collector is not None \
+                and self.session['log']:
+            self.collector.request_path(path)
     
     def forward_content_path(self, u, v, path=None):
         """Forward a content from node *s* to node *t* over the provided path.
@@ -291,10 +473,9 @@ class NetworkController(object):
         """
         if path is None:
             path = self.model.shortest_path[u][v]
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.forward_content_hop(u, v)
+        if len(path) > 1 and self.collector is not None \
+                and self.session['log']:
+            self.collector.content_path(path)
     
     def forward_request_hop(self, u, v):
         """Forward a request over link  u -> v.
@@ -393,9 +574,12 @@ class NetworkController(object):
             if cache_hit:
                 if self.session['log']:
                     self.collector.cache_hit(node)
+                elif self.warmup_monitor is not None:
+                    self.warmup_monitor.cache_hit(node)
             return cache_hit
-        name, props = fnss.get_stack(self.model.topology, node)
-        if name == 'source' and self.session['content'] in props['contents']:
+        # Sources are looked up in the content source index rather than in
+        # the list of contents of the node, which takes linear time
+        if self.model.content_source.get(self.session['content']) == node:
             if self.collector is not None and self.session['log']:
                 self.collector.server_hit(node)
             return True
@@ -412,6 +596,8 @@ class NetworkController(object):
         """
         if self.collector is not None and self.session['log']:
             self.collector.end_session(success)
+        elif self.warmup_monitor is not None and not self.session['log']:
+            self.warmup_monitor.end_session(success)
         self.session = None
 
     def remove_link(self, u, v):
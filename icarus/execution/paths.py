@@ -0,0 +1,229 @@
+"""Compact storage of all-pair shortest paths and their persistent cache.
+
+Shortest paths are stored as a matrix of predecessors: the element *(i, j)* of
+the matrix is the index of the node preceding node *j* on the shortest path
+from node *i* to node *j*. Nodes are indexed according to their sorted order.
+Since the shortest paths computed from a single source form a tree, this
+matrix is sufficient to rebuild all shortest paths, which are materialized
+only when requested.
+
+Predecessor matrices can be cached on disk, keyed by a fingerprint of the
+topology, and loaded with memory mapping, so that experiments run on the same
+topology do not need to recompute shortest paths.
+"""
+import os
+import errno
+import hashlib
+import tempfile
+import collections
+
+import numpy as np
+import networkx as nx
+
+
+__all__ = [
+    'ShortestPaths',
+    'topology_fingerprint',
+    'predecessor_matrix',
+    'load_shortest_paths',
+          ]
+
+
+# Version of the format of shortest path cache files. It must be updated
+# every time the format changes so that stale files are not loaded
+_FORMAT_VERSION = 1
+
+
+def topology_fingerprint(topology):
+    """Return a fingerprint of a topology, identifying its nodes, edges and
+    weights.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+
+    Returns
+    -------
+    fingerprint : str
+        Hexadecimal digest of the topology
+    """
+    directed = topology.is_directed()
+    edges = []
+    for u, v, data in topology.edges_iter(data=True):
+        if not directed and v < u:
+            u, v = v, u
+        edges.append((u, v, data.get('weight', 1)))
+    h = hashlib.sha1()
+    h.update(repr((_FORMAT_VERSION, directed, sorted(topology.nodes_iter()),
+                   sorted(edges))))
+    return h.hexdigest()
+
+
+def predecessor_matrix(topology):
+    """Compute the predecessor matrix of all-pair shortest paths of a topology
+
+    Paths are the same returned by *networkx.all_pairs_shortest_path*.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+
+    Returns
+    -------
+    pred : Numpy array
+        The predecessor matrix. Nodes are indexed according to their sorted
+        order. The predecessor of a node on the path from itself is the node
+        itself. If there is no path between two nodes, the predecessor is -1
+    """
+    nodes = sorted(topology.nodes_iter())
+    index = dict((v, i) for i, v in enumerate(nodes))
+    dtype = np.int16 if len(nodes) < 2 ** 15 else np.int32
+    pred = np.empty((len(nodes), len(nodes)), dtype=dtype)
+    pred.fill(-1)
+    for i, s in enumerate(nodes):
+        for t, path in nx.single_source_shortest_path(topology, s).iteritems():
+            pred[i, index[t]] = index[path[-2]] if len(path) > 1 else i
+    return pred
+
+
+class ShortestPaths(collections.Mapping):
+    """All-pair shortest paths of a network stored as a predecessor matrix.
+
+    This object can be used as the dict of dicts returned by
+    *networkx.all_pairs_shortest_path*, i.e. *shortest_paths[s][t]* returns
+    the list of nodes of the shortest path from *s* to *t*. Paths are
+    materialized when first requested and then memoized.
+    """
+
+    def __init__(self, nodes, pred):
+        """Constructor
+
+        Parameters
+        ----------
+        nodes : list
+            The nodes of the network, sorted
+        pred : Numpy array
+            The predecessor matrix, as returned by *predecessor_matrix*
+        """
+        if pred.shape != (len(nodes), len(nodes)):
+            raise ValueError('The shape of the predecessor matrix does not '
+                             'match the number of nodes')
+        self._nodes = nodes
+        self._index = dict((v, i) for i, v in enumerate(nodes))
+        self._pred = pred
+        self._rows = {}
+
+    def __getitem__(self, s):
+        if s not in self._rows:
+            self._rows[s] = _ShortestPathsRow(self, self._index[s])
+        return self._rows[s]
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, s):
+        return s in self._index
+
+    def path(self, s, t):
+        """Return the shortest path between two nodes, without memoizing it
+
+        Parameters
+        ----------
+        s : any hashable type
+            Origin node
+        t : any hashable type
+            Destination node
+
+        Returns
+        -------
+        path : list
+            List of nodes of the shortest path from *s* to *t*
+        """
+        return self._path(self._index[s], self._index[t])
+
+    def _path(self, i, j):
+        pred = self._pred[i]
+        if pred[j] < 0:
+            raise KeyError('No path from %s to %s'
+                           % (self._nodes[i], self._nodes[j]))
+        path = [self._nodes[j]]
+        while j != i:
+            j = pred[j]
+            path.append(self._nodes[j])
+        path.reverse()
+        return path
+
+
+class _ShortestPathsRow(collections.Mapping):
+    """Shortest paths from a single origin node
+    """
+
+    def __init__(self, shortest_paths, i):
+        self._sp = shortest_paths
+        self._i = i
+        self._paths = {}
+
+    def __getitem__(self, t):
+        if t not in self._paths:
+            self._paths[t] = self._sp._path(self._i, self._sp._index[t])
+        return self._paths[t]
+
+    def __iter__(self):
+        nodes = self._sp._nodes
+        return (nodes[j] for j in np.flatnonzero(self._sp._pred[self._i] >= 0))
+
+    def __len__(self):
+        return int(np.count_nonzero(self._sp._pred[self._i] >= 0))
+
+    def __contains__(self, t):
+        j = self._sp._index.get(t)
+        return j is not None and self._sp._pred[self._i][j] >= 0
+
+
+def load_shortest_paths(topology, cache_dir):
+    """Return the all-pair shortest paths of a topology, reading them from a
+    cache directory if previously computed.
+
+    If the shortest paths of the topology are not cached, they are computed
+    and saved in the cache directory. Cached predecessor matrices are loaded
+    with memory mapping, so that they are read from disk only when needed and
+    shared by all processes using them.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+    cache_dir : str
+        The directory where shortest paths are cached. It is created if it
+        does not exist
+
+    Returns
+    -------
+    shortest_paths : ShortestPaths
+        The shortest paths of the topology
+    """
+    path = os.path.join(cache_dir, '%s.npy' % topology_fingerprint(topology))
+    if not os.path.exists(path):
+        try:
+            os.makedirs(cache_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        # Write to a temporary file first and then rename it, so that
+        # processes concurrently computing the same matrix never read a
+        # partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, predecessor_matrix(topology))
+            os.rename(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    pred = np.load(path, mmap_mode='r')
+    return ShortestPaths(sorted(topology.nodes_iter()), pred)
@@ -0,0 +1,225 @@
+import sys
+if sys.version_info[:2] >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise ImportError("The unittest2 package is needed to run the tests.")
+del sys
+
+import networkx as nx
+import numpy as np
+import fnss
+
+from icarus.execution import NetworkModel, NetworkView, DataCollector, \
+                             CollectorProxy, LatencyCollector, \
+                             LinkLoadCollector, CacheHitRatioCollector, \
+                             TimeWindowCollector
+
+
+class HopCollector(DataCollector):
+
+    def __init__(self, view):
+        self.view = view
+        self.hops = []
+
+    def request_hop(self, u, v):
+        self.hops.append(('request', u, v))
+
+    def content_hop(self, u, v):
+        self.hops.append(('content', u, v))
+
+
+class InheritedHopCollector(HopCollector):
+    pass
+
+
+class PathCollector(DataCollector):
+
+    def __init__(self, view):
+        self.view = view
+        self.paths = []
+
+    def request_path(self, path):
+        self.paths.append(('request', list(path)))
+
+    def content_path(self, path):
+        self.paths.append(('content', list(path)))
+
+
+class TestCollectorProxy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        topology = fnss.Topology(nx.path_graph(4))
+        fnss.set_delays_constant(topology, 2, 'ms')
+        topology.edge[2][3]['delay'] = 5
+        for u, v in topology.edges_iter():
+            topology.edge[u][v]['type'] = 'internal'
+        topology.edge[2][3]['type'] = 'external'
+        for v in topology.nodes_iter():
+            fnss.add_stack(topology, v, 'router')
+        topology.graph['cache_policy'] = 'LRU'
+        cls.view = NetworkView(NetworkModel(topology))
+
+    def test_path_to_hops(self):
+        collectors = [HopCollector(self.view),
+                      InheritedHopCollector(self.view)]
+        proxy = CollectorProxy(self.view, collectors)
+        proxy.request_path([0, 1, 2])
+        proxy.content_path([2, 1, 0])
+        proxy.request_hop(2, 3)
+        for c in collectors:
+            self.assertEquals([('request', 0, 1), ('request', 1, 2),
+                               ('content', 2, 1), ('content', 1, 0),
+                               ('request', 2, 3)], c.hops)
+
+    def test_hops_to_path(self):
+        collector = PathCollector(self.view)
+        proxy = CollectorProxy(self.view, [collector])
+        proxy.request_path([0, 1, 2])
+        proxy.request_hop(2, 3)
+        proxy.content_hop(3, 2)
+        self.assertEquals([('request', [0, 1, 2]), ('request', [2, 3]),
+                           ('content', [3, 2])], collector.paths)
+        self.assertEquals([], proxy.collectors['cache_hit'])
+
+    def test_latency(self):
+        collector = LatencyCollector(self.view)
+        proxy = CollectorProxy(self.view, [collector])
+        proxy.start_session(0, 0, 1)
+        proxy.request_path([0, 1, 2, 3])
+        proxy.content_hop(3, 2)
+        proxy.content_path([2, 1, 0])
+        proxy.end_session()
+        self.assertEquals(18, collector.results()['MEAN'])
+        self.assertEquals(9, self.view.path_delay([0, 1, 2, 3]))
+        self.assertEquals(0, self.view.path_delay([1]))
+
+    def test_latency_cdf(self):
+        collector = LatencyCollector(self.view, cdf=True)
+        proxy = CollectorProxy(self.view, [collector])
+        for path in ([0, 1], [0, 1, 2], [0, 1], [0, 1, 2, 3]):
+            proxy.start_session(0, 0, 1)
+            proxy.request_path(path)
+            proxy.content_path(path[::-1])
+            proxy.end_session()
+        results = collector.results()
+        self.assertEquals(4, len(results['HISTOGRAM']))
+        self.assertAlmostEqual(4, results['P50'], delta=0.04)
+        self.assertAlmostEqual(8, results['P99'], delta=0.08)
+        x, cdf = results['CDF']
+        self.assertEquals(3, len(x))
+        self.assertEquals([0.5, 0.75, 1.0], list(cdf))
+
+    def test_link_load(self):
+        collector = LinkLoadCollector(self.view, sr=4)
+        collector.MAX_PATHS = 2
+        proxy = CollectorProxy(self.view, [collector])
+        proxy.start_session(2, 0, 1)
+        for _ in range(3):
+            proxy.request_path([0, 1, 2, 3])
+            proxy.content_path([3, 2, 1])
+        proxy.request_hop(1, 0)
+        proxy.content_hop(1, 0)
+        proxy.start_session(4, 0, 1)
+        proxy.request_path([1, 2])
+        proxy.request_path([3, 2])
+        results = collector.results()
+        # Links only traversed by contents, e.g. (2, 1), are not reported
+        self.assertEquals({(0, 1): 1.5, (1, 2): 2.0, (1, 0): 2.5},
+                          results['PER_LINK_INTERNAL'])
+        self.assertEquals({(2, 3): 1.5, (3, 2): 6.5},
+                          results['PER_LINK_EXTERNAL'])
+        self.assertEquals(2.0, results['MEAN_INTERNAL'])
+        self.assertEquals(4.0, results['MEAN_EXTERNAL'])
+
+    def run_time_window(self, collector):
+        proxy = CollectorProxy(self.view, [collector])
+        proxy.start_session(3, 0, 1)
+        proxy.request_path([0, 1, 2, 3])
+        proxy.server_hit(3)
+        proxy.content_path([3, 2, 1, 0])
+        proxy.end_session()
+        proxy.start_session(8, 0, 1)
+        proxy.request_hop(0, 1)
+        proxy.cache_hit(1)
+        proxy.content_hop(1, 0)
+        proxy.end_session()
+        proxy.start_session(28, 0, 1)
+        proxy.request_path([0, 1])
+        proxy.cache_hit(1)
+        proxy.content_path([1, 0])
+        proxy.end_session()
+        return collector.results()
+
+    def test_time_window(self):
+        results = self.run_time_window(TimeWindowCollector(self.view,
+                                                           window=10, sr=4))
+        self.assertEquals([3, 13, 23], list(results['TIME']))
+        self.assertEquals([2, 0, 1], list(results['SESSIONS']))
+        np.testing.assert_equal([0.5, np.nan, 1.0],
+                                results['CACHE_HIT_RATIO'])
+        np.testing.assert_equal([11.0, np.nan, 4.0], results['LATENCY'])
+        np.testing.assert_equal([0.375, 0.0, 0.125],
+                                results['LINK_LOAD_INTERNAL'])
+        np.testing.assert_equal([0.25, 0.0, 0.0],
+                                results['LINK_LOAD_EXTERNAL'])
+
+    def test_time_window_ring(self):
+        results = self.run_time_window(TimeWindowCollector(self.view,
+                                                           window=10,
+                                                           n_windows=2))
+        self.assertEquals([13, 23], list(results['TIME']))
+        self.assertEquals([0, 1], list(results['SESSIONS']))
+
+
+class TestCacheHitRatioCollector(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        topology = fnss.Topology(nx.path_graph(3))
+        fnss.add_stack(topology, 0, 'receiver')
+        fnss.add_stack(topology, 1, 'cache', {'size': 2})
+        fnss.add_stack(topology, 2, 'source', {'contents': [1, 2, 3, 4]})
+        topology.graph['cache_policy'] = 'LRU'
+        cls.view = NetworkView(NetworkModel(topology))
+
+    def test_content_hits(self):
+        collector = CacheHitRatioCollector(self.view, content_hits=True)
+        for content, node in ((1, 2), (1, 1), (1, 1), (1, 1), (3, 2)):
+            collector.start_session(0, 0, content)
+            if node == 2:
+                collector.server_hit(node)
+            else:
+                collector.cache_hit(node)
+        results = collector.results()
+        self.assertEquals(0.6, results['MEAN'])
+        self.assertEquals(0.0, results['MEAN_OFF_PATH'])
+        per_content = results['PER_CONTENT']
+        self.assertEquals(5, len(per_content))
+        self.assertEquals([0.75, 0.0], list(per_content[[1, 3]]))
+        self.assertTrue(np.all(np.isnan(per_content[[0, 2, 4]])))
+
+    def test_content_hits_invalid_contents(self):
+        topology = fnss.Topology(nx.path_graph(3))
+        fnss.add_stack(topology, 0, 'receiver')
+        fnss.add_stack(topology, 1, 'cache', {'size': 2})
+        fnss.add_stack(topology, 2, 'source', {'contents': ['a', 'b']})
+        topology.graph['cache_policy'] = 'LRU'
+        view = NetworkView(NetworkModel(topology))
+        self.assertRaises(ValueError, CacheHitRatioCollector, view,
+                          content_hits=True)
+        # Per-content hits are not recorded by default
+        CacheHitRatioCollector(view)
+
+    def test_content_hits_no_contents(self):
+        topology = fnss.Topology(nx.path_graph(3))
+        fnss.add_stack(topology, 0, 'receiver')
+        fnss.add_stack(topology, 1, 'cache', {'size': 2})
+        fnss.add_stack(topology, 2, 'source', {'contents': []})
+        topology.graph['cache_policy'] = 'LRU'
+        view = NetworkView(NetworkModel(topology))
+        self.assertRaises(ValueError, CacheHitRatioCollector, view,
+                          content_hits=True)
@@ -0,0 +1,115 @@
+import sys
+if sys.version_info[:2] >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise ImportError("The unittest2 package is needed to run the tests.")
+del sys
+
+import os
+import shutil
+import tempfile
+
+import networkx as nx
+import fnss
+
+from icarus.execution import NetworkModel, exec_experiment, WarmupDetector
+from icarus.scenarios import topology_path, uniform_req_gen
+
+
+class TestWarmupDetector(unittest.TestCase):
+
+    def setUp(self):
+        topology = fnss.Topology(nx.path_graph(3))
+        fnss.add_stack(topology, 0, 'receiver')
+        fnss.add_stack(topology, 1, 'cache', {'size': 4})
+        fnss.add_stack(topology, 2, 'source', {'contents': range(1, 11)})
+        topology.graph['cache_policy'] = 'LRU'
+        self.model = NetworkModel(topology)
+        self.cache = self.model.caches[1]
+
+    def run_window(self, detector, cache_hits, contents=()):
+        # Metrics of a window are measured at the end of its last session
+        for content in contents:
+            self.cache.put(content)
+        for i in range(detector.window):
+            detector.start_session(i, 0, 1)
+            if i < cache_hits:
+                detector.cache_hit(1)
+            detector.end_session()
+
+    def test_occupancy_increase(self):
+        detector = WarmupDetector(self.model, window=10, tolerance=0.1,
+                                  n_windows=2)
+        self.run_window(detector, 0, [1, 2])
+        self.run_window(detector, 2, [3])
+        self.run_window(detector, 3, [4])
+        self.assertFalse(detector.converged)
+        # Occupancy increased by 0.25 in the last two windows
+        self.run_window(detector, 3)
+        self.assertFalse(detector.converged)
+        self.run_window(detector, 3)
+        self.assertTrue(detector.converged)
+        self.assertEquals([0.3, 0.3, 0.3], list(detector.hit_ratios))
+        self.assertEquals([1.0, 1.0, 1.0], list(detector.occupancies))
+
+    def test_hit_ratio_increase(self):
+        detector = WarmupDetector(self.model, window=10, tolerance=0.05,
+                                  n_windows=1)
+        self.run_window(detector, 1, [1, 2, 3, 4])
+        self.run_window(detector, 3)
+        self.run_window(detector, 4)
+        self.assertFalse(detector.converged)
+        self.run_window(detector, 4)
+        self.assertTrue(detector.converged)
+
+
+class TestExecExperiment(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_experiment(self, warmup_detection, warmup_snapshot=None):
+        topology = topology_path(network_cache=0.1, n_contents=100, seed=1)
+        topology.graph['cache_policy'] = 'LRU'
+        events = uniform_req_gen(topology, 100, 0.8, n_warmup=5000,
+                                 n_measured=1000, seed=1)
+        # A single time window counts all measured requests
+        return exec_experiment(topology, events, ('LCE', {}),
+                               [('CACHE_HIT_RATIO', {}),
+                                ('TIME_WINDOW', {'window': 10.0 ** 6})],
+                               warmup_snapshot=warmup_snapshot,
+                               warmup_detection=warmup_detection)
+
+    def test_no_warmup_detection(self):
+        results = self.run_experiment(None)
+        self.assertFalse('WARMUP' in results)
+        self.assertEquals([1000], list(results['TIME_WINDOW']['SESSIONS']))
+
+    def test_warmup_detection(self):
+        results = self.run_experiment({'window': 500, 'tolerance': 0.2})
+        self.assertTrue(results['WARMUP']['CONVERGED'])
+        n_warmup = results['WARMUP']['REQUESTS']
+        self.assertTrue(1000 < n_warmup < 5000)
+        self.assertEquals(0, n_warmup % 500)
+        self.assertTrue(results['CACHE_HIT_RATIO']['MEAN'] > 0)
+        # Warm-up requests following steady state are measured
+        self.assertEquals([6000 - n_warmup],
+                          list(results['TIME_WINDOW']['SESSIONS']))
+
+    def test_warmup_detection_snapshot(self):
+        warmup_detection = {'window': 500, 'tolerance': 0.2}
+        path = os.path.join(self.tmp_dir, 'warmup.pickle')
+        results = self.run_experiment(warmup_detection, path)
+        self.assertTrue(os.path.exists(path))
+        restored = self.run_experiment(warmup_detection, path)
+        self.assertEquals(results['WARMUP'], restored['WARMUP'])
+        self.assertEquals(results['CACHE_HIT_RATIO'],
+                          restored['CACHE_HIT_RATIO'])
+        self.assertEquals(list(results['TIME_WINDOW']['SESSIONS']),
+                          list(restored['TIME_WINDOW']['SESSIONS']))
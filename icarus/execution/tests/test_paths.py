@@ -0,0 +1,84 @@
+import sys
+if sys.version_info[:2] >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise ImportError("The unittest2 package is needed to run the tests.")
+del sys
+import os
+import shutil
+import tempfile
+
+import networkx as nx
+import fnss
+
+from icarus.execution import ShortestPaths, topology_fingerprint, \
+                             predecessor_matrix, load_shortest_paths
+
+
+class TestShortestPaths(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.topology = fnss.Topology(nx.barabasi_albert_graph(60, 2, seed=1))
+        cls.topology.add_nodes_from([60, 61])
+        cls.topology.add_edge(60, 61)
+        cls.nodes = sorted(cls.topology.nodes_iter())
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_equal_paths(self, shortest_paths):
+        expected = nx.all_pairs_shortest_path(self.topology)
+        self.assertEquals(set(expected), set(shortest_paths))
+        for s in expected:
+            self.assertEquals(set(expected[s]), set(shortest_paths[s]))
+            self.assertEquals(len(expected[s]), len(shortest_paths[s]))
+            for t in expected[s]:
+                self.assertEquals(expected[s][t], shortest_paths[s][t])
+                self.assertEquals(expected[s][t], shortest_paths.path(s, t))
+
+    def test_predecessor_matrix(self):
+        pred = predecessor_matrix(self.topology)
+        self.assert_equal_paths(ShortestPaths(self.nodes, pred))
+
+    def test_no_path(self):
+        shortest_paths = ShortestPaths(self.nodes,
+                                       predecessor_matrix(self.topology))
+        self.assertFalse(60 in shortest_paths[0])
+        self.assertRaises(KeyError, shortest_paths[0].__getitem__, 60)
+        self.assertRaises(KeyError, shortest_paths.path, 0, 60)
+        self.assertEquals([60, 61], shortest_paths[60][61])
+
+    def test_load(self):
+        shortest_paths = load_shortest_paths(self.topology, self.tmp_dir)
+        self.assert_equal_paths(shortest_paths)
+        self.assertEquals(['%s.npy' % topology_fingerprint(self.topology)],
+                          os.listdir(self.tmp_dir))
+        self.assert_equal_paths(load_shortest_paths(self.topology,
+                                                    self.tmp_dir))
+
+    def test_load_missing_dir(self):
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.assert_equal_paths(load_shortest_paths(self.topology, cache_dir))
+        self.assertTrue(os.path.isdir(cache_dir))
+
+    def test_fingerprint(self):
+        topology = self.topology.copy()
+        self.assertEquals(topology_fingerprint(self.topology),
+                          topology_fingerprint(topology))
+        topology.edge[60][61]['weight'] = 2
+        self.assertNotEquals(topology_fingerprint(self.topology),
+                             topology_fingerprint(topology))
+        topology.remove_edge(60, 61)
+        topology.add_edge(61, 60)
+        self.assertEquals(topology_fingerprint(self.topology),
+                          topology_fingerprint(topology))
+        topology.add_edge(0, 60)
+        self.assertNotEquals(topology_fingerprint(self.topology),
+                             topology_fingerprint(topology))
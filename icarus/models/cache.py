@@ -4,6 +4,8 @@ This module contains the implementations of all the cache replacement policies
 provided by Icarus.
 """
 from collections import deque
+from array import array
+import heapq
 import random
 import abc
 import copy
@@ -16,6 +18,7 @@ from icarus.registry import register_cache_policy
 
 __all__ = [
         'LinkedSet',
+        'ArrayLinkedSet',
         'Cache',
         'NullCache',
         'LruCache',
@@ -444,6 +447,453 @@ class LinkedSet(object):
         self._map.clear()
 
 
+class ArrayLinkedSet(object):
+    """A compact doubly-linked set, functionally equivalent to
+    :class:`LinkedSet` but backed by arrays instead of node objects.
+
+    Each item is assigned a slot. The up and down links of all slots are stored
+    in two parallel arrays of machine integers, the items in a list and a
+    dictionary maps each item to its slot. Slots of removed items are recycled
+    through a free list threaded through the array of down links, so that no
+    memory is allocated after the set reaches its steady-state size.
+
+    Compared to :class:`LinkedSet`, this implementation does not allocate a
+    Python object per item, which considerably reduces memory footprint and
+    garbage collection time for large caches. All operations keep the same
+    time complexity.
+    """
+
+    # Value used in the up and down arrays to indicate that there is no
+    # linked slot
+    _NIL = -1
+
+    def __init__(self, iterable=[], capacity=0):
+        """Constructor
+
+        Parameters
+        ----------
+        iterable : iterable type
+            An iterable type to inizialize the data structure.
+            It must contain only one instance of each element
+        capacity : int, optional
+            Number of slots to preallocate. The set grows beyond this value
+            if needed, but preallocating avoids reallocations of the
+            underlying arrays.
+        """
+        self._top = self._NIL
+        self._bottom = self._NIL
+        self._map = {}
+        self._init_slots(capacity)
+        if iterable:
+            if len(set(iterable)) < len(iterable):
+                raise ValueError('The iterable parameter contains repeated '
+                                 'elements')
+            for i in iterable:
+                self.append_bottom(i)
+
+    def _init_slots(self, capacity):
+        """Allocate *capacity* slots and chain all of them in the free list
+        """
+        self._val = [None] * capacity
+        self._up = array('i', [self._NIL]) * capacity
+        self._down = array('i', range(1, capacity + 1))
+        if capacity > 0:
+            self._down[-1] = self._NIL
+        self._free = 0 if capacity > 0 else self._NIL
+
+    def _alloc(self, k):
+        """Store an item in a free slot and return the slot index
+        """
+        slot = self._free
+        if slot == self._NIL:
+            slot = len(self._val)
+            self._val.append(k)
+            self._up.append(self._NIL)
+            self._down.append(self._NIL)
+        else:
+            self._free = self._down[slot]
+            self._val[slot] = k
+        self._map[k] = slot
+        return slot
+
+    def _release(self, k):
+        """Remove an item from the map and return its slot to the free list
+        """
+        slot = self._map.pop(k)
+        self._val[slot] = None
+        self._down[slot] = self._free
+        self._free = slot
+
+    def _unlink(self, n):
+        """Detach slot *n* from the list without releasing it
+        """
+        up = self._up[n]
+        down = self._down[n]
+        if up == self._NIL:
+            self._top = down
+        else:
+            self._down[up] = down
+        if down == self._NIL:
+            self._bottom = up
+        else:
+            self._up[down] = up
+
+    def _link_above(self, n, m):
+        """Link slot *n* (already detached) right above slot *m*
+        """
+        up = self._up[m]
+        self._up[n] = up
+        self._down[n] = m
+        self._up[m] = n
+        if up == self._NIL:
+            self._top = n
+        else:
+            self._down[up] = n
+
+    def _link_below(self, n, m):
+        """Link slot *n* (already detached) right below slot *m*
+        """
+        down = self._down[m]
+        self._up[n] = m
+        self._down[n] = down
+        self._down[m] = n
+        if down == self._NIL:
+            self._bottom = n
+        else:
+            self._up[down] = n
+
+    def _link_top(self, n):
+        """Link slot *n* (already detached) at the top of the list
+        """
+        if self._top == self._NIL:
+            self._up[n] = self._down[n] = self._NIL
+            self._top = self._bottom = n
+        else:
+            self._link_above(n, self._top)
+
+    def _link_bottom(self, n):
+        """Link slot *n* (already detached) at the bottom of the list
+        """
+        if self._bottom == self._NIL:
+            self._up[n] = self._down[n] = self._NIL
+            self._top = self._bottom = n
+        else:
+            self._link_below(n, self._bottom)
+
+    def __len__(self):
+        """Return the number of elements in the linked set
+
+        Returns
+        -------
+        len : int
+            The length of the set
+        """
+        return len(self._map)
+
+    def __iter__(self):
+        """Return an iterator over the set
+
+        Returns
+        -------
+        iter : iterator
+            An iterator over the set
+        """
+        cur = self._top
+        while cur != self._NIL:
+            yield self._val[cur]
+            cur = self._down[cur]
+
+    def __reversed__(self):
+        """Return a reverse iterator over the set
+
+        Returns
+        -------
+        reversed : iterator
+            A reverse iterator over the set
+        """
+        cur = self._bottom
+        while cur != self._NIL:
+            yield self._val[cur]
+            cur = self._up[cur]
+
+    def __str__(self):
+        """Return a string representation of the set
+
+        Returns
+        -------
+        str : str
+            A string representation of the set
+        """
+        return self.__class__.__name__ + "([" + "".join("%s, " % str(i) for i in self)[:-2] + "])"
+
+    def __contains__(self, k):
+        """Return whether the set contains a given item
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to search
+
+        Returns
+        -------
+        contains : bool
+            *True* if the set contains the item, *False* otherwise
+        """
+        return k in self._map
+
+    @property
+    def top(self):
+        """Return the item at the top of the set
+
+        Returns
+        -------
+        top : any hashable type
+            The item at the top or *None* if the set is empty
+        """
+        return self._val[self._top] if self._top != self._NIL else None
+
+    @property
+    def bottom(self):
+        """Return the item at the bottom of the set
+
+        Returns
+        -------
+        bottom : any hashable type
+            The item at the bottom or *None* if the set is empty
+        """
+        return self._val[self._bottom] if self._bottom != self._NIL else None
+
+    def pop_top(self):
+        """Pop the item at the top of the set
+
+        Returns
+        -------
+        top : any hashable type
+            The item at the top or *None* if the set is empty
+        """
+        n = self._top
+        if n == self._NIL: # No elements to pop
+            return None
+        k = self._val[n]
+        self._unlink(n)
+        self._release(k)
+        return k
+
+    def pop_bottom(self):
+        """Pop the item at the bottom of the set
+
+        Returns
+        -------
+        bottom : any hashable type
+            The item at the bottom or *None* if the set is empty
+        """
+        n = self._bottom
+        if n == self._NIL: # No elements to pop
+            return None
+        k = self._val[n]
+        up = self._up[n]
+        if up == self._NIL: # One single element
+            self._top = self._NIL
+        else:
+            self._down[up] = self._NIL
+        self._bottom = up
+        # Release slot
+        del self._map[k]
+        self._val[n] = None
+        self._down[n] = self._free
+        self._free = n
+        return k
+
+    def append_top(self, k):
+        """Append an item at the top of the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to append
+        """
+        if k in self._map:
+            raise KeyError('The item %s is already in the set' % str(k))
+        n = self._alloc(k)
+        top = self._top
+        self._up[n] = self._NIL
+        self._down[n] = top
+        if top == self._NIL:
+            self._bottom = n
+        else:
+            self._up[top] = n
+        self._top = n
+
+    def append_bottom(self, k):
+        """Append an item at the bottom of the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to append
+        """
+        if k in self._map:
+            raise KeyError('The item %s is already in the set' % str(k))
+        self._link_bottom(self._alloc(k))
+
+    def move_up(self, k):
+        """Move a specified item one position up in the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to move up
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        n = self._map[k]
+        m = self._up[n]
+        if m == self._NIL:  # already on top or there is only one element
+            return
+        self._unlink(n)
+        self._link_above(n, m)
+
+    def move_down(self, k):
+        """Move a specified item one position down in the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to move down
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        n = self._map[k]
+        m = self._down[n]
+        if m == self._NIL: # already at the bottom or there is only one element
+            return
+        self._unlink(n)
+        self._link_below(n, m)
+
+    def move_to_top(self, k):
+        """Move a specified item to the top of the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to move to the top
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        n = self._map[k]
+        if n == self._top:  # already on top or there is only one element
+            return
+        # Inline unlink and link at top: n is not the top, so it has an up
+        # link, and the list has at least two elements
+        up = self._up[n]
+        down = self._down[n]
+        self._down[up] = down
+        if down == self._NIL:
+            self._bottom = up
+        else:
+            self._up[down] = up
+        self._up[n] = self._NIL
+        self._down[n] = self._top
+        self._up[self._top] = n
+        self._top = n
+
+    def move_to_bottom(self, k):
+        """Move a specified item to the bottom of the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to move to the bottom
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        n = self._map[k]
+        if n == self._bottom: # already at bottom or there is only one element
+            return
+        self._unlink(n)
+        self._link_bottom(n)
+
+    def insert_above(self, i, k):
+        """Insert an item one position above a given item already in the set
+
+        Parameters
+        ----------
+        i : any hashable type
+            The item of the set above which the new item is inserted
+        k : any hashable type
+            The item to insert
+        """
+        if k in self._map:
+            raise KeyError('Item %s already in the set' % str(k))
+        if i not in self._map:
+            raise KeyError('Item %s not in the set' % str(i))
+        m = self._map[i]
+        self._link_above(self._alloc(k), m)
+
+    def insert_below(self, i, k):
+        """Insert an item one position below a given item already in the set
+
+        Parameters
+        ----------
+        i : any hashable type
+            The item of the set below which the new item is inserted
+        k : any hashable type
+            The item to insert
+        """
+        if k in self._map:
+            raise KeyError('Item %s already in the set' % str(k))
+        if i not in self._map:
+            raise KeyError('Item %s not in the set' % str(i))
+        m = self._map[i]
+        self._link_below(self._alloc(k), m)
+
+    def index(self, k):
+        """Return index of a given element.
+
+        This operation has a O(n) time complexity, with n being the size of the
+        set.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item whose index is queried
+
+        Returns
+        -------
+        index : int
+            The index of the item
+        """
+        if not k in self._map:
+            raise KeyError('The item %s is not in the set' % str(k))
+        n = self._map[k]
+        index = 0
+        curr = self._top
+        while curr != n:
+            curr = self._down[curr]
+            index += 1
+        return index
+
+    def remove(self, k):
+        """Remove an item from the set
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to remove
+        """
+        if k not in self._map:
+            raise KeyError('Item %s not in the set' % str(k))
+        self._unlink(self._map[k])
+        self._release(k)
+
+    def clear(self):
+        """Empty the set"""
+        self._top = self._NIL
+        self._bottom = self._NIL
+        self._map.clear()
+        self._init_slots(len(self._val))
+
+
 class Cache(object):
     """Base implementation of a cache object"""
     
@@ -719,10 +1169,12 @@ class LruCache(Cache):
         
     @inheritdoc(Cache)
     def __init__(self, maxlen, **kwargs):
-        self._cache = LinkedSet()
         self._maxlen = int(maxlen)
         if self._maxlen <= 0:
             raise ValueError('maxlen must be positive')
+        # One more slot than maxlen is needed because a new item is appended
+        # before the bottom one is evicted
+        self._cache = ArrayLinkedSet(capacity=self._maxlen + 1)
 
     @inheritdoc(Cache)
     def __len__(self):
@@ -840,11 +1292,12 @@ class SegmentedLruCache(Cache):
             raise ValueError('maxlen must be positive')
         if not isinstance(segments, int) or segments <= 0:
             raise ValueError('maxlen must be a positive integer')
-        self._segment = [LinkedSet() for _ in range(segments)]
         quotient = self._maxlen // segments
         self._segment_maxlen = [quotient for _ in range(segments)]
         for i in range(self._maxlen % segments):
             self._segment_maxlen[i] += 1
+        self._segment = [ArrayLinkedSet(capacity=l + 1)
+                         for l in self._segment_maxlen]
         # This map is a dictionary mapping each item in the cache with the
         # segment in which it is located. This is not strictly necessary to
         # locate an item as we could have used the map in each segment.
@@ -972,23 +1425,63 @@ class LfuCache(Cache):
     counters are increased when the associated item is requested. Upon
     insertion of a new item, the cache evicts the one which was requested the
     least times in the past, i.e. the one whose associated value has the
-    smallest value.
+    smallest value. Ties are broken by evicting the item inserted first.
     
     In contrast to LRU, LFU has been shown to perform optimally under IRM
-    demands. However, its implementation is computationally expensive since it
-    cannot be implemented in such a way that both search and replacement tasks
-    can be executed in constant time. This makes it particularly unfit for
-    large caches and line speed operations.
+    demands. However, a naive implementation is computationally expensive
+    since it requires scanning all items upon replacement. This
+    implementation groups items in frequency buckets and keeps track of the
+    least frequency currently in the cache, so that the bucket of the item to
+    evict is found in constant time. Each bucket is a heap ordered by
+    insertion time, which is needed to break ties exactly because an item
+    promoted to a bucket may have been inserted before items already in it.
+    As a result, search is *O(1)* while replacement and frequency updates are
+    *O(log b)*, with b being the number of items with the same frequency.
     """
     
     @inheritdoc(Cache)
     def __init__(self, maxlen, **kwargs):
+        # Dictionary mapping each item to a (frequency, insertion time) tuple
         self._cache = {}
+        # Dictionary mapping each frequency to a heap of (insertion time, item)
+        # tuples. Heaps may also contain stale entries of items which have
+        # been promoted or removed, which are discarded lazily
+        self._bucket = {}
+        # Dictionary mapping each frequency to the number of items having it
+        self._bucket_len = {}
+        self._min_freq = None
         self.t = 0
         self._maxlen = int(maxlen)
         if self._maxlen <= 0:
             raise ValueError('maxlen must be positive')
 
+    def _bucket_push(self, freq, t, k):
+        """Add an item to the bucket of a given frequency
+        """
+        if freq not in self._bucket:
+            self._bucket[freq] = [(t, k)]
+            self._bucket_len[freq] = 1
+            return
+        heap = self._bucket[freq]
+        self._bucket_len[freq] += 1
+        if len(heap) > 2 * self._bucket_len[freq]:
+            # Too many stale entries, compact the heap
+            heap[:] = [e for e in heap if self._cache.get(e[1]) == (freq, e[0])]
+            heapq.heapify(heap)
+        heapq.heappush(heap, (t, k))
+
+    def _bucket_discard(self, freq):
+        """Account for an item leaving the bucket of a given frequency. Its
+        entry in the heap becomes stale. Return *True* if the bucket is empty
+        and has been deleted, *False* otherwise.
+        """
+        self._bucket_len[freq] -= 1
+        if self._bucket_len[freq] == 0:
+            del self._bucket[freq]
+            del self._bucket_len[freq]
+            return True
+        return False
+
     @inheritdoc(Cache)
     def __len__(self):
         return len(self._cache)
@@ -1000,7 +1493,12 @@ class LfuCache(Cache):
     
     @inheritdoc(Cache)
     def dump(self):
-        return sorted(self._cache, key=lambda x: self._cache[x], reverse=True) 
+        # Only distinct frequencies and items within each bucket are sorted
+        dump = []
+        for freq in sorted(self._bucket, reverse=True):
+            dump.extend(k for t, k in sorted(self._bucket[freq], reverse=True)
+                        if self._cache.get(k) == (freq, t))
+        return dump
 
     @inheritdoc(Cache)
     def has(self, k):
@@ -1008,36 +1506,55 @@ class LfuCache(Cache):
 
     @inheritdoc(Cache)
     def get(self, k):
-        if self.has(k):
-            freq, t = self._cache[k]
-            self._cache[k] = freq+1, t 
-            return True
-        else:
+        if k not in self._cache:
             return False
+        freq, t = self._cache[k]
+        self._cache[k] = freq + 1, t
+        if self._bucket_discard(freq) and self._min_freq == freq:
+            self._min_freq = freq + 1
+        self._bucket_push(freq + 1, t, k)
+        return True
 
     @inheritdoc(Cache)
     def put(self, k):
-        if not self.has(k):
-            self.t += 1
-            self._cache[k] = (1, self.t)
-            if len(self._cache) > self._maxlen:
-                evicted = min(self._cache, key=lambda x: self._cache[x])
-                del self._cache[evicted]
-                return evicted
+        if k in self._cache:
+            return None
+        self.t += 1
+        if len(self._cache) == self._maxlen and self._min_freq != 1:
+            # All items in the cache have been requested more than once, so
+            # the new item would be the least frequently used and evicted
+            # straight away
+            return k
+        self._cache[k] = (1, self.t)
+        self._bucket_push(1, self.t, k)
+        self._min_freq = 1
+        if len(self._cache) > self._maxlen:
+            heap = self._bucket[1]
+            while True:
+                t, evicted = heapq.heappop(heap)
+                if self._cache.get(evicted) == (1, t):
+                    break
+            del self._cache[evicted]
+            # The bucket cannot become empty because it contains the new item
+            self._bucket_discard(1)
+            return evicted
         return None
     
     @inheritdoc(Cache)
     def remove(self, k):
-        if k in self._cache:
-            self._cache.pop(k)
-            return True
-        else:
+        if k not in self._cache:
             return False
+        freq, _ = self._cache.pop(k)
+        if self._bucket_discard(freq) and self._min_freq == freq:
+            self._min_freq = min(self._bucket) if self._bucket else None
+        return True
         
     @inheritdoc(Cache)
     def clear(self):
         self._cache.clear()
-
+        self._bucket.clear()
+        self._bucket_len.clear()
+        self._min_freq = None
 
 
 @register_cache_policy('FIFO')
@@ -73,6 +73,87 @@ class Strategy(object):
         raise NotImplementedError('The selected strategy must implement '
                                   'a process_event method')
 
+def _request_on_path(view, controller, receiver, source):
+    """Forward a request from *receiver* towards *source* over the shortest
+    path, querying all caches on the path until the content is found.
+    
+    Only the caching nodes on the path are visited, using the index returned
+    by *view.shortest_path_caches*, while the request is forwarded hop by hop
+    between them.
+    
+    Parameters
+    ----------
+    view : NetworkView
+        The network view instance
+    controller : NetworkController
+        The network controller instance
+    receiver : any hashable type
+        The receiver node requesting the content
+    source : any hashable type
+        The node persistently storing the content
+    
+    Returns
+    -------
+    path : list
+        The shortest path from receiver to source
+    serving_hop : int
+        The position in the path of the node serving the content
+    """
+    path = view.shortest_path(receiver, source)
+    caches, hops, _ = view.shortest_path_caches(receiver, source)
+    prev = 0
+    for v, hop in zip(caches, hops):
+        controller.forward_request_path(receiver, v, path[prev:hop + 1])
+        if controller.get_content(v):
+            return path, hop
+        prev = hop
+    # No cache hits, get content from source
+    controller.forward_request_path(receiver, source, path[prev:])
+    controller.get_content(source)
+    return path, len(path) - 1
+
+
+def _content_path(view, path, serving_hop, symm_paths):
+    """Return the path over which a content is delivered from the serving node
+    to the receiver and the caching nodes on it.
+    
+    Parameters
+    ----------
+    view : NetworkView
+        The network view instance
+    path : list
+        The path over which the request was forwarded, as returned by
+        *_request_on_path*
+    serving_hop : int
+        The position in the path of the node serving the content
+    symm_paths : bool
+        If *True*, the content is delivered over the reverse of the request
+        path, otherwise over the shortest path
+    
+    Returns
+    -------
+    path : list
+        The content delivery path, from serving node to receiver
+    caches : list
+        Caching nodes on the delivery path, serving node excluded
+    hops : list
+        Position of each caching node in the delivery path
+    """
+    if symm_paths:
+        req_caches, req_hops, _ = view.shortest_path_caches(path[0], path[-1])
+        caches = []
+        hops = []
+        for i in reversed(range(len(req_hops))):
+            if req_hops[i] < serving_hop:
+                caches.append(req_caches[i])
+                hops.append(serving_hop - req_hops[i])
+        return list(reversed(path[:serving_hop + 1])), caches, hops
+    serving_node = path[serving_hop]
+    receiver = path[0]
+    caches, hops, _ = view.shortest_path_caches(serving_node, receiver)
+    return view.shortest_path(serving_node, receiver), caches, hops
+
+
 @register_strategy('HIER_OPTIMAL')
 class HierarchicalOptimal(Strategy):
     @inheritdoc(Strategy)
@@ -601,30 +682,20 @@ class LeaveCopyEverywhere(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_content_hop(u, v)
-            if v in self.view.caches():
-                # insert content
-                self.controller.put_content(v)
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
+        prev = 0
+        for v, hop in zip(caches, hops):
+            self.controller.forward_content_path(path[prev], v, path[prev:hop + 1])
+            # insert content
+            self.controller.put_content(v)
+            prev = hop
+        self.controller.forward_content_path(path[prev], receiver, path[prev:])
         self.controller.end_session()
 
 
@@ -652,33 +723,23 @@ class LeaveCopyDown(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
         # Leave a copy of the content only in the cache one level down the hit
         # caching node
-        copied = False
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_content_hop(u, v)
-            if not copied and v != receiver and v in self.view.caches():
-                self.controller.put_content(v)
-                copied = True
+        if caches and caches[0] != receiver:
+            self.controller.forward_content_path(path[0], caches[0],
+                                                 path[:hops[0] + 1])
+            self.controller.put_content(caches[0])
+            self.controller.forward_content_path(caches[0], receiver,
+                                                 path[hops[0]:])
+        else:
+            self.controller.forward_content_path(path[0], receiver, path)
         self.controller.end_session()
 
 
@@ -705,37 +766,39 @@ class ProbCache(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
         c = len(path) - 1.0
-        x = 0.0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]    
-            N = sum([self.cache_size[n] for n in path[hop - 1:]
-                     if n in self.cache_size])
-            if v in self.cache_size:
-                x += 1
-            self.controller.forward_content_hop(u, v)
-            if v != receiver and v in self.cache_size:
+        # N is the cache capacity of the caches from the node preceding each
+        # caching node on the path up to the receiver. The preceding node may
+        # be the serving node or another caching node
+        serving_size = self.cache_size.get(path[0], 0)
+        sizes = [self.cache_size[v] for v in caches]
+        residual = sum(sizes)
+        prev = 0
+        for i in range(len(caches)):
+            v = caches[i]
+            hop = hops[i]
+            if hop == 1:
+                N = residual + serving_size
+            elif i > 0 and hops[i - 1] == hop - 1:
+                N = residual + sizes[i - 1]
+            else:
+                N = residual
+            residual -= sizes[i]
+            x = i + 1.0
+            self.controller.forward_content_path(path[prev], v, path[prev:hop + 1])
+            prev = hop
+            if v != receiver:
                 prob_cache = float(N)/(self.t_tw * self.cache_size[v])*(x/c)**c
                 if random.random() < prob_cache:
                     self.controller.put_content(v)
+        self.controller.forward_content_path(path[prev], receiver, path[prev:])
         self.controller.end_session()
 
 
@@ -765,40 +828,32 @@ class CacheLessForMore(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
         # get the cache with maximum betweenness centrality
         # if there are more than one cache with max betw then pick the one
         # closer to the receiver
         max_betw = -1
-        designated_cache = None
-        for v in path[1:]:
-            if v in self.view.caches():
-                if self.betw[v] >= max_betw:
-                    max_betw = self.betw[v]
-                    designated_cache = v
+        designated_hop = None
+        for v, hop in zip(caches, hops):
+            if self.betw[v] >= max_betw:
+                max_betw = self.betw[v]
+                designated_hop = hop
         # Forward content
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_content_hop(u, v)
-            if v == designated_cache:
-                self.controller.put_content(v)
+        if designated_hop is not None:
+            designated_cache = path[designated_hop]
+            self.controller.forward_content_path(path[0], designated_cache,
+                                                 path[:designated_hop + 1])
+            self.controller.put_content(designated_cache)
+            self.controller.forward_content_path(designated_cache, receiver,
+                                                 path[designated_hop:])
+        else:
+            self.controller.forward_content_path(path[0], receiver, path)
         self.controller.end_session()  
 
 
@@ -820,30 +875,21 @@ class RandomBernoulli(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_content_hop(u, v)
-            if v != receiver and v not in self.view.caches():
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
+        prev = 0
+        for v, hop in zip(caches, hops):
+            self.controller.forward_content_path(path[prev], v, path[prev:hop + 1])
+            prev = hop
+            if v != receiver:
                 if random.random() < self.p:
                     self.controller.put_content(v)
+        self.controller.forward_content_path(path[prev], receiver, path[prev:])
         self.controller.end_session()
 
 @register_strategy('RAND_CHOICE')
@@ -863,31 +909,24 @@ class RandomChoice(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_request_hop(u, v)
-            if v in self.view.caches():
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
-            # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+        path, serving_hop = _request_on_path(self.view, self.controller,
+                                             receiver, source)
         # Return content
-        path = list(reversed(path[:hop + 1])) if self.symm_paths \
-                        else self.view.shortest_path(serving_node, receiver)
-        caches = [v for v in path[1:-1] if v in self.view.caches()]
-        designated_cache = random.choice(caches) if len(caches) > 0 else None
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            self.controller.forward_content_hop(u, v)
-            if v == designated_cache:
-                self.controller.put_content(v)
+        path, caches, hops = _content_path(self.view, path, serving_hop,
+                                           self.symm_paths)
+        candidates = [hop for hop in hops if hop < len(path) - 1]
+        if len(candidates) > 0:
+            designated_hop = random.choice(candidates)
+            designated_cache = path[designated_hop]
+            self.controller.forward_content_path(path[0], designated_cache,
+                                                 path[:designated_hop + 1])
+            self.controller.put_content(designated_cache)
+            self.controller.forward_content_path(designated_cache, receiver,
+                                                 path[designated_hop:])
+        else:
+            self.controller.forward_content_path(path[0], receiver, path)
         self.controller.end_session() 
 
 @register_strategy('CONTENT_AWARE')
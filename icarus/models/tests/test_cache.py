@@ -9,6 +9,7 @@ else:
         raise ImportError("The unittest2 package is needed to run the tests.") 
 del sys
 import collections
+import random
 
 import numpy as np
 
@@ -219,6 +220,130 @@ class TestLinkedSet(unittest.TestCase):
         self.assertRaises(ValueError, cache.LinkedSet, iterable=[1, 1, 2])
         self.assertRaises(ValueError, cache.LinkedSet, iterable=[1, None, None])
         self.assertIsNotNone(cache.LinkedSet(iterable=[1, 0, None]))
+
+
+class TestArrayLinkedSet(unittest.TestCase):
+
+    def link_consistency(self, linked_set):
+        """Checks that links of an array linked set are consistent iterating
+        from top or from bottom and that all free slots are unused.
+
+        This method depends on the internal implementation of the
+        ArrayLinkedSet class
+        """
+        nil = linked_set._NIL
+        topdown = collections.deque()
+        bottomup = collections.deque()
+        cur = linked_set._top
+        while cur != nil:
+            topdown.append(linked_set._val[cur])
+            cur = linked_set._down[cur]
+        cur = linked_set._bottom
+        while cur != nil:
+            bottomup.append(linked_set._val[cur])
+            cur = linked_set._up[cur]
+        bottomup.reverse()
+        if topdown != bottomup or len(topdown) != len(linked_set):
+            return False
+        n_free = 0
+        cur = linked_set._free
+        while cur != nil:
+            if linked_set._val[cur] is not None:
+                return False
+            n_free += 1
+            cur = linked_set._down[cur]
+        return n_free + len(linked_set) == len(linked_set._val)
+
+    def test_append_top(self):
+        c = cache.ArrayLinkedSet()
+        c.append_top(1)
+        c.append_top(2)
+        c.append_top(3)
+        self.assertEqual(len(c), 3)
+        self.assertEqual(list(c), [3, 2, 1])
+        self.assertEqual(list(reversed(c)), [1, 2, 3])
+        self.assertEqual(c.top, 3)
+        self.assertEqual(c.bottom, 1)
+        self.assertTrue(self.link_consistency(c))
+        self.assertRaises(KeyError, c.append_top, 2)
+
+    def test_move(self):
+        c = cache.ArrayLinkedSet([1, 2, 3])
+        c.move_to_top(3)
+        self.assertEqual(list(c), [3, 1, 2])
+        c.move_to_bottom(3)
+        self.assertEqual(list(c), [1, 2, 3])
+        c.move_up(2)
+        self.assertEqual(list(c), [2, 1, 3])
+        c.move_down(1)
+        self.assertEqual(list(c), [2, 3, 1])
+        c.move_up(2)
+        c.move_down(1)
+        self.assertEqual(list(c), [2, 3, 1])
+        self.assertTrue(self.link_consistency(c))
+        self.assertRaises(KeyError, c.move_to_top, 4)
+
+    def test_pop(self):
+        c = cache.ArrayLinkedSet([1, 2, 3])
+        self.assertEqual(c.pop_bottom(), 3)
+        self.assertEqual(c.pop_top(), 1)
+        self.assertEqual(list(c), [2])
+        self.assertTrue(self.link_consistency(c))
+        self.assertEqual(c.pop_bottom(), 2)
+        self.assertEqual(c.pop_bottom(), None)
+        self.assertEqual(c.pop_top(), None)
+        self.assertEqual(c.top, None)
+        self.assertEqual(list(c), [])
+
+    def test_insert(self):
+        c = cache.ArrayLinkedSet([3])
+        c.insert_above(3, 1)
+        c.insert_below(1, 2)
+        c.insert_below(3, 'a')
+        c.insert_above(1, 'b')
+        self.assertEqual(list(c), ['b', 1, 2, 3, 'a'])
+        self.assertEqual(c.index(3), 3)
+        self.assertTrue(self.link_consistency(c))
+
+    def test_slot_reuse(self):
+        c = cache.ArrayLinkedSet(capacity=3)
+        for i in range(100):
+            c.append_top(i)
+            if len(c) > 2:
+                c.pop_bottom()
+        self.assertEqual(list(c), [99, 98])
+        self.assertEqual(len(c._val), 3)
+        self.assertTrue(self.link_consistency(c))
+        c.clear()
+        self.assertEqual(list(c), [])
+        self.assertTrue(self.link_consistency(c))
+
+    def test_equivalence(self):
+        rand = random.Random(0)
+        a = cache.LinkedSet()
+        b = cache.ArrayLinkedSet()
+        ops = ('append_top', 'append_bottom', 'move_up', 'move_down',
+               'move_to_top', 'move_to_bottom', 'insert_above',
+               'insert_below', 'remove', 'pop_top', 'pop_bottom')
+        for _ in range(2000):
+            op = rand.choice(ops)
+            k = rand.randint(0, 30)
+            i = rand.randint(0, 30)
+            if op in ('append_top', 'append_bottom'):
+                args = (k,) if k not in a else None
+            elif op in ('insert_above', 'insert_below'):
+                args = (i, k) if i in a and k not in a else None
+            elif op in ('pop_top', 'pop_bottom'):
+                args = ()
+            else:
+                args = (k,) if k in a else None
+            if args is None:
+                continue
+            self.assertEqual(getattr(a, op)(*args), getattr(b, op)(*args))
+            self.assertEqual(list(a), list(b))
+        self.assertTrue(self.link_consistency(b))
+
+
 class TestLruCache(unittest.TestCase):
 
     def test_lru(self):
@@ -501,7 +626,52 @@ class TestLfuCache(unittest.TestCase):
         c.clear()
         self.assertEquals(len(c), 0)
         self.assertEquals(c.dump(), [])
-        
+
+    def test_tie_breaking(self):
+        c = cache.LfuCache(3)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        c.get(2)
+        c.get(1)
+        # 1 and 2 have same frequency but 1 was inserted first
+        self.assertEquals(c.dump(), [2, 1, 3])
+        self.assertEquals(c.put(4), 3)
+        c.get(4)
+        self.assertEquals(c.dump(), [4, 2, 1])
+        # All items requested more than once: new item evicted straight away
+        self.assertEquals(c.put(5), 5)
+        self.assertFalse(c.has(5))
+        self.assertEquals(c.dump(), [4, 2, 1])
+
+    def test_naive_equivalence(self):
+        rand = random.Random(0)
+        maxlen = 10
+        c = cache.LfuCache(maxlen)
+        # Reference naive implementation: evict min (frequency, insertion time)
+        ref = {}
+        t = 0
+        for _ in range(5000):
+            k = rand.randint(0, 30)
+            op = rand.random()
+            if op < 0.45:
+                self.assertEquals(c.get(k), k in ref)
+                if k in ref:
+                    ref[k] = (ref[k][0] + 1, ref[k][1])
+            elif op < 0.95:
+                evicted = None
+                if k not in ref:
+                    t += 1
+                    ref[k] = (1, t)
+                    if len(ref) > maxlen:
+                        evicted = min(ref, key=lambda x: ref[x])
+                        del ref[evicted]
+                self.assertEquals(c.put(k), evicted)
+            else:
+                self.assertEquals(c.remove(k), ref.pop(k, None) is not None)
+            self.assertEquals(len(c), len(ref))
+        self.assertEquals(c.dump(), sorted(ref, key=lambda x: ref[x], reverse=True))
+
     def test_remove(self):
         c = cache.FifoCache(4)
         c.put(1)
@@ -541,4 +541,37 @@ class TestOnPath(unittest.TestCase):
         cont_hops = summary['content_hops']
         self.assertSetEqual(exp_req_hops, set(req_hops))
         self.assertSetEqual(exp_cont_hops, set(cont_hops))
-        
\ No newline at end of file
+        
+    def test_rand_bernoulli(self):
+        hr = strategy.RandomBernoulli(self.view, self.controller, p=1)
+        # receiver 0 requests 2, expect miss and copy in all caches on path
+        hr.process_event(1, 0, 2, True)
+        loc = self.view.content_locations(2)
+        self.assertEquals(len(loc), 4)
+        self.assertIn(1, loc)
+        self.assertIn(2, loc)
+        self.assertIn(3, loc)
+        self.assertIn(4, loc)
+        summary = self.collector.session_summary()
+        exp_req_hops = set(((0, 1), (1, 2), (2, 3), (3, 4)))
+        exp_cont_hops = set(((4, 3), (3, 2), (2, 1), (1, 0)))
+        self.assertSetEqual(exp_req_hops, set(summary['request_hops']))
+        self.assertSetEqual(exp_cont_hops, set(summary['content_hops']))
+        # receiver 5 requests 2, expect hit in 2
+        hr.process_event(1, 5, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEquals(summary['serving_node'], 2)
+        self.assertSetEqual(set(((5, 2),)), set(summary['request_hops']))
+        self.assertSetEqual(set(((2, 5),)), set(summary['content_hops']))
+
+    def test_shortest_path_caches(self):
+        caches, hops, _ = self.view.shortest_path_caches(0, 4)
+        self.assertEquals(caches, (1, 2, 3))
+        self.assertEquals(hops, (1, 2, 3))
+        caches, hops, _ = self.view.shortest_path_caches(4, 5)
+        self.assertEquals(caches, (3, 2))
+        self.assertEquals(hops, (1, 2))
+        # Path not between receiver and source, computed on demand
+        caches, hops, _ = self.view.shortest_path_caches(1, 3)
+        self.assertEquals(caches, (2, 3))
+        self.assertEquals(hops, (1, 2))
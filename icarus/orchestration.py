@@ -5,28 +5,49 @@ of parameters specified in the user-provided settings, schedule experiment
 execution on various
 """
 from __future__ import division
+import os
+import math
+import errno
 import time
+import hashlib
 import collections
+import functools
+import itertools
+import Queue
 import multiprocessing as mp
 import logging
 import sys
 import signal
 import traceback
 
-from icarus.execution import exec_experiment
-from icarus.scenarios import uniform_req_gen, custom_req_gendef
+import fnss
+
+from icarus.execution import exec_experiment, load_shortest_paths, \
+                             ShortestPaths, predecessor_matrix, \
+                             topology_fingerprint
+from icarus.scenarios import uniform_req_gen, custom_req_gendef, \
+                             save_workload, stored_req_gen, \
+                             uniform_cache_placement
 from icarus.registry import topology_factory_register, cache_policy_register, \
-                           strategy_register, data_collector_register
-from icarus.results import ResultSet
-from icarus.util import SequenceNumber, timestr
+                           strategy_register, data_collector_register, \
+                           workload_register
+from icarus.results import ResultSet, read_results_journal
+from icarus.tools import means_confidence_interval
+from icarus.util import SequenceNumber, timestr, Tree
 
 
-__all__ = ['Orchestrator', 'run_scenario']
+__all__ = ['Orchestrator', 'ExperimentCostModel', 'SequentialStopping',
+           'ScenarioCache', 'run_scenario']
 
 
 logger = logging.getLogger('orchestration')
 
 
+# Cache of topologies and shortest paths of the current process. Since pool
+# processes are reused across experiments, each of them keeps its own cache.
+_scenario_cache = None
+
+
 class Orchestrator(object):
     """Orchestrator.
     
@@ -34,7 +55,8 @@ class Orchestrator(object):
     aggregate results.
     """
 
-    def __init__(self, settings, summary_freq=4):
+    def __init__(self, settings, summary_freq=4, max_in_flight=None,
+                 journal=None):
         """Constructor
         
         Parameters
@@ -44,17 +66,39 @@ class Orchestrator(object):
         summary_freq : int
             Frequency (in number of experiment) at which summary messages
             are displayed
+        max_in_flight : int, optional
+            Maximum number of experiments submitted to the pool of processes
+            and not yet completed. If not specified, it is twice the number of
+            processes, so that a process never waits for an experiment to be
+            submitted
+        journal : ResultsJournal, optional
+            If specified, results of completed experiments are appended to
+            this journal instead of being stored in *results*, and experiments
+            whose results are already in the journal are not executed
         """
         self.settings = settings
         self.results = ResultSet()
+        self.journal = journal
         self.seq = SequenceNumber()
         self.exp_durations = collections.deque(maxlen=30)
+        self.cost_model = ExperimentCostModel(settings.CACHE_POLICY)
         self.n_success = 0
         self.n_fail = 0
         self.summary_freq = summary_freq
         self._stop = False
+        if 'SEQUENTIAL_STOPPING' in settings and settings.SEQUENTIAL_STOPPING:
+            self.stopping = SequentialStopping(settings.STOPPING_METRICS,
+                                               settings.STOPPING_PRECISION,
+                                               settings.STOPPING_CONFIDENCE,
+                                               settings.MAX_REPLICATIONS)
+        else:
+            self.stopping = None
         if settings.PARALLEL_EXECUTION:
             self.pool = mp.Pool(settings.N_PROCESSES)
+            self.max_in_flight = max_in_flight if max_in_flight is not None \
+                                 else 2 * settings.N_PROCESSES
+            # Queue notified by the pool every time an experiment completes
+            self._completed = Queue.Queue()
     
     def stop(self):
         """Stop the execution of the orchestrator
@@ -88,8 +132,35 @@ class Orchestrator(object):
                                           n_contents=n_contents,
                                           strategy_params={})
                             queue.append(params)
+        # Experiments not yet started, as (experiment, replication) pairs, and
+        # experiments started and not yet completed, keyed by sequence number
+        pending = [(experiment, replication) for experiment in queue
+                   for replication in range(self.settings.N_REPLICATIONS)]
+        self._running = {}
+        # Handles of the experiments submitted to the pool and not completed
+        self._jobs = {}
+        if self.journal is not None and len(self.journal) > 0:
+            n_planned = len(pending)
+            pending = [(experiment, replication)
+                       for experiment, replication in pending
+                       if not self.journal.completed(experiment, replication)]
+            logger.info('Resuming simulations: %d experiments already completed'
+                        % (n_planned - len(pending)))
+        self._pending = _PendingExperiments(self.cost_model, pending)
         # Calculate number of experiments and number of processes
-        self.n_exp = len(queue) * self.settings.N_REPLICATIONS 
+        self.n_exp = len(self._pending)
+        if self.stopping is not None:
+            if self.journal is not None and len(self.journal) > 0:
+                for params, replication, results in \
+                        read_results_journal(self.journal.path):
+                    self.stopping.schedule(params, replication)
+                    self.stopping.observe(params, results)
+            for experiment, replication in self._pending:
+                self.stopping.schedule(experiment, replication)
+            # Experiments whose replications were all completed before
+            # resuming may need more replications
+            for experiment in queue:
+                self._extend_replications(experiment)
         self.n_proc = self.settings.N_PROCESSES \
                       if self.settings.PARALLEL_EXECUTION \
                       else 1
@@ -97,56 +168,188 @@ class Orchestrator(object):
                     % (self.n_exp, self.n_proc))
         
         if self.settings.PARALLEL_EXECUTION:
-            # This job queue is used only to keep track of which jobs have
-            # finished and which are still running. Currently this information
-            # is used only to handle keyboard interrupts correctly
-            job_queue = collections.deque()
-            # Schedule experiments from the queue
-            while queue:
-                experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
-                    job_queue.append(self.pool.apply_async(run_scenario,
-                            args=(self.settings, experiment,
-                                  self.seq.assign(), self.n_exp),
-                            callback=self.experiment_callback))
-            self.pool.close()
-            # This solution is probably not optimal, but at least makes
-            # KeyboardInterrupt work fine, which is crucial if launching the
-            # simulation remotely via screen.
-            # What happens here is that we keep waiting for possible
-            # KeyboardInterrupts till the last process terminates successfully.
-            # We may have to wait up to 5 seconds after the last process
-            # terminates before exiting, which is really negligible
+            # Experiments are submitted to the pool only when there are less
+            # than max_in_flight experiments running or waiting to run, and
+            # a new one is submitted as soon as one completes. This keeps all
+            # processes busy while holding the arguments of a bounded number
+            # of experiments in memory
+            n_in_flight = 0
             try:
-                while job_queue:
-                    job = job_queue.popleft()
-                    while not job.ready():
-                        time.sleep(5)
+                # With sequential stopping, completed experiments may add
+                # replications, hence experiments are submitted until no
+                # experiment is pending or running
+                while self._pending or n_in_flight > 0:
+                    if not self._pending or n_in_flight >= self.max_in_flight:
+                        self._wait_completion()
+                        n_in_flight -= 1
+                        continue
+                    experiment, replication = self._next_experiment()
+                    curr_exp = self.seq.assign()
+                    self._running[curr_exp] = (experiment, replication)
+                    self._jobs[curr_exp] = self.pool.apply_async(
+                            _run_scenario_job,
+                            args=(self.settings, experiment, curr_exp,
+                                  self.n_exp, replication),
+                            callback=functools.partial(self._pool_callback,
+                                                       curr_exp))
+                    n_in_flight += 1
+                self.pool.close()
             except KeyboardInterrupt:
                 self.pool.terminate()
             self.pool.join()
         
         else: # Single-process execution
-            while queue:
-                experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
-                    self.experiment_callback(run_scenario(self.settings, 
-                                            experiment, self.seq.assign(),
-                                            self.n_exp))
-                    if self._stop:
-                        self.stop()
+            while self._pending:
+                experiment, replication = self._next_experiment()
+                curr_exp = self.seq.assign()
+                self._running[curr_exp] = (experiment, replication)
+                args = run_scenario(self.settings, experiment, curr_exp,
+                                    self.n_exp, replication)
+                del self._running[curr_exp]
+                self.experiment_callback(args, replication)
+                self._replication_callback(experiment, args)
+                if self._stop:
+                    self.stop()
 
         logger.info('END | Planned: %d, Completed: %d, Succeeded: %d, Failed: %d', 
                     self.n_exp, self.n_fail + self.n_success, self.n_success, self.n_fail)
         
 
-    def experiment_callback(self, args):
+    def _next_experiment(self):
+        """Remove from the experiments not yet started and return the one with
+        the greatest expected duration.
+        
+        Running the longest experiments first prevents a long experiment
+        started last from running alone at the end of the campaign.
+        Experiments with parameter values whose effect on duration was never
+        observed are started first, so that the model learns it early. Among
+        experiments with equal expected duration, the queue order is kept.
+        
+        Returns
+        -------
+        experiment : dict
+            The parameters of the experiment
+        replication : int
+            The index of the replication of the experiment
+        """
+        return self._pending.pop()
+    
+    def _pool_callback(self, curr_exp, args):
+        """Callback called by the pool, from its result handler thread, when
+        an experiment completes
+        
+        The results are passed to the main thread, which processes them, so
+        that the state of the orchestrator is only accessed by the main
+        thread.
+        
+        Parameters
+        ----------
+        curr_exp : int
+            The sequence number of the experiment
+        args : tuple
+            Tuple of arguments
+        """
+        self._completed.put((curr_exp, args))
+    
+    def _experiment_completed(self, curr_exp, args):
+        """Process the results of an experiment submitted to the pool
+        
+        Parameters
+        ----------
+        curr_exp : int
+            The sequence number of the experiment
+        args : tuple
+            Tuple of arguments or *None* if the experiment failed
+        """
+        self._jobs.pop(curr_exp, None)
+        experiment, replication = self._running.pop(curr_exp)
+        self.experiment_callback(args, replication)
+        self._replication_callback(experiment, args)
+    
+    def _replication_callback(self, experiment, args):
+        """Record the completion of a replication of an experiment and, with
+        sequential stopping, schedule more replications of the experiment if
+        needed
+        
+        Parameters
+        ----------
+        experiment : dict
+            The parameters of the experiment
+        args : tuple
+            Tuple of arguments returned by *run_scenario*
+        """
+        if self.stopping is None:
+            return
+        self.stopping.observe(experiment, args[1] if args else None)
+        self._extend_replications(experiment)
+    
+    def _extend_replications(self, experiment):
+        """Schedule the additional replications of an experiment required by
+        sequential stopping, if any
+        
+        Parameters
+        ----------
+        experiment : dict
+            The parameters of the experiment
+        """
+        replications = self.stopping.extend(experiment)
+        if not replications:
+            return
+        self._pending.extend((experiment, r) for r in replications)
+        self.n_exp += len(replications)
+        logger.info('Scheduling %d more replication(s) of experiment %s',
+                    len(replications), experiment)
+    
+    def _wait_completion(self):
+        """Block until an experiment submitted to the pool completes and
+        process its results
+        """
+        # Waiting on a queue with a timeout, unlike waiting without one, can
+        # be interrupted by signals, which keeps KeyboardInterrupt and the
+        # signal handlers working while waiting
+        while True:
+            try:
+                curr_exp, args = self._completed.get(timeout=1)
+            except Queue.Empty:
+                curr_exp, args = self._failed_job(), None
+                if curr_exp is None:
+                    continue
+            self._experiment_completed(curr_exp, args)
+            return
+    
+    def _failed_job(self):
+        """Return an experiment submitted to the pool which raised an
+        exception outside *run_scenario*, e.g. because its results could not
+        be pickled.
+        
+        The pool calls the callback of an experiment only if it succeeds,
+        hence failed experiments are detected by polling their handles.
+        
+        Returns
+        -------
+        curr_exp : int
+            The sequence number of the failed experiment or *None* if no
+            experiment failed
+        """
+        for curr_exp, job in self._jobs.items():
+            if job.ready() and not job.successful():
+                try:
+                    job.get()
+                except Exception as e:
+                    logger.error('Experiment %d | Failed | %s: %s',
+                                 curr_exp, type(e).__name__, e)
+                return curr_exp
+        return None
+    
+    def experiment_callback(self, args, replication=0):
         """Callback method called by run_scenario
         
         Parameters
         ----------
         args : tuple
             Tuple of arguments
+        replication : int, optional
+            The index of the replication of the experiment
         """
         # If args is None, that means that an exception was raised during the
         # execution of the experiment. In such case, ignore it
@@ -157,21 +360,506 @@ class Orchestrator(object):
         params, results, duration = args
         self.n_success += 1
         # Store results
-        self.results.add(params, results)
+        if self.journal is not None:
+            self.journal.append(params, results, replication)
+        else:
+            self.results.add(params, results)
         self.exp_durations.append(duration)
+        self.cost_model.observe(params, duration)
         if self.n_success % self.summary_freq == 0:
             # Number of experiments scheduled to be executed
             n_scheduled = self.n_exp - (self.n_fail + self.n_success)
-            # Compute ETA
+            # Compute ETA from the expected durations of experiments not yet
+            # completed
             n_cores = min(mp.cpu_count(), self.n_proc)
-            mean_duration = sum(self.exp_durations)/len(self.exp_durations)
-            eta = timestr(n_scheduled*mean_duration/n_cores, False)
+            remaining = self._pending.expected_duration() + \
+                        sum(self.cost_model.estimate(experiment)
+                            for experiment, _ in self._running.values())
+            eta = timestr(remaining/n_cores, False)
             # Print summary
             logger.info('SUMMARY | Completed: %d, Failed: %d, Scheduled: %d, ETA: %s', 
                         self.n_success, self.n_fail, n_scheduled, eta)
         
 
-def run_scenario(settings, params, curr_exp, n_exp):
+class ExperimentCostModel(object):
+    """Model of the expected duration of experiments, fed by the durations of
+    the experiments completed.
+    
+    The duration of an experiment is assumed to depend on its topology,
+    strategy, cache policy and network cache size. If experiments with the
+    same values of all these parameters were completed, the expected duration
+    is the mean of their durations. Otherwise, the mean duration of all
+    experiments is scaled, for each parameter, by the ratio between the mean
+    duration of the experiments with the same value of that parameter and the
+    mean duration of all experiments. Values never observed do not scale the
+    mean duration.
+    """
+    
+    # Parameters of an experiment affecting its duration
+    features = ('topology_name', 'strategy_name', 'cache_policy',
+                'network_cache')
+    
+    def __init__(self, default_cache_policy=None, default_duration=1.0):
+        """Constructor
+        
+        Parameters
+        ----------
+        default_cache_policy : str, optional
+            The cache policy of experiments not specifying it
+        default_duration : float, optional
+            The duration expected before any duration is observed
+        """
+        self.default_cache_policy = default_cache_policy
+        self.default_duration = default_duration
+        # Mean and number of durations observed, keyed by the values of all
+        # parameters and, for each parameter, keyed by its value
+        self._stats = {}
+        self._feature_stats = dict((f, {}) for f in self.features)
+        self._total_stats = [0.0, 0]
+    
+    def _key(self, params):
+        values = dict(params)
+        if values.get('cache_policy') is None:
+            values['cache_policy'] = self.default_cache_policy
+        return tuple(values.get(f) for f in self.features)
+    
+    @staticmethod
+    def _update(stats, duration):
+        stats[1] += 1
+        stats[0] += (duration - stats[0])/stats[1]
+    
+    def observe(self, params, duration):
+        """Add the duration of a completed experiment to the model
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        duration : float
+            The duration of the experiment
+        """
+        key = self._key(params)
+        self._update(self._stats.setdefault(key, [0.0, 0]), duration)
+        for feature, value in zip(self.features, key):
+            self._update(self._feature_stats[feature].setdefault(value, [0.0, 0]),
+                         duration)
+        self._update(self._total_stats, duration)
+    
+    def estimate(self, params):
+        """Return the expected duration of an experiment
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        
+        Returns
+        -------
+        duration : float
+            The expected duration
+        """
+        total_mean, total_count = self._total_stats
+        if total_count == 0:
+            return self.default_duration
+        key = self._key(params)
+        if key in self._stats:
+            return self._stats[key][0]
+        if total_mean == 0:
+            return 0.0
+        duration = total_mean
+        for feature, value in zip(self.features, key):
+            if value in self._feature_stats[feature]:
+                duration *= self._feature_stats[feature][value][0]/total_mean
+        return duration
+    
+    def known(self, params):
+        """Return whether experiments with the same value of each parameter
+        of a given experiment were observed
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        
+        Returns
+        -------
+        known : bool
+            *True* if all values of the parameters were observed
+        """
+        return all(value in self._feature_stats[feature]
+                   for feature, value in zip(self.features, self._key(params)))
+
+
+class _PendingExperiments(object):
+    """Queue of the experiments not yet started, as (experiment, replication)
+    pairs.
+    
+    Experiments are grouped by the parameters from which the cost model
+    estimates their duration, so that selecting the experiment with the
+    greatest expected duration requires one estimate per group rather than
+    one per experiment.
+    """
+    
+    def __init__(self, cost_model, experiments=()):
+        """Constructor
+        
+        Parameters
+        ----------
+        cost_model : ExperimentCostModel
+            The model of the expected duration of experiments
+        experiments : iterable of tuple, optional
+            The (experiment, replication) pairs initially in the queue
+        """
+        self.cost_model = cost_model
+        # Queue of (sequence number, experiment, replication) tuples of each
+        # group, keyed by the parameters affecting the duration. Sequence
+        # numbers keep track of the order in which experiments were added
+        self._groups = {}
+        self._seq = itertools.count()
+        self._len = 0
+        self.extend(experiments)
+    
+    def __len__(self):
+        return self._len
+    
+    def __iter__(self):
+        for _, experiment, replication in sorted(
+                itertools.chain.from_iterable(self._groups.values())):
+            yield experiment, replication
+    
+    def extend(self, experiments):
+        """Add experiments to the queue
+        
+        Parameters
+        ----------
+        experiments : iterable of tuple
+            The (experiment, replication) pairs to add
+        """
+        for experiment, replication in experiments:
+            key = self.cost_model._key(experiment)
+            self._groups.setdefault(key, collections.deque()).append(
+                                    (next(self._seq), experiment, replication))
+            self._len += 1
+    
+    def pop(self):
+        """Remove from the queue and return the experiment with the greatest
+        expected duration, giving precedence to experiments with parameter
+        values whose effect on duration was never observed. Among experiments
+        with equal priority, the one added first is returned.
+        
+        Returns
+        -------
+        experiment : dict
+            The parameters of the experiment
+        replication : int
+            The index of the replication of the experiment
+        """
+        # All experiments of a group have the same priority, hence only the
+        # first one of each group is compared
+        _, _, _, key = max((not self.cost_model.known(group[0][1]),
+                            self.cost_model.estimate(group[0][1]),
+                            -group[0][0], key)
+                           for key, group in self._groups.items())
+        group = self._groups[key]
+        _, experiment, replication = group.popleft()
+        if not group:
+            del self._groups[key]
+        self._len -= 1
+        return experiment, replication
+    
+    def expected_duration(self):
+        """Return the sum of the expected durations of the experiments in the
+        queue
+        
+        Returns
+        -------
+        duration : float
+            The expected duration
+        """
+        return sum(self.cost_model.estimate(group[0][1])*len(group)
+                   for group in self._groups.values())
+
+
+class SequentialStopping(object):
+    """Sequential stopping rule deciding how many times each experiment is
+    replicated.
+    
+    Each experiment is replicated until the confidence intervals of the means
+    of selected metrics, computed over its replications, are tight enough,
+    i.e. their half-width is not greater than a given fraction of the mean,
+    or until a maximum number of replications is reached.
+    
+    Replications are added in batches: when all replications of an experiment
+    scheduled so far are completed and the confidence intervals are not tight
+    enough, the number of replications needed is estimated from the current
+    half-widths, which are inversely proportional to the square root of the
+    number of replications, and the missing replications are scheduled at
+    once, so that they can be executed in parallel. Since estimates based on
+    few replications are inaccurate, the number of replications is at most
+    doubled at a time.
+    """
+    
+    def __init__(self, metrics, precision, confidence=0.95,
+                 max_replications=20):
+        """Constructor
+        
+        Parameters
+        ----------
+        metrics : list
+            The metrics whose confidence intervals are computed. Each metric
+            is the path of the metric in the results tree, e.g.
+            ('CACHE_HIT_RATIO', 'MEAN')
+        precision : float
+            The maximum half-width of confidence intervals, as a fraction of
+            the mean
+        confidence : float, optional
+            The confidence level of confidence intervals
+        max_replications : int, optional
+            The maximum number of replications of an experiment
+        """
+        if precision <= 0:
+            raise ValueError('precision must be positive')
+        self.metrics = [tuple(m) for m in metrics]
+        self.precision = precision
+        self.confidence = confidence
+        self.max_replications = max_replications
+        # Number of replications scheduled, including completed ones, number
+        # of replications not yet completed and values of metrics measured in
+        # completed replications, keyed by experiment
+        self._n_replications = collections.defaultdict(int)
+        self._n_running = collections.defaultdict(int)
+        self._values = collections.defaultdict(list)
+    
+    @staticmethod
+    def _key(params):
+        return repr(sorted(Tree(params)))
+    
+    def schedule(self, params, replication):
+        """Record that a replication of an experiment is scheduled
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        replication : int
+            The index of the replication
+        """
+        key = self._key(params)
+        self._n_replications[key] = max(self._n_replications[key],
+                                        replication + 1)
+        self._n_running[key] += 1
+    
+    def observe(self, params, results):
+        """Record the completion of a replication of an experiment
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        results : Tree
+            The results of the replication or *None* if it failed
+        """
+        key = self._key(params)
+        self._n_running[key] -= 1
+        if results is not None:
+            results = Tree(results)
+            self._values[key].append([results.getval(m) for m in self.metrics])
+    
+    def n_required(self, params):
+        """Return the number of replications of an experiment required for
+        the confidence intervals to be tight enough, estimated from the
+        replications completed
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        
+        Returns
+        -------
+        n_required : int
+            The estimated number of replications required, not greater than
+            twice the number of replications completed and than the maximum
+            number of replications
+        """
+        values = self._values[self._key(params)]
+        n = len(values)
+        if n < 2:
+            return min(n + 1, self.max_replications)
+        n_required = n
+        for i in range(len(self.metrics)):
+            data = [v[i] for v in values if v[i] is not None]
+            if len(data) < 2:
+                continue
+            mean, err = means_confidence_interval(data, self.confidence)
+            target = self.precision*abs(mean)
+            if err <= target:
+                continue
+            if target == 0:
+                return self.max_replications
+            n_required = max(n_required,
+                             int(math.ceil(len(data)*(err/target)**2)))
+        # Estimates based on few replications are inaccurate, hence the
+        # number of replications is at most doubled at a time
+        return min(n_required, 2*n, self.max_replications)
+    
+    def extend(self, params):
+        """Schedule the additional replications of an experiment required,
+        if all its replications scheduled so far are completed
+        
+        Parameters
+        ----------
+        params : dict
+            The parameters of the experiment
+        
+        Returns
+        -------
+        replications : list
+            The indices of the replications scheduled, possibly empty
+        """
+        key = self._key(params)
+        if self._n_running[key] > 0:
+            return []
+        # Failed replications do not count towards the replications required
+        # but they count towards the maximum number of replications
+        n_failed = self._n_replications[key] - len(self._values[key])
+        replications = range(self._n_replications[key],
+                             min(n_failed + self.n_required(params),
+                                 self.max_replications))
+        for replication in replications:
+            self.schedule(params, replication)
+        return replications
+
+
+class ScenarioCache(object):
+    """LRU cache of topologies and shortest paths built by a process.
+    
+    Building a scenario requires parsing the topology, placing contents and
+    computing all-pair shortest paths, which for large topologies and content
+    populations may take a considerable time. This cache allows experiments
+    run by the same process on the same topology to reuse them.
+    
+    Topologies are keyed by (topology_name, n_contents, seed). When a topology
+    is reused, only cache sizes are placed again, according to the
+    *network_cache* of the experiment. This assumes, as it is the case for all
+    topology factories provided by Icarus, that caches are placed using
+    *uniform_cache_placement*. Since contents are placed randomly, topologies
+    are reused only if a seed is set. Shortest paths only depend on the
+    structure of the topology and are reused regardless, keyed by topology
+    fingerprint.
+    """
+    
+    def __init__(self, maxlen, shortest_path_cache_dir=None):
+        """Constructor
+        
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of topologies and of shortest path tables
+            cached
+        shortest_path_cache_dir : str, optional
+            If specified, shortest paths not cached in memory are loaded from
+            this directory, as done by *load_shortest_paths*
+        """
+        if maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self.maxlen = maxlen
+        self.shortest_path_cache_dir = shortest_path_cache_dir
+        self._topologies = collections.OrderedDict()
+        self._shortest_paths = collections.OrderedDict()
+    
+    def _get(self, cache, key):
+        value = cache.pop(key)
+        cache[key] = value
+        return value
+    
+    def _put(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.maxlen:
+            cache.popitem(last=False)
+    
+    def topology(self, topology_name, network_cache, n_contents, seed=None):
+        """Return a topology, building it only if not cached
+        
+        Parameters
+        ----------
+        topology_name : str
+            The name of the topology factory
+        network_cache : float
+            Size of network cache (sum of all caches) normalized by size of
+            content population
+        n_contents : int
+            Size of content population
+        seed : int, optional
+            The seed used for random number generation
+        
+        Returns
+        -------
+        topology : fnss.Topology
+            The topology object
+        """
+        key = (topology_name, n_contents, seed)
+        if seed is None or key not in self._topologies:
+            topology = topology_factory_register[topology_name](network_cache,
+                                                                n_contents,
+                                                                seed=seed)
+            if seed is not None:
+                self._put(self._topologies, key, topology)
+            return topology
+        topology = self._get(self._topologies, key)
+        caches = [v for v in topology.nodes_iter()
+                  if fnss.get_stack(topology, v)[0] == 'cache']
+        cache_placement = uniform_cache_placement(topology,
+                                                  network_cache*n_contents,
+                                                  caches)
+        for node, size in cache_placement.iteritems():
+            fnss.add_stack(topology, node, 'cache', {'size': size})
+        return topology
+    
+    def shortest_paths(self, topology):
+        """Return the all-pair shortest paths of a topology, computing them
+        only if not cached
+        
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology object
+        
+        Returns
+        -------
+        shortest_paths : ShortestPaths
+            The shortest paths of the topology
+        """
+        key = topology_fingerprint(topology)
+        if key in self._shortest_paths:
+            return self._get(self._shortest_paths, key)
+        if self.shortest_path_cache_dir:
+            shortest_paths = load_shortest_paths(topology,
+                                                 self.shortest_path_cache_dir)
+        else:
+            shortest_paths = ShortestPaths(sorted(topology.nodes_iter()),
+                                           predecessor_matrix(topology))
+        self._put(self._shortest_paths, key, shortest_paths)
+        return shortest_paths
+
+
+def _run_scenario_job(settings, params, curr_exp, n_exp, replication=0):
+    """Run a single scenario experiment in a process of a pool.
+    
+    Pool processes do not report exceptions not derived from Exception, such
+    as the SystemExit raised by *run_scenario* when interrupted, and the
+    experiment never completes. This function reraises them as exceptions
+    that the pool reports as a failure of the experiment.
+    
+    Parameters and return values are the same of *run_scenario*.
+    """
+    try:
+        return run_scenario(settings, params, curr_exp, n_exp, replication)
+    except SystemExit as e:
+        raise RuntimeError('Process exited with status %s' % e.code)
+
+
+def run_scenario(settings, params, curr_exp, n_exp, replication=0):
     """Run a single scenario experiment
     
     Parameters
@@ -184,6 +872,9 @@ def run_scenario(settings, params, curr_exp, n_exp):
         sequence number of the experiment
     n_exp : int
         Number of scheduled experiments
+    replication : int, optional
+        The index of the replication of the experiment. If a seed is set, each
+        replication uses a different seed derived from it
     
     Returns
     -------
@@ -209,6 +900,10 @@ def run_scenario(settings, params, curr_exp, n_exp):
                        and params['cache_policy'] is not None \
                        else settings.CACHE_POLICY
         metrics = settings.DATA_COLLECTORS
+        workload_name = settings.WORKLOAD if 'WORKLOAD' in settings \
+                        else 'STATIONARY'
+        workload_params = settings.WORKLOAD_PARAMS \
+                          if 'WORKLOAD_PARAMS' in settings else {}
         
         scenario = "%s, %s, alpha: %s, netcache: %s" % (topology_name, strategy_name, str(alpha), str(network_cache))
         logger.info('Experiment %d/%d | Preparing scenario: %s', curr_exp, n_exp, scenario)
@@ -226,21 +921,75 @@ def run_scenario(settings, params, curr_exp, n_exp):
         if any(m not in data_collector_register for m in metrics):
             logger.error('There are no implementations for at least one data collector specified')
             return None
-        # Get user-defined seed, if any
-        seed = settings.SEED if 'SEED' in settings else None
+        if workload_name not in workload_register:
+            logger.error('No implementation of workload %s was found.' % workload_name)
+            return None
+        # Get the seed of this replication, derived from the user-defined
+        # seed, if any
+        seed = _replication_seed(settings.SEED if 'SEED' in settings
+                                 else None, replication)
+        # Get method used to sample content popularity, if specified
+        sampling_method = settings.SAMPLING_METHOD \
+                          if 'SAMPLING_METHOD' in settings else 'cdf'
         # Get topology and event generator
-        topology = topology_factory_register[topology_name](network_cache, n_contents, seed=seed)   
-        events = uniform_req_gen(topology, n_contents, alpha,
+        scenario_cache = _get_scenario_cache(settings)
+        if scenario_cache is not None:
+            topology = scenario_cache.topology(topology_name, network_cache,
+                                               n_contents, seed)
+        else:
+            topology = topology_factory_register[topology_name](network_cache, n_contents, seed=seed)   
+        if workload_name == 'STATIONARY':
+            events = uniform_req_gen(topology, n_contents, alpha,
                                           rate=settings.NETWORK_REQUEST_RATE,
                                           n_warmup=settings.N_WARMUP_REQUESTS,
                                           n_measured=settings.N_MEASURED_REQUESTS,
-                                          seed=seed)
+                                          seed=seed,
+                                          sampling_method=sampling_method)
+        else:
+            events = workload_register[workload_name](topology, n_contents,
+                                          n_warmup=settings.N_WARMUP_REQUESTS,
+                                          n_measured=settings.N_MEASURED_REQUESTS,
+                                          seed=seed, **workload_params)
+        # Replay the workload stored for this topology, alpha and seed, if
+        # workloads are shared across experiments, storing it the first time.
+        # Other workloads are read from disk already
+        if workload_name == 'STATIONARY' and seed is not None \
+                and 'WORKLOAD_DIR' in settings and settings.WORKLOAD_DIR:
+            path = _workload_path(settings, params, seed, sampling_method)
+            if not os.path.exists(path):
+                logger.info('Experiment %d/%d | Storing workload',
+                            curr_exp, n_exp)
+                save_workload(events, path)
+            events = stored_req_gen(path, seed=seed)
         topology.graph['cache_policy'] = cache_policy
+        # Load shortest paths from cache, if a cache directory is specified
+        if scenario_cache is not None:
+            shortest_path = scenario_cache.shortest_paths(topology)
+        elif 'SHORTEST_PATH_CACHE_DIR' in settings \
+                and settings.SHORTEST_PATH_CACHE_DIR:
+            shortest_path = load_shortest_paths(topology,
+                                                settings.SHORTEST_PATH_CACHE_DIR)
+        else:
+            shortest_path = None
+        # Get the snapshot of the network state after warm-up, if snapshots
+        # are enabled. Since warm-up is random, they are used only if a seed
+        # is set
+        if seed is not None and 'WARMUP_SNAPSHOT_DIR' in settings \
+                and settings.WARMUP_SNAPSHOT_DIR:
+            warmup_snapshot = _warmup_snapshot_path(settings, params,
+                                                    cache_policy, seed,
+                                                    sampling_method,
+                                                    workload_name,
+                                                    workload_params)
+        else:
+            warmup_snapshot = None
     
         collectors = [(m, {}) for m in metrics]
         strategy = (strategy_name, strategy_params)
         logger.info('Experiment %d/%d | Start simulation', curr_exp, n_exp)
-        results = exec_experiment(topology, events, strategy, collectors)
+        results = exec_experiment(topology, events, strategy, collectors,
+                                  shortest_path, warmup_snapshot,
+                                  _warmup_detection(settings))
         duration = time.time() - start_time
         logger.info('Experiment %d/%d | End simulation | Duration %s.', 
                     curr_exp, n_exp, timestr(duration, True))
@@ -254,3 +1003,161 @@ def run_scenario(settings, params, curr_exp, n_exp):
         logger.error('Experiment %d/%d | Failed | %s: %s\n%s',
                      curr_exp, n_exp, err_type, err_message,
                      traceback.format_exc())
+
+
+def _get_scenario_cache(settings):
+    """Return the scenario cache of the current process, creating it the first
+    time this function is called.
+    
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    
+    Returns
+    -------
+    scenario_cache : ScenarioCache
+        The scenario cache or *None* if caching is disabled by the settings
+    """
+    global _scenario_cache
+    if 'SCENARIO_CACHE_SIZE' not in settings or not settings.SCENARIO_CACHE_SIZE:
+        return None
+    if _scenario_cache is None:
+        shortest_path_cache_dir = settings.SHORTEST_PATH_CACHE_DIR \
+                                  if 'SHORTEST_PATH_CACHE_DIR' in settings \
+                                  else None
+        _scenario_cache = ScenarioCache(settings.SCENARIO_CACHE_SIZE,
+                                        shortest_path_cache_dir)
+    return _scenario_cache
+
+
+def _replication_seed(seed, replication):
+    """Return the seed used by a replication of an experiment
+    
+    The first replication uses the user-defined seed, so that experiments
+    that are not replicated are not affected, while the other replications
+    use seeds derived from the user-defined seed and the replication index.
+    
+    Parameters
+    ----------
+    seed : int
+        The user-defined seed or *None* if not set
+    replication : int
+        The index of the replication
+    
+    Returns
+    -------
+    seed : int
+        The seed of the replication or *None* if no seed is set
+    """
+    if seed is None or replication == 0:
+        return seed
+    digest = hashlib.md5(repr((seed, replication))).hexdigest()
+    # Seeds must be representable as 32-bit unsigned integers for NumPy
+    return int(digest[:8], 16)
+
+
+def _warmup_snapshot_path(settings, params, cache_policy, seed,
+                          sampling_method, workload_name='STATIONARY',
+                          workload_params={}):
+    """Return the path of the snapshot of the network state after the warm-up
+    phase of an experiment.
+    
+    The snapshot is identified by all the parameters affecting the warm-up
+    phase, so that it is shared by all experiments with the same warm-up,
+    regardless, for example, of the number of measured requests.
+    
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    params : dict
+        Dictionary of parameters of the experiment
+    cache_policy : str
+        The cache policy of the experiment
+    seed : int
+        The seed of the experiment
+    sampling_method : str
+        The method used to sample content popularity
+    workload_name : str, optional
+        The name of the workload
+    workload_params : dict, optional
+        The parameters of the workload
+    
+    Returns
+    -------
+    path : str
+        The path of the snapshot file
+    """
+    warmup_detection = _warmup_detection(settings)
+    if warmup_detection is not None:
+        warmup_detection = sorted(warmup_detection.items())
+    key = (params['topology_name'], cache_policy, params['strategy_name'],
+           sorted(Tree(params['strategy_params'])), params['alpha'],
+           params['network_cache'], params['n_contents'], seed,
+           settings.N_WARMUP_REQUESTS, settings.NETWORK_REQUEST_RATE,
+           sampling_method, workload_name, sorted(workload_params.items()),
+           warmup_detection)
+    try:
+        os.makedirs(settings.WARMUP_SNAPSHOT_DIR)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    return os.path.join(settings.WARMUP_SNAPSHOT_DIR,
+                        '%s.pickle' % hashlib.sha1(repr(key)).hexdigest())
+
+
+def _warmup_detection(settings):
+    """Return the parameters of the adaptive detection of the end of the
+    warm-up phase.
+    
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    
+    Returns
+    -------
+    params : dict
+        The parameters of the warm-up detector or *None* if the warm-up phase
+        is not detected adaptively
+    """
+    if 'ADAPTIVE_WARMUP' not in settings or not settings.ADAPTIVE_WARMUP:
+        return None
+    return dict(settings.ADAPTIVE_WARMUP_PARAMS) \
+           if 'ADAPTIVE_WARMUP_PARAMS' in settings else {}
+
+
+def _workload_path(settings, params, seed, sampling_method):
+    """Return the path of the file storing the workload of an experiment.
+    
+    The workload is identified by all the parameters affecting the generation
+    of events, so that it is shared by all experiments differing only in
+    strategy, cache policy or network cache.
+    
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    params : dict
+        Dictionary of parameters of the experiment
+    seed : int
+        The seed of the experiment
+    sampling_method : str
+        The method used to sample content popularity
+    
+    Returns
+    -------
+    path : str
+        The path of the workload file
+    """
+    key = (params['topology_name'], params['alpha'], params['n_contents'],
+           seed, settings.N_WARMUP_REQUESTS, settings.N_MEASURED_REQUESTS,
+           settings.NETWORK_REQUEST_RATE, sampling_method)
+    try:
+        os.makedirs(settings.WORKLOAD_DIR)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    return os.path.join(settings.WORKLOAD_DIR,
+                        '%s.bin' % hashlib.sha1(repr(key)).hexdigest())
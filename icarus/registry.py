@@ -10,6 +10,9 @@ topology_factory_register = {}
 # Dictionary storying all network topologies keyed by ID
 data_collector_register = {}
 
+# Dictionary storying all workload generators keyed by ID
+workload_register = {}
+
 # Dictionary storying all results reader functions keyed by ID
 results_reader_register = {}
 
@@ -49,5 +52,6 @@ register_cache_policy = register_decorator(cache_policy_register)
 register_strategy = register_decorator(strategy_register)
 register_topology_factory = register_decorator(topology_factory_register)
 register_data_collector = register_decorator(data_collector_register)
+register_workload = register_decorator(workload_register)
 register_results_reader = register_decorator(results_reader_register)
 register_results_writer = register_decorator(results_writer_register)
@@ -9,7 +9,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from icarus.util import Tree, step_cdf
-from icarus.tools import means_confidence_interval
+from icarus.tools import means_confidence_interval, LogHistogram
 
 
 __all__ = ['plot_lines', 'plot_bar_chart', 'plot_cdf']
@@ -455,8 +455,11 @@ def plot_cdf(resultset, desc, filename, plotdir):
          path to identify a specific metric into an entry of a result set.
          Normally, it is a 2-value list where the first value is the name of
          the collector which measured the metric and the second value is the
-         metric name. The metric must be a CDF.
+         metric name. The metric must be a CDF or a histogram.
          Example values could be ['LATENCY', 'CDF'].
+         If the metric is a histogram, e.g. ['LATENCY', 'HISTOGRAM'], the
+         histograms of all matching results, e.g. of all replications of an
+         experiment, are merged and their CDF is plotted.
      * filter : dict, optional
          A dictionary of values to filter in the resultset.
          Example: {'network_cache': 0.004, 'topology_name': 'GEANT'}
@@ -545,9 +548,14 @@ def plot_cdf(resultset, desc, filename, plotdir):
         if ycondnames is not None:
             condition.setval(ycondnames[i], ycondvals[i])      
         data = [v.getval(ymetrics[i]) for _, v in resultset.filter(condition)]
-        # If there are more than 1 CDFs in the resultset, take the first one
+        # If there are more than 1 CDFs in the resultset, take the first one,
+        # while histograms are merged
         if data:
-            x_cdf, y_cdf = data[0]
+            if isinstance(data[0], LogHistogram):
+                x_cdf, y_cdf = resultset.histogram(ymetrics[i],
+                                                   condition).cdf()
+            else:
+                x_cdf, y_cdf = data[0]
             if step:
                 x_cdf, y_cdf = step_cdf(x_cdf, y_cdf)
         else:
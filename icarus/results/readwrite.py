@@ -1,5 +1,6 @@
 """Functions for reading and writing results
 """
+import os
 import collections
 import copy
 try:
@@ -7,11 +8,14 @@ try:
 except ImportError:
     import pickle
 from icarus.util import Tree
+from icarus.tools import LogHistogram
 from icarus.registry import register_results_reader, register_results_writer
 
 
 __all__ = [
     'ResultSet',
+    'ResultsJournal',
+    'read_results_journal',
     'write_results_pickle',
     'read_results_pickle'
            ]
@@ -22,6 +26,13 @@ class ResultSet(object):
     
     All operations that write data are thread-safe so that this object can 
     be shared by different processes.
+    
+    To filter results efficiently, the result set indexes experiment
+    parameters: for each path of the parameters tree, it maps each value to
+    the list of results having that value. Filtering only reads the results
+    matching the condition on the most selective parameter, rather than all
+    results. The index is built the first time results are filtered and then
+    updated as results are added. It is not pickled.
     """
     
     def __init__(self, attr=None):
@@ -32,9 +43,27 @@ class ResultSet(object):
         attr : dict, optional
             Dictionary of common attributes to all experiments
         """
-        self._results = collections.deque()
+        self._results = []
         # Dict of global attributes common to all experiments
         self.attr = attr if attr is not None else {}
+        # Index of parameters, keyed by path and value. Paths with values
+        # that cannot be hashed are not indexed
+        self._index = None
+        self._unindexed = set()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        state['_unindexed'] = set()
+        return state
+    
+    def __setstate__(self, state):
+        # Result sets pickled by previous versions stored results in a deque
+        # and have no index
+        state['_results'] = list(state['_results'])
+        state.setdefault('_index', None)
+        state.setdefault('_unindexed', set())
+        self.__dict__.update(state)
     
     def __len__(self):
         """Returns the number of results in the resultset
@@ -110,6 +139,62 @@ class ResultSet(object):
         if not isinstance(results, Tree):
             results = Tree(results)
         self._results.append((parameters, results))
+        if self._index is not None:
+            self._index_parameters(len(self._results) - 1, parameters)
+    
+    def _index_parameters(self, i, parameters):
+        """Add the parameters of the i-th result to the index
+        """
+        for path, value in parameters:
+            try:
+                self._index[path][value].append(i)
+            except TypeError:
+                self._unindexed.add(path)
+    
+    def _build_index(self):
+        """Build the index of parameters of all results
+        """
+        self._index = collections.defaultdict(
+                                lambda: collections.defaultdict(list))
+        self._unindexed = set()
+        for i, (parameters, _) in enumerate(self._results):
+            self._index_parameters(i, parameters)
+    
+    def _matching(self, condition):
+        """Return the indices of the results matching a condition, sorted
+        """
+        if self._index is None:
+            self._build_index()
+        candidates = []
+        unindexed = []
+        for path, value in Tree(condition):
+            # Values not hashable and None, which is matched by parameters
+            # not set, cannot be looked up in the index
+            if value is None or path in self._unindexed:
+                unindexed.append((path, value))
+                continue
+            try:
+                rows = self._index[path].get(value, []) \
+                       if path in self._index else []
+            except TypeError:
+                unindexed.append((path, value))
+                continue
+            candidates.append(rows)
+        if candidates:
+            candidates.sort(key=len)
+            matching = set(candidates[0])
+            for rows in candidates[1:]:
+                if not matching:
+                    break
+                matching.intersection_update(rows)
+            matching = sorted(matching)
+        else:
+            matching = range(len(self._results))
+        if unindexed:
+            matching = [i for i in matching
+                        if all(self._results[i][0].getval(path) == value
+                               for path, value in unindexed)]
+        return matching
     
     def dump(self):
         """Dump all results.
@@ -145,11 +230,248 @@ class ResultSet(object):
             a tree with experiment results.
         """
         filtered_resultset = ResultSet()
-        for parameters, results in self._results:
-            parameters = Tree(parameters)
-            if parameters.match(condition):
-                filtered_resultset.add(parameters, results)
+        for i in self._matching(condition):
+            filtered_resultset.add(*self._results[i])
         return filtered_resultset
+    
+    def values(self, path):
+        """Return all distinct values of a parameter
+        
+        Parameters
+        ----------
+        path : iterable
+            The path of the parameter in the parameters tree, e.g. ['alpha']
+        
+        Returns
+        -------
+        values : list
+            The values of the parameter, in the order in which they first
+            appear in the result set. Results not having the parameter are
+            ignored
+        """
+        path = tuple(path)
+        if self._index is None:
+            self._build_index()
+        if path not in self._unindexed:
+            index = self._index.get(path, {})
+            return sorted(index, key=lambda v: index[v][0])
+        values = []
+        for parameters, _ in self._results:
+            value = parameters.getval(path)
+            if value is not None and not isinstance(value, Tree) \
+                    and value not in values:
+                values.append(value)
+        return values
+    
+    def groupby(self, path):
+        """Group results by the value of a parameter
+        
+        Parameters
+        ----------
+        path : iterable
+            The path of the parameter in the parameters tree, e.g. ['alpha']
+        
+        Returns
+        -------
+        groups : OrderedDict
+            Dictionary mapping each value of the parameter, in the order in
+            which they first appear, to the result set of results having that
+            value
+        """
+        groups = collections.OrderedDict()
+        for value in self.values(path):
+            condition = Tree()
+            condition.setval(tuple(path), value)
+            groups[value] = self.filter(condition)
+        return groups
+
+    def histogram(self, metric, condition=None):
+        """Return the histogram of a metric merging the histograms of all
+        results matching specific conditions, e.g. all replications of an
+        experiment.
+        
+        Parameters
+        ----------
+        metric : iterable
+            The path in the results tree to the histogram, e.g.
+            ['LATENCY', 'HISTOGRAM']
+        condition : dict, optional
+            Dictionary listing all parameters and values to be matched in the
+            results set, as in *filter*. If not specified, all results are
+            merged
+        
+        Returns
+        -------
+        histogram : LogHistogram
+            The merged histogram or *None* if no result matching the
+            conditions has a histogram of the metric
+        """
+        histogram = None
+        rows = self._matching(condition) if condition is not None \
+               else range(len(self._results))
+        for i in rows:
+            hist = self._results[i][1].getval(metric)
+            if hist is None:
+                continue
+            if histogram is None:
+                histogram = LogHistogram(hist.relative_error)
+            histogram.merge(hist)
+        return histogram
+
+
+class ResultsJournal(object):
+    """Append-only journal of experiment results.
+    
+    Results of each experiment are appended to the journal file as soon as
+    the experiment completes and flushed to disk, so that they are not lost if
+    the simulator crashes or is killed. The journal can be reopened to resume
+    an interrupted simulation campaign, skipping completed experiments.
+    
+    Each record of the journal is a pickled (parameters, replication, results)
+    tuple, where replication is the index of the replication of the
+    experiment.
+    """
+    
+    def __init__(self, path, resume=False):
+        """Constructor
+        
+        Parameters
+        ----------
+        path : str
+            The path of the journal file
+        resume : bool, optional
+            If *True* and the journal file exists, records already in it are
+            kept and new records are appended to them. Otherwise, the journal
+            file is truncated
+        """
+        self.path = path
+        self._completed = set()
+        offset = 0
+        if resume and os.path.exists(path):
+            with open(path, 'rb') as journal_file:
+                for params, replication, _ in _read_records(journal_file):
+                    self._completed.add(_record_key(params, replication))
+                    offset = journal_file.tell()
+        self._file = open(path, 'ab' if resume else 'wb')
+        # Drop a record left partially written by a crash, if any
+        self._file.truncate(offset)
+    
+    def __len__(self):
+        """Return the number of experiments in the journal
+        
+        Returns
+        -------
+        len : int
+            The number of experiments
+        """
+        return len(self._completed)
+    
+    def append(self, params, results, replication=0):
+        """Append the results of an experiment to the journal
+        
+        Parameters
+        ----------
+        params : dict
+            Dictionary of experiment parameters
+        results : dict
+            Dictionary of experiment results
+        replication : int, optional
+            The index of the replication of the experiment
+        """
+        pickle.dump((params, replication, results), self._file,
+                    pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._completed.add(_record_key(params, replication))
+    
+    def completed(self, params, replication=0):
+        """Return whether the results of an experiment are in the journal
+        
+        Parameters
+        ----------
+        params : dict
+            Dictionary of experiment parameters
+        replication : int, optional
+            The index of the replication of the experiment
+        
+        Returns
+        -------
+        completed : bool
+            *True* if the results of the experiment are in the journal
+        """
+        return _record_key(params, replication) in self._completed
+    
+    def resultset(self):
+        """Build a result set from the results in the journal
+        
+        Returns
+        -------
+        resultset : ResultSet
+            The result set
+        """
+        resultset = ResultSet()
+        for params, _, results in read_results_journal(self.path):
+            resultset.add(params, results)
+        return resultset
+    
+    def close(self):
+        """Close the journal file
+        """
+        self._file.close()
+
+
+def _record_key(params, replication):
+    """Return a hashable key identifying an experiment replication
+    """
+    return (repr(sorted(Tree(params))), replication)
+
+
+def _read_records(journal_file):
+    """Iterate over the records of a journal file, stopping at the end of the
+    file or at the last record, if it was partially written.
+    
+    Raises
+    ------
+    pickle.UnpicklingError
+        If a record which is not the last one cannot be read
+    """
+    size = os.fstat(journal_file.fileno()).st_size
+    while True:
+        try:
+            record = pickle.load(journal_file)
+        except EOFError:
+            # Either the end of the file was reached or the last record was
+            # partially written
+            return
+        except Exception:
+            # A partially written record may also be read as invalid data,
+            # but only if reading it reached the end of the file. Any other
+            # error means that the journal is corrupted
+            if journal_file.tell() >= size:
+                return
+            raise
+        yield record
+
+
+def read_results_journal(path):
+    """Iterate over the records of a results journal.
+    
+    Records are read one at a time, so that the journal does not need to be
+    entirely loaded in memory.
+    
+    Parameters
+    ----------
+    path : str
+        The path of the journal file
+    
+    Returns
+    -------
+    records : iterator
+        Iterator over (parameters, replication, results) tuples
+    """
+    with open(path, 'rb') as journal_file:
+        for record in _read_records(journal_file):
+            yield record
 
 
 @register_results_writer('PICKLE')
@@ -7,8 +7,18 @@ else:
     except ImportError:
         raise ImportError("The unittest2 package is needed to run the tests.") 
 del sys
+import os
+import shutil
+import tempfile
+import collections
+import itertools
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
-from icarus.results import ResultSet
+from icarus.results import ResultSet, ResultsJournal, read_results_journal
+from icarus.tools import LogHistogram
 
 class TestResultSet(unittest.TestCase):
 
@@ -55,4 +65,183 @@ class TestResultSet(unittest.TestCase):
     def test_filter_no_match(self):
         filtered_rs = self.rs.filter({'gamma': 3})
         self.assertEquals(3, len(filtered_rs))
-        
\ No newline at end of file
+        
+
+    def test_histogram(self):
+        rs = ResultSet()
+        for i, alpha in enumerate((0.6, 0.6, 0.8)):
+            hist = LogHistogram()
+            hist.update(range(10*i, 10*(i + 1)))
+            rs.add({'alpha': alpha}, {'LATENCY': {'HISTOGRAM': hist}})
+        hist = rs.histogram(['LATENCY', 'HISTOGRAM'], {'alpha': 0.6})
+        self.assertEquals(20, len(hist))
+        self.assertEquals(19, hist.max)
+        self.assertEquals(30, len(rs.histogram(['LATENCY', 'HISTOGRAM'])))
+        self.assertEquals(None, rs.histogram(['LATENCY', 'HISTOGRAM'],
+                                             {'alpha': 1.0}))
+
+
+class TestResultSetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.rs = ResultSet()
+        for alpha, strategy, p in itertools.product([0.6, 0.8, 1.0],
+                                                    ['LCE', 'PROB_CACHE'],
+                                                    [0.2, 0.5]):
+            strategy_params = {'p': p} if strategy == 'PROB_CACHE' else {}
+            self.rs.add({'alpha': alpha, 'strategy_name': strategy,
+                         'strategy_params': strategy_params,
+                         'nodes': [1, 2] if p == 0.2 else [3]},
+                        {'CACHE_HIT_RATIO': {'MEAN': alpha*p}})
+
+    def assert_filter(self, condition):
+        expected = [r for r in self.rs if r[0].match(condition)]
+        self.assertEquals(expected, self.rs.filter(condition).dump())
+        return len(expected)
+
+    def test_filter(self):
+        self.assertEquals(4, self.assert_filter({'alpha': 0.8}))
+        self.assertEquals(2, self.assert_filter({'alpha': 0.8,
+                                                 'strategy_name': 'LCE'}))
+        self.assertEquals(3, self.assert_filter({'strategy_params':
+                                                 {'p': 0.5}}))
+        self.assertEquals(0, self.assert_filter({'alpha': 0.7}))
+        self.assertEquals(0, self.assert_filter({'beta': 0.8}))
+        self.assertEquals(12, self.assert_filter({}))
+
+    def test_filter_none(self):
+        self.assertEquals(6, self.assert_filter({'strategy_params':
+                                                 {'p': None}}))
+        self.assertEquals(2, self.assert_filter({'alpha': 1.0,
+                                                 'strategy_params':
+                                                 {'p': None}}))
+
+    def test_filter_unhashable(self):
+        self.assertEquals(6, self.assert_filter({'nodes': [1, 2]}))
+        self.assertEquals(3, self.assert_filter({'nodes': [3],
+                                                 'strategy_name': 'LCE'}))
+
+    def test_filter_after_add(self):
+        self.rs.filter({'alpha': 0.8})
+        self.rs.add({'alpha': 0.8, 'strategy_name': 'LCD'}, {})
+        self.assertEquals(5, self.assert_filter({'alpha': 0.8}))
+        self.assertEquals(1, self.assert_filter({'strategy_name': 'LCD'}))
+
+    def test_values(self):
+        self.assertEquals([0.6, 0.8, 1.0], self.rs.values(['alpha']))
+        self.assertEquals([0.2, 0.5], self.rs.values(['strategy_params', 'p']))
+        self.assertEquals([[1, 2], [3]], self.rs.values(['nodes']))
+        self.assertEquals([], self.rs.values(['beta']))
+
+    def test_groupby(self):
+        groups = self.rs.groupby(['strategy_name'])
+        self.assertEquals(['LCE', 'PROB_CACHE'], list(groups))
+        self.assertEquals(self.rs.filter({'strategy_name': 'LCE'}).dump(),
+                          groups['LCE'].dump())
+
+    def test_add(self):
+        self.rs.filter({'alpha': 0.8})
+        rs = self.rs + self.rs
+        self.assertEquals(24, len(rs))
+        self.assertEquals(8, len(rs.filter({'alpha': 0.8})))
+        self.assertEquals(12, len(self.rs))
+
+    def test_pickle(self):
+        self.rs.filter({'alpha': 0.8})
+        rs = pickle.loads(pickle.dumps(self.rs, pickle.HIGHEST_PROTOCOL))
+        self.assertEquals(self.rs.dump(), rs.dump())
+        self.assertEquals(4, len(rs.filter({'alpha': 0.8})))
+
+    def test_unpickle_deque(self):
+        # Result sets pickled by previous versions store results in a deque
+        rs = ResultSet.__new__(ResultSet)
+        rs.__setstate__({'_results': collections.deque(self.rs),
+                         'attr': {}})
+        self.assertEquals(self.rs.dump(), rs.dump())
+        self.assertEquals(self.rs[-1], rs[-1])
+        self.assertEquals(4, len(rs.filter({'alpha': 0.8})))
+
+
+class TestResultsJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'results.journal')
+        self.params = {'alpha': 0.8, 'strategy_params': {'p': 0.5}}
+        self.results = {'m1': 1, 'm2': {'a': 2}}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        journal.append(self.params, self.results, 1)
+        journal.close()
+        records = list(read_results_journal(self.path))
+        self.assertEquals(2, len(records))
+        self.assertEquals((self.params, 1, self.results), records[1])
+        resultset = journal.resultset()
+        self.assertEquals(2, len(resultset))
+        self.assertEquals(self.params['alpha'], resultset[0][0]['alpha'])
+        self.assertEquals(self.results['m2']['a'], resultset[0][1]['m2']['a'])
+
+    def test_completed(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        self.assertTrue(journal.completed(self.params, 0))
+        self.assertTrue(journal.completed(dict(self.params), 0))
+        self.assertFalse(journal.completed(self.params, 1))
+        self.assertFalse(journal.completed({'alpha': 0.8}, 0))
+        journal.close()
+
+    def test_resume(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        journal.close()
+        journal = ResultsJournal(self.path, resume=True)
+        self.assertEquals(1, len(journal))
+        self.assertTrue(journal.completed(self.params, 0))
+        journal.append(self.params, self.results, 1)
+        journal.close()
+        self.assertEquals(2, len(list(read_results_journal(self.path))))
+
+    def test_no_resume(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        journal.close()
+        journal = ResultsJournal(self.path)
+        self.assertEquals(0, len(journal))
+        journal.close()
+        self.assertEquals(0, len(list(read_results_journal(self.path))))
+
+    def test_resume_partial_record(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        journal.append(self.params, self.results, 1)
+        journal.close()
+        # Simulate a crash while writing the last record
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        self.assertEquals(1, len(list(read_results_journal(self.path))))
+        journal = ResultsJournal(self.path, resume=True)
+        self.assertEquals(1, len(journal))
+        self.assertFalse(journal.completed(self.params, 1))
+        journal.append(self.params, self.results, 1)
+        journal.close()
+        records = list(read_results_journal(self.path))
+        self.assertEquals([0, 1], [r[1] for r in records])
+
+    def test_corrupted_record(self):
+        journal = ResultsJournal(self.path)
+        journal.append(self.params, self.results, 0)
+        journal.append(self.params, self.results, 1)
+        journal.close()
+        size = os.path.getsize(self.path)
+        # Overwrite the first byte of the first record with an invalid opcode
+        with open(self.path, 'r+b') as f:
+            f.write('\xff')
+        self.assertRaises(Exception, list, read_results_journal(self.path))
+        self.assertRaises(Exception, ResultsJournal, self.path, resume=True)
+        # Valid records are not dropped
+        self.assertEquals(size, os.path.getsize(self.path))
@@ -10,9 +10,10 @@ import logging
 from icarus.util import Settings, config_logging
 from icarus.registry import results_writer_register
 from icarus.orchestration import Orchestrator
+from icarus.results import ResultsJournal
 
 
-__all__ = ['run', 'handler']
+__all__ = ['run', 'handler', 'journal_path']
 
 
 logger = logging.getLogger('main')
@@ -36,16 +37,37 @@ def handler(settings, orch, output, signum=None, frame=None):
         The output file
     """
     logger.error('Received signal %d. Terminating' % signum)
-    results_writer_register[settings.RESULTS_FORMAT](orch.results, output)
+    results = orch.journal.resultset() if orch.journal is not None \
+              else orch.results
+    results_writer_register[settings.RESULTS_FORMAT](results, output)
     logger.info('Saved intermediate results to file %s' % os.path.abspath(output))
     orch.stop()
     sys.exit(-signum)
 
-def run(config_file, output, config_override):
+def journal_path(output):
+    """Return the path of the journal of results of a simulation campaign
+    
+    Parameters
+    ----------
+    output : str
+        The file name where results will be saved
+    
+    Returns
+    -------
+    path : str
+        The path of the journal
+    """
+    return output + '.journal'
+
+
+def run(config_file, output, config_override, resume=False):
     """ 
     Run function. It starts the simulator.
     experiments
     
+    Results of each experiment are appended to a journal as soon as it
+    completes. The journal is deleted after all results are saved.
+    
     Parameters
     ----------
     config : str
@@ -54,6 +76,9 @@ def run(config_file, output, config_override):
         The file name where results will be saved
     config_override : dict, optional
         Configuration parameters overriding parameters in the file
+    resume : bool, optional
+        If *True*, resume an interrupted simulation campaign, skipping the
+        experiments whose results are in the journal
     """
     # Read settings from file and save them in icarus.conf.settings
     settings = Settings()
@@ -69,12 +94,15 @@ def run(config_file, output, config_override):
     # Config logger
     config_logging(settings.LOG_LEVEL)
     # set up orchestration
-    orch = Orchestrator(settings)
+    journal = ResultsJournal(journal_path(output), resume)
+    orch = Orchestrator(settings, journal=journal)
     for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT, signal.SIGABRT):
         signal.signal(sig, functools.partial(handler, settings, orch, output))
     logger.info('Launching orchestrator')
     orch.run()
     logger.info('Orchestrator finished')
-    results = orch.results
+    journal.close()
+    results = journal.resultset()
     results_writer_register[settings.RESULTS_FORMAT](results, output)
     logger.info('Saved results to file %s' % os.path.abspath(output))
+    os.remove(journal.path)
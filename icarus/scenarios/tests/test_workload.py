@@ -0,0 +1,105 @@
+import sys
+if sys.version_info[:2] >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise ImportError("The unittest2 package is needed to run the tests.")
+del sys
+import os
+import shutil
+import tempfile
+
+import networkx as nx
+import fnss
+
+from icarus.scenarios import uniform_req_gen, save_workload, load_workload, \
+                             stored_req_gen, trace_req_gen
+from icarus.tools import compile_trace
+
+
+class TestStoredWorkload(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.topology = fnss.Topology(nx.path_graph(5))
+        for v in cls.topology.nodes_iter():
+            fnss.add_stack(cls.topology, v, 'receiver' if v % 2 else 'router')
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'workload.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def events(self):
+        return uniform_req_gen(self.topology, 100, 0.8, n_warmup=70,
+                               n_measured=130, seed=1, block_size=32)
+
+    def test_save_load(self):
+        self.assertEquals(200, save_workload(self.events(), self.path,
+                                             block_size=64))
+        workload = load_workload(self.path)
+        self.assertEquals(200, len(workload))
+        self.assertEquals(70, len(workload) - workload['log'].sum())
+        self.assertEquals(set([1, 3]), set(workload['receiver']))
+        self.assertEquals(17 * 200, os.path.getsize(self.path))
+
+    def test_replay(self):
+        save_workload(self.events(), self.path, block_size=64)
+        self.assertEquals(list(self.events()),
+                          list(stored_req_gen(self.path, block_size=48)))
+
+    def test_empty(self):
+        self.assertEquals(0, save_workload(iter([]), self.path))
+        self.assertEquals(0, len(load_workload(self.path)))
+        self.assertEquals([], list(stored_req_gen(self.path)))
+
+
+class TestTraceWorkload(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.topology = fnss.Topology(nx.path_graph(5))
+        for v in cls.topology.nodes_iter():
+            fnss.add_stack(cls.topology, v, 'receiver' if v % 2 else 'router')
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'trace')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def compile(self, client_key=None):
+        trace = [{'time': i, 'url': 'u%d' % (i % 5), 'client': i % 4}
+                 for i in range(50)]
+        compile_trace(iter(trace), self.path, client_key=client_key)
+
+    def test_replay(self):
+        self.compile('client')
+        events = list(trace_req_gen(self.topology, 5, self.path, n_warmup=10,
+                                    n_measured=30, block_size=7))
+        self.assertEquals(40, len(events))
+        for i, (t, event) in enumerate(events):
+            self.assertEquals(i, t)
+            self.assertEquals(i % 5 + 1, event['content'])
+            self.assertEquals([1, 3][(i % 4) % 2], event['receiver'])
+            self.assertEquals(i >= 10, event['log'])
+
+    def test_replay_all(self):
+        self.compile()
+        events = list(trace_req_gen(self.topology, 5, self.path, n_warmup=10,
+                                    seed=1))
+        self.assertEquals(50, len(events))
+        self.assertEquals(set([1, 3]), set(e['receiver'] for _, e in events))
+        self.assertEquals(events, list(trace_req_gen(self.topology, 5,
+                                                     self.path, n_warmup=10,
+                                                     seed=1)))
+
+    def test_too_many_contents(self):
+        self.compile()
+        self.assertRaises(ValueError, list,
+                          trace_req_gen(self.topology, 4, self.path))
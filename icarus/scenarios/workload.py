@@ -1,18 +1,61 @@
 """Functions for generating traffic workloads 
 """
+import os
 import random
-from icarus.tools import TruncatedZipfDist
+import tempfile
+
+import numpy as np
+
+from icarus.tools import TruncatedZipfDist, CompiledTrace
+from icarus.registry import register_workload
 
 
 __all__ = [
     'uniform_req_gen',
     'globetraff_req_gen',
-    'custom_req_gendef'
+    'trace_req_gen',
+    'custom_req_gendef',
+    'save_workload',
+    'load_workload',
+    'stored_req_gen',
+    'WORKLOAD_DTYPE'
 ]
 
 
+# Default number of events drawn from the random number generator at once
+BLOCK_SIZE = 2 ** 16
+
+# Record format of workloads stored by save_workload. Records are packed, i.e.
+# each event takes 17 bytes
+WORKLOAD_DTYPE = np.dtype([('time', '<f8'), ('receiver', '<i4'),
+                           ('content', '<i4'), ('log', 'u1')])
+
+
+def _block_sizes(n_events, block_size):
+    """Return an iterator over the sizes of the blocks in which a sequence of
+    *n_events* events is generated
+    """
+    while n_events > 0:
+        size = min(n_events, block_size)
+        yield size
+        n_events -= size
+
+
+def _random_states(seed, n):
+    """Return *n* independent random number generators derived from *seed*
+
+    Drawing each random variable of a workload from its own generator makes
+    the sequence of events generated for a seed independent of the block size
+    """
+    random_state = np.random.RandomState(seed)
+    return [np.random.RandomState(s)
+            for s in random_state.randint(2 ** 31, size=n)]
+
+
+@register_workload('STATIONARY')
 def uniform_req_gen(topology, n_contents, alpha, rate=12.0,
-                    n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=None):
+                    n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=None,
+                    block_size=BLOCK_SIZE, sampling_method='cdf'):
     """This function generates events on the fly, i.e. instead of creating an 
     event schedule to be kept in memory, returns an iterator that generates
     events when needed.
@@ -23,6 +66,9 @@ def uniform_req_gen(topology, n_contents, alpha, rate=12.0,
     These requests are Poisson-distributed while content popularity is
     Zipf-distributed
     
+    Random values are drawn in vectorized blocks of *block_size* events, so
+    that only one block of events at a time is kept in memory.
+    
     Parameters
     ----------
     topology : fnss.Topology
@@ -38,6 +84,14 @@ def uniform_req_gen(topology, n_contents, alpha, rate=12.0,
         not logged)
     n_measured : int
         The number of logged requests after the warmup
+    seed : int, optional
+        The seed of the random number generator. The same seed always yields
+        the same sequence of events
+    block_size : int, optional
+        The number of events generated at a time
+    sampling_method : str ('cdf' | 'alias'), optional
+        The method used to draw contents from the Zipf distribution. The alias
+        method is faster for large content catalogues
     
     Returns
     -------
@@ -48,19 +102,24 @@ def uniform_req_gen(topology, n_contents, alpha, rate=12.0,
     """
     receivers = [v for v in topology.nodes_iter()
                  if topology.node[v]['stack'][0] == 'receiver']
-    zipf = TruncatedZipfDist(alpha, n_contents)
+    zipf = TruncatedZipfDist(alpha, n_contents, method=sampling_method)
+    # Strategies make random decisions using the random module, seed it too
+    # so that whole experiments are reproducible
     random.seed(seed)
+    time_rs, receiver_rs, content_rs = _random_states(seed, 3)
 
     req_counter = 0
     t_event = 0.0
-    while req_counter < n_warmup + n_measured:
-        t_event += (random.expovariate(rate))
-        receiver = random.choice(receivers)
-        content = int(zipf.rv())
-        log = (req_counter >= n_warmup)
-        event = {'receiver': receiver, 'content': content, 'log': log}
-        yield (t_event, event)
-        req_counter += 1
+    for size in _block_sizes(n_warmup + n_measured, block_size):
+        times = t_event + np.cumsum(time_rs.exponential(1.0/rate, size))
+        receiver_idx = receiver_rs.randint(len(receivers), size=size)
+        contents = zipf.rvs(size, content_rs)
+        for t_event, i, content in zip(times.tolist(), receiver_idx.tolist(),
+                                       contents.tolist()):
+            log = (req_counter >= n_warmup)
+            event = {'receiver': receivers[i], 'content': content, 'log': log}
+            yield (t_event, event)
+            req_counter += 1
     raise StopIteration()
 
 
@@ -79,8 +138,77 @@ def globetraff_req_gen(topology, content_file, request_file):
     raise NotImplementedError('Not yet implemented')
 
 
+@register_workload('TRACE')
+def trace_req_gen(topology, n_contents, path, n_warmup=0, n_measured=None,
+                  seed=None, block_size=BLOCK_SIZE):
+    """Replay a trace compiled by *icarus.tools.compile_trace*.
+    
+    The trace is memory mapped and read in blocks of *block_size* entries, so
+    traces larger than the available memory can be replayed. Each content of
+    the trace is mapped to the content with the same identifier in the
+    topology. Requests of each client of the trace are issued by the same
+    receiver, with clients assigned to receivers in round robin. Requests
+    without a client are issued by receivers selected uniformly at random.
+    
+    Parameters
+    ----------
+    topology : fnss.Topology
+        The topology to which the workload refers
+    n_contents : int
+        The number of content object placed in the topology. It must not be
+        lower than the number of contents of the trace
+    path : str
+        The directory of the compiled trace
+    n_warmup : int, optional
+        The number of warmup requests (i.e. requests executed to fill cache but
+        not logged)
+    n_measured : int, optional
+        The number of logged requests after the warmup. If not specified, all
+        remaining requests of the trace are logged
+    seed : int, optional
+        The seed of the random number generator
+    block_size : int, optional
+        The number of entries read at a time
+    
+    Returns
+    -------
+    events : iterator
+        Iterator of events. Each event is a 2-tuple where the first element is
+        the timestamp at which the event occurs and the second element is a
+        dictionary of event attributes.
+    """
+    trace = CompiledTrace(path)
+    if trace.n_contents > n_contents:
+        raise ValueError('The trace has %d contents but only %d contents are '
+                         'placed in the topology'
+                         % (trace.n_contents, n_contents))
+    receivers = sorted(v for v in topology.nodes_iter()
+                       if topology.node[v]['stack'][0] == 'receiver')
+    n_events = len(trace) if n_measured is None \
+               else min(len(trace), n_warmup + n_measured)
+    random.seed(seed)
+    receiver_rs = np.random.RandomState(seed)
+
+    req_counter = 0
+    for start in range(0, n_events, block_size):
+        end = min(start + block_size, n_events)
+        clients = np.asarray(trace.client[start:end])
+        receiver_idx = np.where(clients >= 0, clients % len(receivers),
+                                receiver_rs.randint(len(receivers),
+                                                    size=end - start))
+        for t_event, i, content in zip(trace.time[start:end].tolist(),
+                                       receiver_idx.tolist(),
+                                       trace.content[start:end].tolist()):
+            log = (req_counter >= n_warmup)
+            event = {'receiver': receivers[i], 'content': content, 'log': log}
+            yield (t_event, event)
+            req_counter += 1
+    raise StopIteration()
+
+
 def custom_req_gendef(topology, n_contents, alpha, rate=12.0,
-                      n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=None):
+                      n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=None,
+                      block_size=BLOCK_SIZE, sampling_method='cdf'):
     """This function generates events on the fly, i.e. instead of creating an 
     event schedule to be kept in memory, returns an iterator that generates
     events when needed.
@@ -91,6 +219,9 @@ def custom_req_gendef(topology, n_contents, alpha, rate=12.0,
     These requests are Poisson-distributed while content popularity is
     Zipf-distributed
     
+    Random values are drawn in vectorized blocks of *block_size* events, so
+    that only one block of events at a time is kept in memory.
+    
     Parameters
     ----------
     topology : fnss.Topology
@@ -106,6 +237,14 @@ def custom_req_gendef(topology, n_contents, alpha, rate=12.0,
         not logged)
     n_measured : int
         The number of logged requests after the warmup
+    seed : int, optional
+        The seed of the random number generator. The same seed always yields
+        the same sequence of events
+    block_size : int, optional
+        The number of events generated at a time
+    sampling_method : str ('cdf' | 'alias'), optional
+        The method used to draw contents from the Zipf distribution. The alias
+        method is faster for large content catalogues
     
     Returns
     -------
@@ -117,34 +256,141 @@ def custom_req_gendef(topology, n_contents, alpha, rate=12.0,
     receivers = [v for v in topology.nodes_iter()
                  if topology.node[v]['stack'][0] == 'cache']
 
-    sub_request = [3, 1, 4, 4, 1, 3, 4, 4, 4, 3, 2, 1, 1, 3, 4, 2, 1, 1, 2, 1, 2, 1, 3, 4, 4, 3, 1, 3, 4, 2, 2, 3, 2, 2,
-                   3, 3, 4, 4, 3, 2]
-
-    zipfs = []
-    zipfs.append(TruncatedZipfDist(alpha, n_contents * 0.2))
-    zipfs.append(TruncatedZipfDist(alpha, n_contents * 0.2))
-    zipfs.append(TruncatedZipfDist(alpha, n_contents * 0.2))
-    zipfs.append(TruncatedZipfDist(alpha, n_contents * 0.2))
-    zipfs.append(TruncatedZipfDist(alpha, n_contents * 0.2))
+    sub_request = np.array([3, 1, 4, 4, 1, 3, 4, 4, 4, 3, 2, 1, 1, 3, 4, 2, 1,
+                            1, 2, 1, 2, 1, 3, 4, 4, 3, 1, 3, 4, 2, 2, 3, 2, 2,
+                            3, 3, 4, 4, 3, 2])
+    # Each category of contents has the same size and popularity distribution
+    # and only differs for the first content identifier, hence a single
+    # distribution is used for all categories
+    zipf = TruncatedZipfDist(alpha, n_contents * 0.2,
+                             method=sampling_method)
+    # Category of contents requested by each receiver
+    receiver_category = sub_request[receivers]
 
     random.seed(seed)
+    time_rs, receiver_rs, category_rs, content_rs = _random_states(seed, 4)
 
     req_counter = 0
     t_event = 0.0
-    while req_counter < n_warmup + n_measured:
-        t_event += (random.expovariate(rate))
-        receiver = random.choice(receivers)
-        if random.random() > 0.8:
-            zipf = zipfs[0]
-            content_begin = 0
-        else:
-            category = sub_request[receiver]
-            zipf = zipfs[category]
-            content_begin = n_contents * (0.2 + (category-1)*0.2)
-
-        content = content_begin + int(zipf.rv())
-        log = (req_counter >= n_warmup)
-        event = {'receiver': receiver, 'content': int(content), 'log': log}
-        yield (t_event, event)
-        req_counter += 1
+    for size in _block_sizes(n_warmup + n_measured, block_size):
+        times = t_event + np.cumsum(time_rs.exponential(1.0/rate, size))
+        receiver_idx = receiver_rs.randint(len(receivers), size=size)
+        category = receiver_category[receiver_idx]
+        content_begin = np.where(category_rs.random_sample(size) > 0.8, 0,
+                                 n_contents * (0.2 + (category - 1) * 0.2))
+        contents = content_begin.astype(int) + zipf.rvs(size, content_rs)
+        for t_event, i, content in zip(times.tolist(), receiver_idx.tolist(),
+                                       contents.tolist()):
+            log = (req_counter >= n_warmup)
+            event = {'receiver': receivers[i], 'content': content, 'log': log}
+            yield (t_event, event)
+            req_counter += 1
+    raise StopIteration()
+
+
+def save_workload(events, path, block_size=BLOCK_SIZE):
+    """Store a sequence of events in a binary file, so that it can be replayed
+    by *stored_req_gen* without being generated again
+    
+    Events are written as an array of *WORKLOAD_DTYPE* records. Receivers and
+    contents must therefore be integers. Events are consumed and written in
+    blocks of *block_size* events, so that the whole sequence is never kept in
+    memory. The file is written to a temporary file first and then renamed, so
+    that processes concurrently storing the same workload never read a
+    partially written file.
+    
+    Parameters
+    ----------
+    events : iterator
+        Iterator of events, as returned by *uniform_req_gen*
+    path : str
+        The path of the file
+    block_size : int, optional
+        The number of events written at a time
+    
+    Returns
+    -------
+    n_events : int
+        The number of events written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    n_events = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            block = np.empty(block_size, dtype=WORKLOAD_DTYPE)
+            i = 0
+            for t_event, event in events:
+                block[i] = (t_event, event['receiver'], event['content'],
+                            event['log'])
+                i += 1
+                if i == block_size:
+                    block.tofile(f)
+                    n_events += i
+                    i = 0
+            block[:i].tofile(f)
+            n_events += i
+        os.rename(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return n_events
+
+
+def load_workload(path):
+    """Load a workload stored by *save_workload*
+    
+    The file is memory mapped, so events are read from disk only when accessed
+    and pages are shared by all processes reading the same workload.
+    
+    Parameters
+    ----------
+    path : str
+        The path of the file
+    
+    Returns
+    -------
+    workload : numpy.memmap
+        Array of *WORKLOAD_DTYPE* records
+    """
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=WORKLOAD_DTYPE)
+    return np.memmap(path, dtype=WORKLOAD_DTYPE, mode='r')
+
+
+def stored_req_gen(path, seed=None, block_size=BLOCK_SIZE):
+    """Replay a workload stored by *save_workload*
+    
+    Replaying the same stored workload in experiments using different
+    strategies guarantees that all of them process exactly the same requests
+    (common random numbers), which reduces the variance of their differences,
+    and saves the cost of generating events in each experiment.
+    
+    Parameters
+    ----------
+    path : str
+        The path of the file
+    seed : int, optional
+        The seed of the random number generator used by strategies. If the
+        workload was generated by *uniform_req_gen*, the same seed used to
+        generate it yields the same results
+    block_size : int, optional
+        The number of events read at a time
+    
+    Returns
+    -------
+    events : iterator
+        Iterator of events. Each event is a 2-tuple where the first element is
+        the timestamp at which the event occurs and the second element is a
+        dictionary of event attributes.
+    """
+    workload = load_workload(path)
+    random.seed(seed)
+    for start in range(0, len(workload), block_size):
+        block = workload[start:start + block_size]
+        for t_event, receiver, content, log in zip(
+                block['time'].tolist(), block['receiver'].tolist(),
+                block['content'].tolist(), block['log'].astype(bool).tolist()):
+            event = {'receiver': receiver, 'content': content, 'log': log}
+            yield (t_event, event)
     raise StopIteration()
@@ -0,0 +1,122 @@
+import sys
+if sys.version_info[:2] >= (2, 7):
+    import unittest
+else:
+    try:
+        import unittest2 as unittest
+    except ImportError:
+        raise ImportError("The unittest2 package is needed to run the tests.")
+del sys
+
+from icarus.orchestration import ExperimentCostModel, SequentialStopping, \
+                                 _PendingExperiments, _replication_seed
+
+
+class TestSequentialStopping(unittest.TestCase):
+
+    def setUp(self):
+        self.params = {'alpha': 0.8, 'strategy_params': {}}
+        self.stopping = SequentialStopping([('CACHE_HIT_RATIO', 'MEAN')],
+                                           precision=0.05, max_replications=10)
+        for replication in range(2):
+            self.stopping.schedule(self.params, replication)
+
+    def complete(self, *values):
+        for value in values:
+            self.stopping.observe(self.params,
+                                  {'CACHE_HIT_RATIO': {'MEAN': value}})
+
+    def test_precise(self):
+        self.complete(0.5)
+        self.assertEquals([], self.stopping.extend(self.params))
+        self.complete(0.51)
+        self.assertEquals([], self.stopping.extend(self.params))
+
+    def test_extend(self):
+        self.complete(0.43, 0.47)
+        # Half-width is 0.0277 and target is 0.0225, hence 4 replications
+        # are required
+        self.assertEquals(4, self.stopping.n_required(self.params))
+        self.assertEquals([2, 3], self.stopping.extend(self.params))
+        self.complete(0.45)
+        self.assertEquals([], self.stopping.extend(self.params))
+        self.complete(0.45)
+        self.assertEquals([], self.stopping.extend(self.params))
+
+    def test_max_replications(self):
+        self.complete(0.1, 0.9)
+        self.assertEquals([2, 3], self.stopping.extend(self.params))
+        self.complete(0.1, 0.9)
+        self.assertEquals([4, 5, 6, 7], self.stopping.extend(self.params))
+        self.complete(*([0.1, 0.9]*2))
+        self.assertEquals([8, 9], self.stopping.extend(self.params))
+        self.complete(0.1, 0.9)
+        self.assertEquals([], self.stopping.extend(self.params))
+
+    def test_failure(self):
+        self.complete(0.5)
+        self.stopping.observe(self.params, None)
+        self.assertEquals([2], self.stopping.extend(self.params))
+        self.complete(0.5)
+        self.assertEquals([], self.stopping.extend(self.params))
+
+    def test_params_key(self):
+        self.complete(0.43)
+        self.stopping.observe(dict(self.params), {'CACHE_HIT_RATIO':
+                                                  {'MEAN': 0.47}})
+        self.assertEquals([2, 3], self.stopping.extend(dict(self.params)))
+
+
+class TestReplicationSeed(unittest.TestCase):
+
+    def test_no_seed(self):
+        self.assertIsNone(_replication_seed(None, 0))
+        self.assertIsNone(_replication_seed(None, 3))
+
+    def test_first_replication(self):
+        self.assertEquals(42, _replication_seed(42, 0))
+
+    def test_distinct_seeds(self):
+        seeds = [_replication_seed(42, r) for r in range(20)]
+        self.assertEquals(len(seeds), len(set(seeds)))
+        self.assertEquals(seeds, [_replication_seed(42, r) for r in range(20)])
+        self.assertTrue(all(0 <= seed < 2**32 for seed in seeds))
+
+    def test_depends_on_seed(self):
+        self.assertNotEqual(_replication_seed(1, 1), _replication_seed(2, 1))
+
+
+class TestPendingExperiments(unittest.TestCase):
+
+    def setUp(self):
+        self.cost_model = ExperimentCostModel('LRU')
+        self.fast = {'topology_name': 'A', 'strategy_name': 'LCE', 'alpha': 1}
+        self.slow = {'topology_name': 'B', 'strategy_name': 'LCE', 'alpha': 1}
+        self.queue = _PendingExperiments(self.cost_model,
+                                         [(self.fast, 0), (self.slow, 0),
+                                          (self.fast, 1), (self.slow, 1)])
+
+    def test_queue_order(self):
+        self.assertEquals(4, len(self.queue))
+        self.assertEquals([(self.fast, 0), (self.slow, 0), (self.fast, 1),
+                           (self.slow, 1)], list(self.queue))
+        self.assertEquals((self.fast, 0), self.queue.pop())
+        self.assertEquals((self.slow, 0), self.queue.pop())
+        self.assertEquals(2, len(self.queue))
+
+    def test_longest_first(self):
+        self.cost_model.observe(self.fast, 1.0)
+        self.cost_model.observe(self.slow, 3.0)
+        self.assertEquals(8.0, self.queue.expected_duration())
+        self.assertEquals((self.slow, 0), self.queue.pop())
+        self.queue.extend([(self.slow, 2)])
+        self.assertEquals((self.slow, 1), self.queue.pop())
+        self.assertEquals((self.slow, 2), self.queue.pop())
+        self.assertEquals((self.fast, 0), self.queue.pop())
+        self.assertEquals((self.fast, 1), self.queue.pop())
+        self.assertEquals(0, len(self.queue))
+        self.assertEquals(0, self.queue.expected_duration())
+
+    def test_unknown_first(self):
+        self.cost_model.observe(self.slow, 3.0)
+        self.assertEquals((self.fast, 0), self.queue.pop())
@@ -13,10 +13,12 @@ import scipy.stats as ss
 __all__ = [
        'DiscreteDist',
        'TruncatedZipfDist',
+       'alias_table',
        'means_confidence_interval',
        'proportions_confidence_interval',
        'cdf',
        'pdf',
+       'LogHistogram',
            ]
 
 
@@ -25,9 +27,13 @@ class DiscreteDist(object):
     
     The support must be a finite discrete set of contiguous integers
     {1, ..., N}. This definition of discrete distribution.
+    
+    Random values can be drawn either by binary search over the CDF, which
+    takes O(log N) time per value, or using Walker's alias method, which takes
+    O(1) time per value at the cost of building an alias table of size N.
     """
 
-    def __init__(self, pdf, seed=None):
+    def __init__(self, pdf, seed=None, method='cdf'):
         """
         Constructor
         
@@ -35,16 +41,24 @@ class DiscreteDist(object):
         ----------
         pdf : array-like
             The probability density function
-        seed : any hashable type (optional)
+        seed : int (optional)
             The seed to be used for random number generation
+        method : str ('cdf' | 'alias'), optional
+            The method used to draw random values
         """
         if np.abs(sum(pdf) - 1.0) > 0.001:
             raise ValueError('The sum of pdf values must be equal to 1')
+        if method not in ('cdf', 'alias'):
+            raise ValueError('method must be either cdf or alias')
         random.seed(seed)
+        self._random_state = np.random.RandomState(seed)
         self._pdf = np.asarray(pdf)
         self._cdf = np.cumsum(self._pdf)
         # set last element of the CDF to 1.0 to avoid rounding errors
         self._cdf[-1] = 1.0
+        self._method = method
+        if method == 'alias':
+            self._prob, self._alias = alias_table(self._pdf)
 
     def __len__(self):
         """Return the cardinality of the support
@@ -81,21 +95,64 @@ class DiscreteDist(object):
         """
         return self._cdf
 
+    @property
+    def method(self):
+        """
+        Return the method used to draw random values
+        
+        Returns
+        -------
+        method : str
+            Either 'cdf' or 'alias'
+        """
+        return self._method
+
     def rv(self):
         """Get rand value from the distribution
         """
         rv = random.random()
+        if self._method == 'alias':
+            # Integer part of the draw selects the column, fractional part
+            # selects between the column and its alias. Time complexity is O(1)
+            rv *= len(self._prob)
+            i = int(rv)
+            return int(i if rv - i < self._prob[i] else self._alias[i]) + 1
         # This operation performs binary search over the CDF to return the
         # random value. Worst case time complexity is O(log2(n))
         return int(np.searchsorted(self._cdf, rv) + 1)
 
+    def rvs(self, n, random_state=None):
+        """Get an array of random values from the distribution
+        
+        Parameters
+        ----------
+        n : int
+            The number of random values to draw
+        random_state : numpy.random.RandomState, optional
+            The random number generator to use. If not specified, the
+            generator seeded with the seed passed to the constructor is used
+        
+        Returns
+        -------
+        rvs : Numpy array
+            Array of *n* random values
+        """
+        if random_state is None:
+            random_state = self._random_state
+        if self._method == 'alias':
+            rv = random_state.random_sample(n) * len(self._prob)
+            i = rv.astype(int)
+            return np.where(rv - i < self._prob[i], i, self._alias[i]) + 1
+        # A single binary search over the CDF is performed for all values
+        return np.searchsorted(self._cdf, random_state.random_sample(n)) + 1
+
 
 class TruncatedZipfDist(DiscreteDist):
     """Implements a truncated Zipf distribution, i.e. a Zipf distribution with
     a finite population, which can hence take values of alpha > 0.
     """
 
-    def __init__(self, alpha=1.0, n=1000, seed=None):
+    def __init__(self, alpha=1.0, n=1000, seed=None, method='cdf'):
         """Constructor
         
         Parameters
@@ -104,8 +161,10 @@ class TruncatedZipfDist(DiscreteDist):
             The value of the alpha parameter (it must be positive)
         n : int
             The size of population
-        seed : any hashable type, optional
+        seed : int, optional
             The seed to be used for random number generation
+        method : str ('cdf' | 'alias'), optional
+            The method used to draw random values
         """
         # Validate parameters
         if alpha <= 0:
@@ -117,12 +176,69 @@ class TruncatedZipfDist(DiscreteDist):
         pdf = np.arange(1.0, n+1.0)**-alpha
         pdf /= np.sum(pdf)
         self._alpha = alpha
-        super(TruncatedZipfDist, self).__init__(pdf, seed)
+        super(TruncatedZipfDist, self).__init__(pdf, seed, method)
 
     @property
     def alpha(self):
         return self._alpha
 
+
+def alias_table(pdf):
+    """Build the alias table of a discrete distribution for sampling it with
+    Walker's alias method.
+    
+    The table has a column for each value of the support. To draw a value, a
+    column *i* is picked uniformly at random and then *i* is returned with
+    probability *prob[i]*, otherwise *alias[i]* is returned.
+    
+    The table is built in O(N) time with Vose's algorithm, which assigns the
+    probability deficit of each column with scaled probability lower than 1
+    to a column with scaled probability greater than 1. Here all assignments
+    are computed at once by matching the cumulative deficit of those columns
+    with the cumulative surplus of the others.
+    
+    Parameters
+    ----------
+    pdf : array-like
+        The probability density function
+    
+    Returns
+    -------
+    prob : Numpy array
+        Probability that each column returns its own (0-indexed) value
+    alias : Numpy array
+        The (0-indexed) alias of each column
+    """
+    pdf = np.asarray(pdf, dtype=float)
+    n = len(pdf)
+    q = n * pdf / np.sum(pdf)
+    prob = np.minimum(q, 1.0)
+    alias = np.arange(n)
+    small = np.flatnonzero(q <= 1.0)
+    large = np.flatnonzero(q > 1.0)
+    if len(small) == 0 or len(large) == 0:
+        # All columns have (up to rounding errors) scaled probability 1
+        return prob, alias
+    deficit = 1.0 - q[small]
+    deficit_end = np.cumsum(deficit)
+    surplus_end = np.cumsum(q[large] - 1.0)
+    # Each small column is aliased to the large column whose surplus is being
+    # used when its deficit starts
+    idx = np.searchsorted(surplus_end, deficit_end - deficit, side='right')
+    alias[small] = large[np.minimum(idx, len(large) - 1)]
+    # When the surplus of a large column is exhausted, the remaining part of
+    # the deficit being covered is charged to the column itself, which then
+    # becomes a small column aliased to the next large column
+    idx = np.searchsorted(deficit_end, surplus_end, side='left')
+    overshoot = np.where(idx < len(small),
+                         deficit_end[np.minimum(idx, len(small) - 1)] - surplus_end,
+                         0.0)
+    prob[large] = np.clip(1.0 - overshoot, 0.0, 1.0)
+    prob[large[-1]] = 1.0
+    alias[large[:-1]] = large[1:]
+    return prob, alias
+
+
 def means_confidence_interval(data, confidence=0.95):
     """Computes the confidence interval for a given set of means.
     
@@ -257,4 +373,263 @@ def pdf(data, n_bins):
             pdf[section] += 1
     # Normalize pdf
     pdf = (pdf * n_bins) / (np.sum(pdf) * (data_max - data_min))
-    return x, pdf
\ No newline at end of file
+    return x, pdf
+
+
+class LogHistogram(object):
+    """Mergeable histogram of non-negative values with logarithmic buckets.
+    
+    This histogram summarizes a stream of values in a bounded amount of
+    memory, so that the distribution and the quantiles of the stream can be
+    estimated without storing all values. Bucket *i* counts the values in the
+    interval (gamma^(i-1), gamma^i], where gamma = (1 + e)/(1 - e) and *e* is
+    the relative error. Values in a bucket are approximated by a single
+    representative value whose relative error is at most *e*, hence the
+    number of buckets only depends on the ratio between the largest and the
+    smallest positive values and not on the number of values. For example,
+    with a relative error of 1%, about 1400 buckets cover 12 orders of
+    magnitude. Zeros are counted separately and are reported exactly.
+    
+    Values are buffered and counted in batches with Numpy, so that adding a
+    value is as cheap as appending it to a list.
+    
+    Histograms with the same relative error can be merged, for example to
+    combine the distributions measured in several replications of an
+    experiment. Merging is exact, i.e. the merged histogram is the same that
+    would have been obtained adding all values to a single histogram.
+    
+    Examples
+    --------
+    >>> hist = LogHistogram(0.01)
+    >>> for v in range(1, 101):
+    ...     hist.add(v)
+    >>> hist.quantile(0.5)
+    49.9...
+    """
+    
+    def __init__(self, relative_error=0.01, buffer_size=4096):
+        """Constructor
+        
+        Parameters
+        ----------
+        relative_error : float, optional
+            The maximum relative error of the values reported by the
+            histogram. It must be a value in the interval (0, 1)
+        buffer_size : int, optional
+            The number of values buffered before being counted
+        """
+        if relative_error <= 0 or relative_error >= 1:
+            raise ValueError('The relative error must be greater than 0 and '
+                             'smaller than 1')
+        self.relative_error = relative_error
+        self.buffer_size = buffer_size
+        self._gamma = (1 + relative_error)/(1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        # counts[i] is the number of values in bucket offset + i
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0
+        self._zeros = 0
+        self._min = np.inf
+        self._max = -np.inf
+        self._buffer = []
+    
+    def __len__(self):
+        """Return the number of values added to the histogram
+        
+        Returns
+        -------
+        len : int
+            The number of values
+        """
+        return int(self._zeros + self._counts.sum()) + len(self._buffer)
+    
+    def __getstate__(self):
+        self._fold()
+        return self.__dict__
+    
+    def __add__(self, other):
+        """Return a histogram merging this histogram and another one
+        
+        Parameters
+        ----------
+        other : LogHistogram
+            The histogram to merge
+        
+        Returns
+        -------
+        histogram : LogHistogram
+            The merged histogram
+        """
+        hist = LogHistogram(self.relative_error, self.buffer_size)
+        hist.merge(self)
+        hist.merge(other)
+        return hist
+    
+    @property
+    def min(self):
+        """Return the smallest value added to the histogram
+        """
+        self._fold()
+        return self._min
+    
+    @property
+    def max(self):
+        """Return the largest value added to the histogram
+        """
+        self._fold()
+        return self._max
+    
+    def add(self, value):
+        """Add a value to the histogram
+        
+        Parameters
+        ----------
+        value : float
+            The value, which must not be negative
+        """
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._fold()
+    
+    def update(self, values):
+        """Add a set of values to the histogram
+        
+        Parameters
+        ----------
+        values : array-like
+            The values, which must not be negative
+        """
+        self._fold()
+        self._count(np.asarray(values, dtype=np.float64).ravel())
+    
+    def merge(self, other):
+        """Add all values of another histogram to this histogram
+        
+        Parameters
+        ----------
+        other : LogHistogram
+            The histogram to merge. It must have the same relative error of
+            this histogram
+        """
+        if other.relative_error != self.relative_error:
+            raise ValueError('Only histograms with the same relative error '
+                             'can be merged')
+        self._fold()
+        other._fold()
+        if len(other._counts) > 0:
+            self._add_counts(other._offset, other._counts)
+        self._zeros += other._zeros
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+    
+    def quantile(self, q):
+        """Return an estimate of a quantile of the values of the histogram
+        
+        Parameters
+        ----------
+        q : float
+            The quantile, in the interval [0, 1]. For example, 0.99 is the
+            99th percentile
+        
+        Returns
+        -------
+        value : float
+            The estimated quantile. Its relative error is at most the
+            relative error of the histogram
+        """
+        if q < 0 or q > 1:
+            raise ValueError('The quantile must be in the interval [0, 1]')
+        self._fold()
+        n = len(self)
+        if n == 0:
+            raise ValueError('The histogram is empty')
+        rank = int(q*(n - 1))
+        # The extreme values are known exactly
+        if rank == 0:
+            return float(self._min)
+        if rank == n - 1:
+            return float(self._max)
+        rank -= self._zeros
+        if rank < 0:
+            return 0.0
+        i = np.searchsorted(np.cumsum(self._counts), rank, side='right')
+        return float(self._value(self._offset + i))
+    
+    def cdf(self):
+        """Return the CDF of the values of the histogram
+        
+        The CDF has the same format of the one returned by *cdf*, but it has
+        one point per non-empty bucket rather than one point per distinct
+        value.
+        
+        Returns
+        -------
+        x : array
+            The representative values of all non-empty buckets, sorted
+        cdf : array
+            The CDF of the values. More specifically cdf[i] is the
+            probability that a value is not greater than x[i]
+        """
+        self._fold()
+        if len(self) == 0:
+            raise ValueError('The histogram is empty')
+        nonzero = np.flatnonzero(self._counts)
+        x = self._value(self._offset + nonzero)
+        freqs = self._counts[nonzero]
+        if self._zeros > 0:
+            x = np.concatenate(([0.0], x))
+            freqs = np.concatenate(([self._zeros], freqs))
+        # The largest value is known exactly
+        x[-1] = self._max
+        cdf = np.cumsum(freqs)/freqs.sum()
+        cdf[-1] = 1.0 # Prevent rounding errors
+        return x, cdf
+    
+    def _value(self, index):
+        """Return the representative value of a bucket, clipped to the range
+        of values added to the histogram
+        """
+        value = 2*self._gamma**index/(self._gamma + 1)
+        return np.clip(value, self._min, self._max)
+    
+    def _fold(self):
+        """Count buffered values
+        """
+        if self._buffer:
+            values = np.array(self._buffer, dtype=np.float64)
+            self._buffer = []
+            self._count(values)
+    
+    def _count(self, values):
+        """Count an array of values
+        """
+        if len(values) == 0:
+            return
+        if not np.all(values >= 0):
+            raise ValueError('Values must not be negative')
+        self._min = min(self._min, values.min())
+        self._max = max(self._max, values.max())
+        positive = values[values > 0]
+        self._zeros += len(values) - len(positive)
+        if len(positive) == 0:
+            return
+        index = np.ceil(np.log(positive)/self._log_gamma).astype(np.int64)
+        offset = index.min()
+        self._add_counts(offset, np.bincount(index - offset))
+    
+    def _add_counts(self, offset, counts):
+        """Add the counts of a range of buckets starting from offset
+        """
+        if len(self._counts) == 0:
+            self._counts = counts.astype(np.int64)
+            self._offset = offset
+            return
+        start = min(self._offset, offset)
+        end = max(self._offset + len(self._counts), offset + len(counts))
+        if start != self._offset or end != self._offset + len(self._counts):
+            grown = np.zeros(end - start, dtype=np.int64)
+            grown[self._offset - start:
+                  self._offset - start + len(self._counts)] = self._counts
+            self._counts = grown
+            self._offset = start
+        self._counts[offset - start:offset - start + len(counts)] += counts
@@ -31,13 +31,94 @@ class TestDiscreteDist(unittest.TestCase):
         pdf_1 = np.array([0.4, 0.6])
         pdf_2 = stats.DiscreteDist(pdf_1).pdf
         self.assertTrue(all(pdf_1[i] == pdf_2[i] for i in range(len(pdf_1))))
-        
+
+    def test_rvs_range(self):
+        dist = stats.DiscreteDist(np.array([0.1, 0.2, 0.3, 0.4]), seed=1)
+        rvs = dist.rvs(10000)
+        self.assertEquals(10000, len(rvs))
+        self.assertEquals(1, rvs.min())
+        self.assertEquals(4, rvs.max())
+
+    def test_rvs_seed(self):
+        pdf = np.array([0.1, 0.2, 0.3, 0.4])
+        rvs_1 = stats.DiscreteDist(pdf, seed=1).rvs(1000)
+        rvs_2 = stats.DiscreteDist(pdf, seed=1).rvs(1000)
+        self.assertTrue(np.all(rvs_1 == rvs_2))
+
+    def test_rvs_random_state(self):
+        dist = stats.DiscreteDist(np.array([0.1, 0.2, 0.3, 0.4]))
+        rvs_1 = dist.rvs(1000, np.random.RandomState(2))
+        rvs_2 = dist.rvs(1000, np.random.RandomState(2))
+        self.assertTrue(np.all(rvs_1 == rvs_2))
+
+    def test_rvs_frequencies(self):
+        pdf = np.array([0.1, 0.2, 0.3, 0.4])
+        rvs = stats.DiscreteDist(pdf, seed=1).rvs(100000)
+        freqs = np.bincount(rvs, minlength=5)[1:]/float(len(rvs))
+        self.assertTrue(np.allclose(pdf, freqs, atol=0.01))
+
+    def test_invalid_method(self):
+        self.assertRaises(ValueError, stats.DiscreteDist,
+                          np.array([0.4, 0.6]), method='invalid')
+
+    def test_alias_rv_range(self):
+        dist = stats.DiscreteDist(np.array([0.1, 0.2, 0.3, 0.4]),
+                                  method='alias')
+        rvs = [dist.rv() for _ in range(1000)]
+        self.assertEquals(1, min(rvs))
+        self.assertEquals(4, max(rvs))
+
+
 class TestTruncatedZipfDist(unittest.TestCase):
 
     def test_pdf_sum(self):
         p = stats.TruncatedZipfDist(alpha=0.6, n=1000).pdf
         self.assertAlmostEqual(np.sum(p), 1.0)
 
+    def test_alias_cdf_equivalence(self):
+        n = 100
+        n_samples = 200000
+        for alpha in (0.6, 1.0, 1.4):
+            cdf_dist = stats.TruncatedZipfDist(alpha, n, seed=1)
+            alias_dist = stats.TruncatedZipfDist(alpha, n, seed=1,
+                                                 method='alias')
+            cdf_freqs = np.bincount(cdf_dist.rvs(n_samples), minlength=n + 1)
+            alias_freqs = np.bincount(alias_dist.rvs(n_samples), minlength=n + 1)
+            cdf_freqs = cdf_freqs[1:]/float(n_samples)
+            alias_freqs = alias_freqs[1:]/float(n_samples)
+            self.assertTrue(np.allclose(cdf_freqs, alias_freqs, atol=0.005))
+            self.assertTrue(np.allclose(alias_dist.pdf, alias_freqs, atol=0.005))
+
+
+class TestAliasTable(unittest.TestCase):
+
+    def assert_alias_pdf(self, pdf):
+        prob, alias = stats.alias_table(pdf)
+        n = len(pdf)
+        self.assertTrue(np.all(prob >= 0) and np.all(prob <= 1))
+        # Probability of each value implied by the alias table
+        alias_pdf = (prob + np.bincount(alias, weights=1 - prob, minlength=n))/n
+        self.assertTrue(np.allclose(pdf, alias_pdf))
+
+    def test_uniform(self):
+        self.assert_alias_pdf(np.ones(10)/10)
+
+    def test_zipf(self):
+        for alpha in (0.2, 0.8, 1.2, 3.0):
+            self.assert_alias_pdf(stats.TruncatedZipfDist(alpha, 10000).pdf)
+
+    def test_zero_probabilities(self):
+        self.assert_alias_pdf(np.array([0.5, 0.0, 0.5, 0.0]))
+
+    def test_single_value(self):
+        self.assert_alias_pdf(np.array([1.0]))
+
+    def test_random(self):
+        random_state = np.random.RandomState(0)
+        for _ in range(100):
+            pdf = random_state.random_sample(random_state.randint(1, 50))
+            self.assert_alias_pdf(pdf/np.sum(pdf))
+
 
 class TestCdf(unittest.TestCase):
 
@@ -85,4 +166,55 @@ class TestCdf(unittest.TestCase):
             self.assertAlmostEqual(x[i], exp_x[i])
             self.assertAlmostEqual(cdf[i], exp_cdf[i])
         
-        
\ No newline at end of file
+        
+
+class TestLogHistogram(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.RandomState(0).exponential(10, 20000)
+
+    def test_quantiles(self):
+        hist = stats.LogHistogram(0.01, buffer_size=100)
+        for v in self.data:
+            hist.add(v)
+        self.assertEquals(len(self.data), len(hist))
+        for q in (0.5, 0.95, 0.99):
+            exp = np.sort(self.data)[int(q*(len(self.data) - 1))]
+            self.assertLessEqual(abs(hist.quantile(q) - exp), 0.01*exp)
+        self.assertEquals(self.data.min(), hist.quantile(0))
+        self.assertEquals(self.data.max(), hist.quantile(1))
+
+    def test_zeros(self):
+        hist = stats.LogHistogram()
+        hist.update([0, 0, 0, 1])
+        self.assertEquals(0, hist.quantile(0.5))
+        self.assertEquals(1, hist.quantile(1))
+        x, cdf = hist.cdf()
+        self.assertEquals([0, 1], list(x))
+        self.assertEquals([0.75, 1.0], list(cdf))
+
+    def test_merge(self):
+        hist = stats.LogHistogram()
+        hist.update(self.data)
+        hist_a = stats.LogHistogram()
+        hist_a.update(self.data[:5000])
+        hist_b = stats.LogHistogram()
+        hist_b.update(self.data[5000:])
+        merged = hist_a + hist_b
+        self.assertEquals(len(hist), len(merged))
+        for q in (0, 0.5, 0.99, 1):
+            self.assertEquals(hist.quantile(q), merged.quantile(q))
+        x, cdf = hist.cdf()
+        merged_x, merged_cdf = merged.cdf()
+        self.assertTrue(np.array_equal(x, merged_x))
+        self.assertTrue(np.allclose(cdf, merged_cdf))
+
+    def test_merge_different_error(self):
+        self.assertRaises(ValueError, stats.LogHistogram(0.01).merge,
+                          stats.LogHistogram(0.02))
+
+    def test_negative_value(self):
+        self.assertRaises(ValueError, stats.LogHistogram().update, [1, -1])
+
+    def test_empty(self):
+        self.assertRaises(ValueError, stats.LogHistogram().quantile, 0.5)
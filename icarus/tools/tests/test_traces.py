@@ -7,7 +7,11 @@ else:
     except ImportError:
         raise ImportError("The unittest2 package is needed to run the tests.") 
 del sys
+import os
 import random
+import shutil
+import tempfile
+import collections
 
 import numpy as np
 
@@ -51,3 +55,189 @@ class TestZipfFit(unittest.TestCase):
         self.assertLessEqual(p, p_max)
 
 
+class TestFrequencyCounter(unittest.TestCase):
+
+    def test_items(self):
+        data = [random.randint(0, 50) for _ in range(1000)]
+        counter = traces.FrequencyCounter()
+        for i in range(0, len(data), 64):
+            counter.update(['item%d' % x for x in data[i:i + 64]])
+        counter.update([])
+        self.assertEquals(traces.frequencies(data).tolist(),
+                          counter.frequencies().tolist())
+        self.assertEquals(len(set(data)), len(counter))
+        self.assertEquals(data.count(7), counter.counts().get('item7', 0))
+
+    def test_ids(self):
+        data = np.random.RandomState(0).randint(100, size=1000)
+        data[500:600] %= 10
+        counter = traces.FrequencyCounter(ids=True)
+        # Blocks with both increasing and decreasing maximum ids
+        counter.update(data[:10])
+        counter.update(data[10:500])
+        counter.update(data[500:600])
+        counter.update(data[600:])
+        self.assertEquals(traces.frequencies(data).tolist(),
+                          counter.frequencies().tolist())
+        self.assertEquals(dict(collections.Counter(data.tolist())),
+                          counter.counts())
+
+
+class TestHeavyHitters(unittest.TestCase):
+
+    def test_exact(self):
+        # With no collisions, estimates are exact
+        data = [1] * 50 + [2] * 30 + [3] * 20 + range(100, 150)
+        random.shuffle(data)
+        heavy_hitters = traces.HeavyHitters(3, width=2 ** 16, seed=1)
+        for i in range(0, len(data), 16):
+            heavy_hitters.update(data[i:i + 16])
+        self.assertEquals([(1, 50), (2, 30), (3, 20)], heavy_hitters.top())
+        self.assertEquals([50, 30, 20],
+                          heavy_hitters.frequencies().tolist())
+        self.assertEquals([1, 0], heavy_hitters.estimate([100, 99]).tolist())
+
+    def test_overestimate(self):
+        z = TruncatedZipfDist(1.0, 1000, seed=1)
+        data = ['url%d' % x for x in z.rvs(10000).tolist()]
+        heavy_hitters = traces.HeavyHitters(10, width=64, seed=1)
+        for i in range(0, len(data), 1000):
+            heavy_hitters.update(data[i:i + 1000])
+        counts = collections.Counter(data)
+        for item, estimate in heavy_hitters.top():
+            self.assertGreaterEqual(estimate, counts[item])
+        self.assertEquals('url1', heavy_hitters.top()[0][0])
+
+
+class TestCompileTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'trace')
+        self.trace = [{'time': '%d.5' % i, 'url': 'http://%d\n' % (i % 7),
+                       'client': 'c%d' % (i % 3)} for i in range(100)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compile(self):
+        traces.compile_trace(iter(self.trace), self.path, client_key='client',
+                             block_size=16)
+        trace = traces.CompiledTrace(self.path)
+        self.assertEquals(100, len(trace))
+        self.assertEquals(7, trace.n_contents)
+        self.assertEquals(3, trace.n_clients)
+        self.assertEquals(['http://%d' % i for i in range(7)], trace.urls())
+        self.assertEquals([i + 0.5 for i in range(100)], trace.time.tolist())
+        self.assertEquals([i % 7 + 1 for i in range(100)],
+                          trace.content.tolist())
+        self.assertEquals([i % 3 for i in range(100)], trace.client.tolist())
+
+    def test_compile_blocks(self):
+        blocks = [dict((key, [e[key].strip() for e in self.trace[i:i + 30]])
+                       for key in ('time', 'url', 'client'))
+                  for i in range(0, 100, 30)]
+        for block in blocks:
+            block['time'] = np.array(block['time'], dtype=np.float64)
+        trace = traces.compile_trace(iter(blocks), self.path,
+                                     client_key='client', blocks=True)
+        self.assertEquals(100, len(trace))
+        self.assertEquals(['http://%d' % i for i in range(7)], trace.urls())
+        self.assertEquals([i + 0.5 for i in range(100)], trace.time.tolist())
+        self.assertEquals([i % 7 + 1 for i in range(100)],
+                          trace.content.tolist())
+        self.assertEquals([i % 3 for i in range(100)], trace.client.tolist())
+
+    def test_compile_no_clients(self):
+        trace = traces.compile_trace(iter(self.trace), self.path)
+        self.assertEquals(0, trace.n_clients)
+        self.assertEquals([-1] * 100, trace.client.tolist())
+
+    def test_compile_empty(self):
+        trace = traces.compile_trace(iter([]), self.path)
+        self.assertEquals(0, len(trace))
+        self.assertEquals(0, trace.n_contents)
+        self.assertEquals([], trace.urls())
+
+    def test_compile_existing(self):
+        os.mkdir(self.path)
+        self.assertRaises(ValueError, traces.compile_trace, iter(self.trace),
+                          self.path)
+        self.assertEquals(['trace'], os.listdir(self.tmp_dir))
+
+
+class TestParseTraceBlocks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.squid = os.path.join(cls.tmp_dir, 'access.log')
+        with open(cls.squid, 'w') as f:
+            for i in range(200):
+                f.write('%d.%03d %d 10.0.0.%d TCP_MISS/%d %d GET '
+                        'http://example.com/%d - DIRECT/10.1.1.1 text/html\n'
+                        % (1157689312 + i, i, i * 7, i % 5, 200 + i % 3,
+                           i * 100, i % 13))
+        cls.wikibench = os.path.join(cls.tmp_dir, 'wiki.log')
+        with open(cls.wikibench, 'w') as f:
+            for i in range(150):
+                # Lines with and without the trailing flag
+                f.write('%d %d.5 http://wiki/%d%s\n'
+                        % (i, 1190146243 + i, i % 11, ' -' if i % 4 else ''))
+                if i % 50 == 0:
+                    f.write('\n')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def concat(self, blocks, field):
+        values = []
+        for block in blocks:
+            values.extend(list(block[field]))
+        return values
+
+    def test_squid(self):
+        expected = list(traces.parse_squid(self.squid))
+        for n_processes in (None, 2):
+            blocks = list(traces.parse_trace_blocks(self.squid, 'squid',
+                                                    chunk_size=1000,
+                                                    n_processes=n_processes))
+            self.assertGreater(len(blocks), 1)
+            self.assertEquals([float(e['time']) for e in expected],
+                              self.concat(blocks, 'time'))
+            for field in ('duration', 'client_addr', 'log_tag', 'http_code',
+                          'bytes_len', 'url', 'hostname'):
+                self.assertEquals([e[field] for e in expected],
+                                  self.concat(blocks, field))
+
+    def test_select_fields(self):
+        blocks = list(traces.parse_trace_blocks(self.squid, 'squid',
+                                                ['url', 'bytes_len']))
+        self.assertEquals(1, len(blocks))
+        self.assertEquals(set(['url', 'bytes_len']), set(blocks[0]))
+        self.assertIsInstance(blocks[0]['bytes_len'], np.ndarray)
+        self.assertEquals(200, len(blocks[0]['url']))
+
+    def test_wikibench(self):
+        blocks = list(traces.parse_trace_blocks(self.wikibench, 'wikibench',
+                                                chunk_size=500))
+        self.assertEquals(list(range(150)), self.concat(blocks, 'counter'))
+        self.assertEquals([1190146243.5 + i for i in range(150)],
+                          self.concat(blocks, 'timestamp'))
+        self.assertEquals(['http://wiki/%d' % (i % 11) for i in range(150)],
+                          self.concat(blocks, 'url'))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, traces.parse_trace_blocks,
+                          self.squid, 'unknown')
+        self.assertRaises(ValueError, traces.parse_trace_blocks,
+                          self.squid, 'squid', ['size'])
+        self.assertRaises(ValueError, traces.parse_trace_blocks,
+                          self.squid, 'squid', [])
+        self.assertRaises(ValueError, list,
+                          traces.parse_trace_blocks(self.wikibench, 'squid',
+                                                    ['url']))
+        self.assertRaises(ValueError, list,
+                          traces.parse_trace_blocks(self.wikibench, 'squid',
+                                                    ['duration']))
@@ -2,23 +2,66 @@
 """
 from __future__ import division
 
+import os
 import math
+import json
+import shutil
+import warnings
+import tempfile
 import collections
+import multiprocessing as mp
 
 import numpy as np
 from scipy.stats import chisquare
 
-from icarus.tools import TruncatedZipfDist
-
 
 __all__ = [
        'frequencies',
        'zipf_fit',
+       'FrequencyCounter',
+       'HeavyHitters',
        'parse_squid',
-       'parse_wikibench'
+       'parse_wikibench',
+       'parse_trace_blocks',
+       'compile_trace',
+       'CompiledTrace'
            ]
 
 
+# Fields of the trace formats supported by parse_trace_blocks. Each field is
+# mapped to the index of the whitespace-separated column where it is found
+# (or to the column index and the index of the value in the column split by
+# '/') and to the data type of its values (or None if they are kept as str)
+_TRACE_FORMATS = {
+    'squid': {
+        'time': (0, np.float64),
+        'duration': (1, np.int64),
+        'client_addr': (2, None),
+        'log_tag': ((3, 0), None),
+        'http_code': ((3, 1), np.int64),
+        'bytes_len': (4, np.int64),
+        'req_method': (5, None),
+        'url': (6, None),
+        'client_ident': (7, None),
+        'hierarchy_data': ((8, 0), None),
+        'hostname': ((8, 1), None),
+        'content_type': (9, None),
+              },
+    'wikibench': {
+        'counter': (0, np.int64),
+        'timestamp': (1, np.float64),
+        'url': (2, None),
+                  },
+                  }
+
+# Version of the format of compiled traces. It must be updated every time the
+# format changes so that stale traces are not loaded
+_TRACE_FORMAT_VERSION = 1
+
+# Data types of the columns of compiled traces
+_TRACE_COLUMNS = [('time', '<f8'), ('content', '<i4'), ('client', '<i4')]
+
+
 def frequencies(data):
     """Extract frequencies from traces. Returns array of sorted frequencies
     
@@ -62,6 +105,11 @@ def zipf_fit(obs_freqs):
     -----
     This function uses the method described in
     http://stats.stackexchange.com/questions/6780/how-to-calculate-zipfs-law-coefficient-from-a-set-of-top-frequencies
+    
+    The log-likelihood is evaluated in O(n) vectorized operations, where n is
+    the number of observed frequencies, independently of the number of
+    observations they count, so it can be used to fit the popularity of
+    traces of billions of requests.
     """
     try:
         from scipy.optimize import minimize_scalar
@@ -69,20 +117,228 @@ def zipf_fit(obs_freqs):
         raise ImportError("Cannot import scipy.optimize minimize_scalar. "
                           "You either don't have scipy install or you have a "
                           "version too old (required 0.12 onwards)")
-    obs_freqs = np.asarray(obs_freqs)
+    obs_freqs = np.asarray(obs_freqs, dtype=np.float64)
     n = len(obs_freqs)
+    log_ranks = np.log(np.arange(1.0, n+1))
+    # The log-likelihood is alpha * sum(f_i * log(i)) + N * log(H(n, alpha)),
+    # where only the log of the generalized harmonic number H depends on alpha
+    n_obs = np.sum(obs_freqs)
+    weighted_log_ranks = np.dot(obs_freqs, log_ranks)
+    def log_harmonic(alpha):
+        # Computed as log(sum(exp(-alpha * log(i)))), factoring out the
+        # largest term to avoid overflows when alpha is negative
+        x = -alpha * log_ranks
+        x_max = np.max(x)
+        return x_max + math.log(np.sum(np.exp(x - x_max)))
     def log_likelihood(alpha):
-        return np.sum(obs_freqs * (alpha * np.log(np.arange(1.0, n+1)) + \
-                       math.log(sum(1.0/np.arange(1.0, n+1)**alpha))))
+        return alpha * weighted_log_ranks + n_obs * log_harmonic(alpha)
     # Find optimal alpha
     alpha = minimize_scalar(log_likelihood)['x']
     # Calculate goodness of fit
     if alpha <= 0:
         # Silently report a zero probability of a fit
         return alpha, 0
-    exp_freqs = np.sum(obs_freqs) * TruncatedZipfDist(alpha, n).pdf
+    exp_freqs = n_obs * np.exp(-alpha * log_ranks - log_harmonic(alpha))
     p = chisquare(obs_freqs, exp_freqs)[1]
     return alpha, p
+
+
+class FrequencyCounter(object):
+    """Count the occurrences of items of a stream, processed in blocks.
+    
+    Counts are exact. Items are mapped to dense integer identifiers, whose
+    occurrences are counted with *numpy.bincount*, so memory grows with the
+    number of distinct items and not with the length of the stream. Streams
+    of content identifiers, e.g. the *content* column of a *CompiledTrace*,
+    can be counted directly, without mapping them.
+    
+    Examples
+    --------
+    >>> counter = FrequencyCounter()
+    >>> for block in parse_trace_blocks('access.log', 'squid', ['url']):
+    ...     counter.update(block['url'])
+    >>> alpha, p = zipf_fit(counter.frequencies())
+    """
+    
+    def __init__(self, ids=False):
+        """Constructor
+        
+        Parameters
+        ----------
+        ids : bool, optional
+            If True, items are non-negative integers used directly as
+            identifiers, otherwise they are any hashable objects
+        """
+        self._ids = ids
+        self._index = {}
+        self._counts = np.zeros(0, dtype=np.int64)
+    
+    def __len__(self):
+        return int(np.count_nonzero(self._counts))
+    
+    def update(self, items):
+        """Count a block of items
+        
+        Parameters
+        ----------
+        items : array-like
+            The items
+        """
+        if self._ids:
+            ids = np.asarray(items, dtype=np.int64)
+        else:
+            index = self._index
+            ids = np.fromiter((index.setdefault(item, len(index))
+                               for item in items), dtype=np.int64)
+        if len(ids) == 0:
+            return
+        counts = np.bincount(ids)
+        if len(counts) > len(self._counts):
+            counts[:len(self._counts)] += self._counts
+            self._counts = counts
+        else:
+            self._counts[:len(counts)] += counts
+    
+    def counts(self):
+        """Return the number of occurrences of each item
+        
+        Returns
+        -------
+        counts : dict
+            Dictionary mapping each item to the number of its occurrences
+        """
+        if self._ids:
+            items = np.flatnonzero(self._counts)
+            return dict(zip(items.tolist(), self._counts[items].tolist()))
+        return dict((item, int(self._counts[i]))
+                    for item, i in self._index.iteritems())
+    
+    def frequencies(self):
+        """Return the frequencies of items sorted in descending order, as
+        required by *zipf_fit*
+        
+        Returns
+        -------
+        frequencies : array of int
+            The frequencies of the items sorted in descending order
+        """
+        counts = self._counts[self._counts > 0]
+        return np.sort(counts)[::-1]
+
+
+class HeavyHitters(object):
+    """Estimate the most frequent items of a stream, processed in blocks,
+    using a Count-Min sketch.
+    
+    Memory is bounded, independently of the number of distinct items, so this
+    counter can process streams of unbounded sets of items (e.g. URLs). The
+    Count-Min sketch is a matrix of *depth* rows of *width* counters: each
+    item is mapped to a counter of each row by an independent hash function
+    and its frequency is estimated as the minimum of its counters. Estimates
+    never underestimate frequencies and, with probability at least
+    1 - exp(-depth), they overestimate them by at most e * N / width, where N
+    is the number of items counted. The *k* items with the largest estimates
+    are tracked as candidate heavy hitters.
+    """
+    
+    def __init__(self, k, width=2 ** 20, depth=4, seed=None):
+        """Constructor
+        
+        Parameters
+        ----------
+        k : int
+            The number of heavy hitters tracked
+        width : int, optional
+            The number of counters of each row of the sketch. It is rounded up
+            to a power of 2
+        depth : int, optional
+            The number of rows of the sketch
+        seed : int, optional
+            The seed used to draw hash functions
+        """
+        if k <= 0:
+            raise ValueError('k must be positive')
+        self.k = k
+        self._bits = max(1, int(math.ceil(math.log(width, 2))))
+        self._table = np.zeros((depth, 2 ** self._bits), dtype=np.int64)
+        # Multiply-shift hash functions, defined by a random odd multiplier
+        random_state = np.random.RandomState(seed)
+        self._multipliers = random_state.randint(2 ** 62, size=depth) \
+                            .astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self._top = []
+    
+    def _hash(self, items):
+        """Return the counters of each row of the sketch to which items are
+        mapped
+        """
+        keys = np.array([hash(item) for item in items], dtype=np.int64) \
+               .view(np.uint64)
+        # Spread the bits of keys, since hash values of integers and of
+        # similar strings are close to each other
+        keys ^= keys >> np.uint64(31)
+        shift = np.uint64(64 - self._bits)
+        with np.errstate(over='ignore'):
+            return [(keys * a) >> shift for a in self._multipliers]
+    
+    def update(self, items):
+        """Count a block of items
+        
+        Parameters
+        ----------
+        items : array-like
+            The items
+        """
+        keys, counts = np.unique(np.asarray(items), return_counts=True)
+        if len(keys) == 0:
+            return
+        keys = keys.tolist()
+        for row, idx in zip(self._table, self._hash(keys)):
+            row += np.bincount(idx.astype(np.int64), weights=counts,
+                               minlength=len(row)).astype(np.int64)
+        candidates = list(set(self._top).union(keys))
+        estimates = self.estimate(candidates)
+        top = np.argsort(-estimates, kind='mergesort')[:self.k]
+        self._top = [candidates[i] for i in top.tolist()]
+    
+    def estimate(self, items):
+        """Estimate the frequencies of items
+        
+        Parameters
+        ----------
+        items : list
+            The items
+        
+        Returns
+        -------
+        frequencies : array of int
+            The estimated frequencies of the items
+        """
+        if len(items) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.min([row[idx.astype(np.int64)] for row, idx
+                       in zip(self._table, self._hash(items))], axis=0)
+    
+    def top(self):
+        """Return the heavy hitters and their estimated frequencies
+        
+        Returns
+        -------
+        top : list of tuples
+            List of (item, frequency) tuples of the *k* items with the largest
+            estimated frequencies, sorted by frequency in descending order
+        """
+        return zip(self._top, self.estimate(self._top).tolist())
+    
+    def frequencies(self):
+        """Return the estimated frequencies of the heavy hitters sorted in
+        descending order, as required by *zipf_fit*
+        
+        Returns
+        -------
+        frequencies : array of int
+            The estimated frequencies of the heavy hitters
+        """
+        return np.sort(self.estimate(self._top))[::-1]
     
 
 def parse_wikibench(path):
@@ -155,3 +411,397 @@ def parse_squid(path):
                        hostname=hostname,
                        content_type=content_type)
     raise StopIteration()
+
+
+def parse_trace_blocks(path, fmt, fields=None, chunk_size=2 ** 24,
+                       n_processes=None):
+    """Parse a trace file in blocks, extracting only the requested fields.
+    
+    This function is much faster than *parse_squid* and *parse_wikibench*:
+    the file is read in large chunks split on line boundaries, each line is
+    split only up to the last requested column and the values of each field
+    are returned as a whole block, rather than as a dictionary per entry.
+    
+    Chunks can also be parsed by a pool of processes. Reading the file and
+    transferring the parsed blocks from the pool are not parallelized, hence
+    this is worthwhile only on multiple cores and if parsing dominates, e.g.
+    when extracting many fields.
+    
+    Parameters
+    ----------
+    path : str
+        The path to the trace file to parse
+    fmt : str ('squid' | 'wikibench')
+        The format of the trace. Squid traces have fields *time*, *duration*,
+        *client_addr*, *log_tag*, *http_code*, *bytes_len*, *req_method*,
+        *url*, *client_ident*, *hierarchy_data*, *hostname* and
+        *content_type*, Wikibench traces have fields *counter*, *timestamp*
+        and *url*
+    fields : list, optional
+        The fields to extract. If not specified, all fields are extracted
+    chunk_size : int, optional
+        The approximate size, in bytes, of the chunks of the file parsed at a
+        time, i.e. of the portion of the trace returned by each block
+    n_processes : int, optional
+        The number of processes parsing chunks in parallel. If not specified,
+        the file is parsed in the calling process
+    
+    Returns
+    -------
+    blocks : iterator of dict
+        An iterator whereby each element is a block of consecutive entries of
+        the trace, expressed as a dictionary mapping each field to the values
+        of the field in the block. Numerical fields (*time*, *duration*,
+        *http_code*, *bytes_len*, *counter* and *timestamp*) are Numpy arrays,
+        the other fields are lists of str, as they appear in the trace
+    
+    Examples
+    --------
+    >>> for block in parse_trace_blocks('access.log', 'squid',
+    ...                                 ['time', 'url']):
+    ...     print(len(block['url']))
+    """
+    if fmt not in _TRACE_FORMATS:
+        raise ValueError('Unknown trace format %s' % fmt)
+    if fields is None:
+        fields = sorted(_TRACE_FORMATS[fmt])
+    if not fields:
+        raise ValueError('No fields to extract')
+    unknown = [field for field in fields if field not in _TRACE_FORMATS[fmt]]
+    if unknown:
+        raise ValueError('Unknown fields for format %s: %s'
+                         % (fmt, ', '.join(unknown)))
+    # Arguments are validated here rather than in the generator, so that
+    # errors are raised when this function is called and not when the
+    # blocks are first iterated over
+    chunks = [(path, fmt, fields, start, end)
+              for start, end in _line_aligned_chunks(path, chunk_size)]
+    if not n_processes or n_processes <= 1:
+        return (_parse_chunk(chunk) for chunk in chunks)
+    return _parse_chunks_parallel(chunks, n_processes)
+
+
+def _parse_chunks_parallel(chunks, n_processes):
+    """Parse chunks of a trace file with a pool of processes, yielding the
+    parsed blocks in order
+    """
+    pool = mp.Pool(n_processes)
+    try:
+        # Keep a bounded number of chunks in flight so that parsed blocks do
+        # not pile up in memory if they are consumed slowly
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_parse_packed_chunk, (chunk,)))
+            if len(pending) >= 2 * n_processes:
+                yield _unpack_block(pending.popleft().get())
+        while pending:
+            yield _unpack_block(pending.popleft().get())
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    raise StopIteration()
+
+
+def _line_aligned_chunks(path, chunk_size):
+    """Return the (start, end) byte offsets of consecutive chunks of a file of
+    approximately *chunk_size* bytes each, ending on line boundaries
+    """
+    size = os.path.getsize(path)
+    chunks = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(start + chunk_size)
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def _parse_chunk(args):
+    """Parse the requested fields of the lines of a chunk of a trace file
+    
+    Parameters
+    ----------
+    args : tuple
+        A (path, fmt, fields, start, end) tuple, passed as a single argument
+        so that chunks can be parsed by a process pool
+    
+    Returns
+    -------
+    block : dict
+        Dictionary mapping each field to its values
+    """
+    path, fmt, fields, start, end = args
+    spec = _TRACE_FORMATS[fmt]
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Splitting the whole chunk at once is much faster than splitting each
+    # line. The number of tokens of each line, needed to know which token
+    # belongs to which line, is counted separately on the raw bytes
+    tokens = data.split()
+    counts = _tokens_per_line(data)
+    counts = counts[counts > 0]
+    if len(counts) == 0:
+        return dict((field, [] if spec[field][1] is None
+                            else np.empty(0, dtype=spec[field][1]))
+                    for field in fields)
+    uniform = counts.min() == counts.max()
+    if not uniform:
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    block = {}
+    for field in fields:
+        col, dtype = spec[field]
+        col, i = (col, None) if isinstance(col, int) else col
+        if counts.min() <= col:
+            line = np.flatnonzero(counts <= col)[0]
+            raise ValueError('Entry %d of chunk starting at byte %d has no '
+                             'field %s' % (line, start, field))
+        if uniform:
+            values = tokens[col::counts[0]]
+        else:
+            values = [tokens[j] for j in (first + col).tolist()]
+        if i is not None:
+            values = [v.partition('/')[2 * i] for v in values]
+        block[field] = values if dtype is None \
+                       else _to_array(values, dtype)
+    return block
+
+
+def _parse_packed_chunk(args):
+    """Parse a chunk of a trace file like *_parse_chunk*, packing the values
+    of each non-numerical field into a single newline-separated str.
+    
+    Transferring one str from a process of a pool is much faster than
+    transferring a list of many str.
+    """
+    block = _parse_chunk(args)
+    for field, values in block.items():
+        if isinstance(values, list):
+            # Values never contain newlines, since lines are split on
+            # whitespace
+            block[field] = ('\n'.join(values), len(values))
+    return block
+
+
+def _unpack_block(block):
+    """Revert the packing of a block parsed by *_parse_packed_chunk*
+    """
+    for field, values in block.items():
+        if isinstance(values, tuple):
+            data, n_values = values
+            block[field] = data.split('\n') if n_values > 0 else []
+    return block
+
+
+def _to_array(values, dtype):
+    """Convert a list of str to a Numpy array of numbers
+    """
+    # Parsing the values joined in a single string is much faster than
+    # converting them one by one, but parsing silently stops at the first
+    # invalid value, in which case values are converted one by one to raise
+    # the appropriate error
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        try:
+            array = np.fromstring(' '.join(values), dtype=dtype, sep=' ')
+        except ValueError:
+            array = None
+    if array is None or len(array) != len(values):
+        array = np.array(values, dtype=dtype)
+    return array
+
+
+def _tokens_per_line(data):
+    """Return the number of whitespace-separated tokens of each line of a
+    string
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if len(buf) == 0:
+        return np.empty(0, dtype=int)
+    # Whitespace characters as defined by str.split
+    space = (buf == ord(' ')) | ((buf >= ord('\t')) & (buf <= ord('\r')))
+    starts = np.flatnonzero(space[:-1] > space[1:]) + 1
+    if not space[0]:
+        starts = np.concatenate(([0], starts))
+    line_ends = np.flatnonzero(buf == ord('\n'))
+    if buf[-1] != ord('\n'):
+        line_ends = np.concatenate((line_ends, [len(buf)]))
+    return np.diff(np.concatenate(([0], np.searchsorted(starts, line_ends))))
+
+
+def compile_trace(trace, path, time_key='time', url_key='url',
+                  client_key=None, block_size=2 ** 16, blocks=False):
+    """Compile a trace into a columnar binary format that can be replayed
+    without being parsed again and without being loaded in memory.
+    
+    URLs are interned to dense content identifiers, assigned in order of first
+    appearance starting from 1, like the contents placed in topologies. If a
+    client key is given, clients are interned to dense identifiers starting
+    from 0, otherwise the client of all requests is -1. The compiled trace is
+    a directory containing one binary file per column (request time, content
+    and client), the list of URLs in order of identifier and a metadata file.
+    Entries are written in blocks, so only the mapping of URLs to identifiers
+    is kept in memory.
+    
+    Parameters
+    ----------
+    trace : iterator of dict
+        The trace entries, e.g. as returned by *parse_squid* or
+        *parse_wikibench*, or the blocks of entries returned by
+        *parse_trace_blocks*, if *blocks* is *True*
+    path : str
+        The directory where the compiled trace is saved. It must not exist
+    time_key : str, optional
+        The key of the time of the request in each entry, e.g. *'timestamp'*
+        for Wikibench traces
+    url_key : str, optional
+        The key of the URL of the requested content in each entry
+    client_key : str, optional
+        The key of the client issuing the request in each entry, e.g.
+        *'client_addr'* for Squid traces
+    block_size : int, optional
+        The number of entries written at a time. It is ignored if *blocks* is
+        *True*, in which case each block is written at once
+    blocks : bool, optional
+        If *True*, *trace* is an iterator of blocks of entries, as returned by
+        *parse_trace_blocks*, which is much faster than parsing entries one
+        by one for large traces
+    
+    Returns
+    -------
+    trace : CompiledTrace
+        The compiled trace
+    
+    Examples
+    --------
+    >>> compile_trace(parse_squid('access.log'), 'access.trace',
+    ...               client_key='client_addr')
+    >>> compile_trace(parse_trace_blocks('access.log', 'squid',
+    ...                                  ['time', 'url', 'client_addr']),
+    ...               'access.trace', client_key='client_addr', blocks=True)
+    """
+    if os.path.exists(path):
+        raise ValueError('%s already exists' % path)
+    parent = os.path.dirname(os.path.abspath(path))
+    # Write to a temporary directory first and then rename it, so that a
+    # partially compiled trace is never loaded
+    tmp_path = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+    try:
+        contents = {}
+        clients = {}
+        n_events = 0
+        files = dict((col, open(os.path.join(tmp_path, '%s.bin' % col), 'wb'))
+                     for col, _ in _TRACE_COLUMNS)
+        if not blocks:
+            trace = _entry_blocks(trace, time_key, url_key, client_key,
+                                  block_size)
+        try:
+            with open(os.path.join(tmp_path, 'urls.txt'), 'w') as urls:
+                for block in trace:
+                    content_ids = []
+                    for url in block[url_key]:
+                        k = contents.get(url)
+                        if k is None:
+                            k = contents[url] = len(contents) + 1
+                            urls.write(url + '\n')
+                        content_ids.append(k)
+                    n = len(content_ids)
+                    if client_key is None:
+                        client_ids = [-1] * n
+                    else:
+                        client_ids = [clients.setdefault(c, len(clients))
+                                      for c in block[client_key]]
+                    columns = {'time': block[time_key],
+                               'content': content_ids,
+                               'client': client_ids}
+                    for col, dtype in _TRACE_COLUMNS:
+                        np.asarray(columns[col], dtype=dtype).tofile(files[col])
+                    n_events += n
+        finally:
+            for f in files.values():
+                f.close()
+        metadata = {'version': _TRACE_FORMAT_VERSION,
+                    'columns': _TRACE_COLUMNS,
+                    'n_events': n_events,
+                    'n_contents': len(contents),
+                    'n_clients': len(clients)}
+        with open(os.path.join(tmp_path, 'trace.json'), 'w') as f:
+            json.dump(metadata, f)
+        os.rename(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+    return CompiledTrace(path)
+
+
+def _entry_blocks(trace, time_key, url_key, client_key, block_size):
+    """Group the entries of a trace, as returned by *parse_squid* or
+    *parse_wikibench*, into blocks like those returned by
+    *parse_trace_blocks*, keeping only the keys used by *compile_trace*
+    """
+    keys = [time_key, url_key] + ([client_key] if client_key else [])
+    block = dict((key, []) for key in keys)
+    for entry in trace:
+        block[time_key].append(entry[time_key])
+        # Lines split only on spaces may leave a newline in the URL
+        block[url_key].append(entry[url_key].strip())
+        if client_key:
+            block[client_key].append(entry[client_key])
+        if len(block[url_key]) == block_size:
+            yield block
+            block = dict((key, []) for key in keys)
+    if block[url_key]:
+        yield block
+    raise StopIteration()
+
+
+class CompiledTrace(object):
+    """A trace compiled by *compile_trace*.
+    
+    Columns are memory mapped, so that entries are read from disk only when
+    accessed and traces larger than the available memory can be replayed.
+    """
+    
+    def __init__(self, path):
+        """Constructor
+        
+        Parameters
+        ----------
+        path : str
+            The directory of the compiled trace
+        """
+        with open(os.path.join(path, 'trace.json')) as f:
+            metadata = json.load(f)
+        if metadata['version'] != _TRACE_FORMAT_VERSION:
+            raise ValueError('Trace %s was compiled with an unsupported format '
+                             'version' % path)
+        self.path = path
+        self.n_contents = metadata['n_contents']
+        self.n_clients = metadata['n_clients']
+        self._len = metadata['n_events']
+        for col, dtype in metadata['columns']:
+            if self._len > 0:
+                data = np.memmap(os.path.join(path, '%s.bin' % col),
+                                 dtype=str(dtype), mode='r', shape=(self._len,))
+            else:
+                data = np.empty(0, dtype=str(dtype))
+            setattr(self, col, data)
+    
+    def __len__(self):
+        return self._len
+    
+    def urls(self):
+        """Return the URLs of the contents of the trace
+        
+        Returns
+        -------
+        urls : list
+            The URLs of the contents, sorted by identifier, i.e. the URL of
+            content *i* is *urls[i - 1]*
+        """
+        with open(os.path.join(self.path, 'urls.txt')) as f:
+            return [url.rstrip('\n') for url in f]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Measure the throughput of the dispatch of events to data collectors.
+
+The benchmark reports the number of events per second dispatched by
+CollectorProxy to the default set of data collectors, compared to
+dispatching every event to every collector, and the number of requests per
+second processed by a whole simulation with and without data collectors.
+
+Usage:
+    python benchmark_collectors.py [-t <topology>] [-s <strategy>]
+                                   [-n <requests>]
+"""
+from __future__ import division
+import sys
+import time
+import argparse
+from os import path
+
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), path.pardir)))
+
+from icarus.registry import topology_factory_register, data_collector_register
+from icarus.execution import NetworkModel, NetworkView, CollectorProxy, \
+                             exec_experiment
+from icarus.scenarios import uniform_req_gen
+
+__all__ = ['BroadcastCollectorProxy', 'bench_dispatch', 'bench_simulation']
+
+
+# Data collectors enabled in the default configuration
+DATA_COLLECTORS = ['CACHE_HIT_RATIO', 'LATENCY', 'LINK_LOAD', 'PATH_STRETCH']
+
+
+class BroadcastCollectorProxy(CollectorProxy):
+    """Collector proxy dispatching every event to every collector, used as
+    baseline
+    """
+    
+    def __init__(self, view, collectors):
+        super(BroadcastCollectorProxy, self).__init__(view, collectors)
+        for event in self.EVENTS:
+            self.collectors[event] = list(collectors)
+        self._start_session = self._dispatch_list('start_session')
+        self._end_session = self._dispatch_list('end_session')
+        self._cache_hit = self._dispatch_list('cache_hit')
+        self._server_hit = self._dispatch_list('server_hit')
+        self._request_hop = self._dispatch_list('request_hop')
+        self._content_hop = self._dispatch_list('content_hop')
+
+
+def bench_dispatch(proxy_cls, topology, n_events):
+    """Measure the rate at which a collector proxy dispatches events.
+    
+    Parameters
+    ----------
+    proxy_cls : type
+        The class of the collector proxy
+    topology : Topology
+        The topology
+    n_events : int
+        The number of events of each type dispatched
+    
+    Returns
+    -------
+    rates : dict
+        Dictionary mapping each event to the number of events dispatched per
+        second
+    """
+    view = NetworkView(NetworkModel(topology))
+    proxy = proxy_cls(view, [data_collector_register[name](view)
+                             for name in DATA_COLLECTORS])
+    receiver, source = None, None
+    for v in topology.nodes_iter():
+        stack = topology.node[v]['stack']
+        if stack[0] == 'receiver':
+            receiver = v
+        elif stack[0] == 'source' and stack[1]['contents']:
+            source, content = v, next(iter(stack[1]['contents']))
+    proxy.start_session(0.0, receiver, content)
+    u, v = view.shortest_path(receiver, source)[:2]
+    events = [('request_hop', (u, v)), ('content_hop', (v, u)),
+              ('cache_hit', (v,)), ('server_hit', (source,))]
+    rates = {}
+    for event, args in events:
+        f = getattr(proxy, event)
+        start = time.time()
+        for _ in range(n_events):
+            f(*args)
+        rates[event] = n_events / (time.time() - start)
+    return rates
+
+
+def bench_simulation(topology, strategy, collectors, n_requests):
+    """Measure the rate at which a simulation processes requests.
+    
+    Parameters
+    ----------
+    topology : Topology
+        The topology
+    strategy : str
+        The name of the strategy
+    collectors : list
+        The names of the data collectors
+    n_requests : int
+        The number of requests
+    
+    Returns
+    -------
+    rate : float
+        The number of requests processed per second
+    """
+    n_contents = len(set(c for v in topology.nodes_iter()
+                         if topology.node[v]['stack'][0] == 'source'
+                         for c in topology.node[v]['stack'][1]['contents']))
+    events = list(uniform_req_gen(topology, n_contents, 0.8, n_warmup=0,
+                                  n_measured=n_requests, seed=0))
+    start = time.time()
+    exec_experiment(topology, events, (strategy, {}),
+                    [(name, {}) for name in collectors])
+    return n_requests / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-t", dest="topology", default='GEANT',
+                        help="The topology")
+    parser.add_argument("-s", dest="strategy", default='LCE',
+                        help="The strategy")
+    parser.add_argument("-n", dest="n_requests", type=int, default=10 ** 5,
+                        help="The number of requests")
+    args = parser.parse_args()
+    topology = topology_factory_register[args.topology](0.05, 10 ** 4, seed=0)
+    topology.graph['cache_policy'] = 'LRU'
+    print("Events dispatched per second to %s" % ', '.join(DATA_COLLECTORS))
+    for name, proxy_cls in (('all collectors', BroadcastCollectorProxy),
+                            ('overriding collectors', CollectorProxy)):
+        rates = bench_dispatch(proxy_cls, topology, args.n_requests)
+        print("  %-22s %s" % (name, ', '.join('%s: %.0f' % (event, rate)
+                                            for event, rate
+                                            in sorted(rates.items()))))
+    print("Requests processed per second (%s, %s)"
+          % (args.topology, args.strategy))
+    for name, collectors in (('no collectors', []),
+                             ('default collectors', DATA_COLLECTORS)):
+        rate = bench_simulation(topology, args.strategy, collectors,
+                                args.n_requests)
+        print("  %-22s %.0f" % (name, rate))
+
+if __name__ == "__main__":
+    main()
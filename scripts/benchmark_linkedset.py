@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Compare memory footprint and throughput of LinkedSet and ArrayLinkedSet.
+
+The benchmark fills a linked set with a number of items and then replays an
+LRU-like sequence of operations (move to top on hit, append on top and pop
+from the bottom on miss) drawn from a Zipf distribution.
+
+Usage:
+    python benchmark_linkedset.py [-n <items>] [-r <operations>]
+"""
+from __future__ import division
+import sys
+import time
+import random
+import argparse
+from os import path
+
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), path.pardir)))
+
+from icarus.models import LinkedSet, ArrayLinkedSet
+from icarus.tools import TruncatedZipfDist
+
+__all__ = ['linked_set_size', 'bench_linked_set']
+
+
+def linked_set_size(linked_set):
+    """Estimate the memory occupied by a linked set, in bytes.
+
+    Items stored in the set are not accounted for, since they are shared by
+    all implementations.
+
+    Parameters
+    ----------
+    linked_set : LinkedSet or ArrayLinkedSet
+        The linked set
+
+    Returns
+    -------
+    size : int
+        The estimated size in bytes
+    """
+    size = sys.getsizeof(linked_set) + sys.getsizeof(linked_set._map)
+    if isinstance(linked_set, ArrayLinkedSet):
+        size += sys.getsizeof(linked_set._val) + \
+                sys.getsizeof(linked_set._up) + \
+                sys.getsizeof(linked_set._down)
+    else:
+        for node in linked_set._map.values():
+            size += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    return size
+
+
+def bench_linked_set(cls, n_items, n_ops, alpha=0.8, seed=0):
+    """Run the benchmark on a linked set implementation
+
+    Parameters
+    ----------
+    cls : type
+        The linked set class
+    n_items : int
+        The number of items kept in the linked set
+    n_ops : int
+        The number of operations to execute
+    alpha : float, optional
+        The alpha parameter of the Zipf distribution of the requests
+    seed : int, optional
+        The seed of the random number generator
+
+    Returns
+    -------
+    size : int
+        The estimated size in bytes of the filled linked set
+    ops_sec : float
+        The number of operations executed per second
+    """
+    zipf = TruncatedZipfDist(alpha, 10 * n_items)
+    random.seed(seed)
+    requests = [zipf.rv() for _ in range(n_ops)]
+    linked_set = cls()
+    for i in range(n_items):
+        linked_set.append_bottom(-i)
+    size = linked_set_size(linked_set)
+    start = time.time()
+    for k in requests:
+        if k in linked_set:
+            linked_set.move_to_top(k)
+        else:
+            linked_set.append_top(k)
+            linked_set.pop_bottom()
+    duration = time.time() - start
+    return size, n_ops/duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--items", dest="n_items", type=int,
+                        default=10**5, help='number of items in the set')
+    parser.add_argument("-r", "--operations", dest="n_ops", type=int,
+                        default=10**6, help='number of operations')
+    args = parser.parse_args()
+    for cls in (LinkedSet, ArrayLinkedSet):
+        size, ops_sec = bench_linked_set(cls, args.n_items, args.n_ops)
+        print("%-15s memory: %8.2f MB, throughput: %10.0f ops/sec"
+              % (cls.__name__, size/2**20, ops_sec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Compare the throughput of the per-line trace parsers (parse_squid and
+parse_wikibench) with parse_trace_blocks.
+
+If no trace file is given, a synthetic Squid trace is generated in a temporary
+file.
+
+Usage:
+    python benchmark_traces.py [-f <squid|wikibench>] [-n <lines>]
+                               [-p <processes>] [<trace-file>]
+"""
+from __future__ import division
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from os import path
+
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), path.pardir)))
+
+from icarus.tools import parse_squid, parse_wikibench, parse_trace_blocks
+
+__all__ = ['write_squid_trace', 'bench_parser']
+
+
+def write_squid_trace(path, n_lines, seed=None):
+    """Write a synthetic Squid trace.
+    
+    Parameters
+    ----------
+    path : str
+        The path of the trace file
+    n_lines : int
+        The number of entries of the trace
+    seed : int, optional
+        The seed of the random number generator
+    """
+    rand = random.Random(seed)
+    with open(path, 'w') as f:
+        for i in range(n_lines):
+            f.write('%.3f %d 10.0.%d.%d TCP_MISS/200 %d GET '
+                    'http://www.example.com/%d/index.html - '
+                    'DIRECT/192.168.0.1 text/html\n'
+                    % (1157689312 + i / 100, rand.randint(1, 5000),
+                       rand.randint(0, 255), rand.randint(0, 255),
+                       rand.randint(100, 10 ** 6),
+                       int(rand.paretovariate(0.8))))
+
+
+def bench_parser(parse):
+    """Parse a trace and measure the throughput of the parser.
+    
+    Parameters
+    ----------
+    parse : callable
+        Function without arguments returning the number of parsed entries
+    
+    Returns
+    -------
+    n_lines : int
+        The number of parsed entries
+    duration : float
+        The parsing time, in seconds
+    """
+    start = time.time()
+    n_lines = parse()
+    return n_lines, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-f", dest="fmt", choices=['squid', 'wikibench'],
+                        default='squid', help="The format of the trace")
+    parser.add_argument("-n", dest="n_lines", type=int, default=10 ** 6,
+                        help="The number of lines of the synthetic trace")
+    parser.add_argument("-p", dest="n_processes", type=int, default=4,
+                        help="The number of processes of the parallel parser")
+    parser.add_argument("trace", nargs='?', help="The trace file")
+    args = parser.parse_args()
+    trace = args.trace
+    if trace is None:
+        if args.fmt != 'squid':
+            parser.error('Only synthetic Squid traces can be generated')
+        fd, trace = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        write_squid_trace(trace, args.n_lines, seed=0)
+    try:
+        size = os.path.getsize(trace) / 2 ** 20
+        fields = ['time', 'url'] if args.fmt == 'squid' \
+                 else ['timestamp', 'url']
+        per_line = parse_squid if args.fmt == 'squid' else parse_wikibench
+        parsers = [
+            ('per-line', lambda: sum(1 for _ in per_line(trace))),
+            ('blocks, all fields', lambda: sum(
+                len(b['url']) for b in parse_trace_blocks(trace, args.fmt))),
+            ('blocks, %s' % ', '.join(fields), lambda: sum(
+                len(b['url']) for b in parse_trace_blocks(trace, args.fmt,
+                                                          fields))),
+            ('blocks, all fields, %d processes' % args.n_processes,
+             lambda: sum(len(b['url']) for b in parse_trace_blocks(
+                          trace, args.fmt, n_processes=args.n_processes))),
+            ('blocks, %s, %d processes' % (', '.join(fields),
+                                           args.n_processes),
+             lambda: sum(len(b['url']) for b in parse_trace_blocks(
+                          trace, args.fmt, fields,
+                          n_processes=args.n_processes))),
+                   ]
+        print("Trace: %s (%.1f MB)" % (trace, size))
+        for name, parse in parsers:
+            n_lines, duration = bench_parser(parse)
+            print("%-40s %8.2f s %12.0f lines/s %8.1f MB/s"
+                  % (name, duration, n_lines / duration, size / duration))
+    finally:
+        if args.trace is None:
+            os.remove(trace)
+
+if __name__ == "__main__":
+    main()
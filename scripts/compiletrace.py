@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Compile a Squid or Wikibench trace into the binary format replayed by the
+TRACE workload.
+
+Usage:
+    python compiletrace.py -f <squid|wikibench> <trace-file> <output-dir>
+"""
+import sys
+import argparse
+from os import path
+
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), path.pardir)))
+
+from icarus.tools import parse_trace_blocks, compile_trace
+
+__all__ = ['compile_trace_file']
+
+
+def compile_trace_file(fmt, input, output):
+    """Compile a trace file, parsing it in blocks with *parse_trace_blocks*.
+    
+    Parameters
+    ----------
+    fmt : str ('squid' | 'wikibench')
+        The format of the trace
+    input : str
+        The path to the trace file
+    output : str
+        The directory where the compiled trace is saved
+    
+    Returns
+    -------
+    trace : CompiledTrace
+        The compiled trace
+    """
+    if fmt == 'squid':
+        blocks = parse_trace_blocks(input, fmt, ['time', 'url', 'client_addr'])
+        return compile_trace(blocks, output, client_key='client_addr',
+                             blocks=True)
+    elif fmt == 'wikibench':
+        blocks = parse_trace_blocks(input, fmt, ['timestamp', 'url'])
+        return compile_trace(blocks, output, time_key='timestamp',
+                             blocks=True)
+    raise ValueError('Unknown trace format %s' % fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-f", dest="fmt", choices=['squid', 'wikibench'],
+                        required=True, help="The format of the trace")
+    parser.add_argument("input", help="The trace file")
+    parser.add_argument("output", help="The directory of the compiled trace")
+    args = parser.parse_args()
+    trace = compile_trace_file(args.fmt, args.input, args.output)
+    print("Compiled %d requests for %d contents from %d clients"
+          % (len(trace), trace.n_contents, trace.n_clients))
+
+if __name__ == "__main__":
+    main()